@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+BTC-USD price provider for the simulation scripts.
+
+Resolves daily closes from the analysis package's CSV (analysis/data/btc_usd.csv)
+or the local columnar cache (cache/btc_daily.npz), whichever runs to the later
+date (the CSV on a tie), then Yahoo Finance. The W-FRI weekly resample is cached
+alongside and reused while the daily data it was built from is unchanged.
+
+Usage:
+    python btc_data.py [--offline] [--refresh]
+"""
+
+import argparse
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SIMULATION_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = SIMULATION_DIR / "cache"
+ANALYSIS_CSV = SIMULATION_DIR.parent.parent / "analysis" / "data" / "btc_usd.csv"
+DAILY_CACHE = CACHE_DIR / "btc_daily.npz"
+WEEKLY_CACHE = CACHE_DIR / "btc_weekly.npz"
+
+TICKER = "BTC-USD"
+DATA_START = "2014-01-01"
+WEEKLY_RULE = "W-FRI"
+
+
+def _read_csv(path: Path) -> pd.Series:
+    csv = pd.read_csv(path, usecols=["Date", "Close"], parse_dates=["Date"])
+    return pd.Series(csv["Close"].to_numpy(dtype=np.float64), index=pd.DatetimeIndex(csv["Date"]), name="close")
+
+
+def _read_npz(path: Path) -> pd.Series:
+    with np.load(path) as data:
+        return pd.Series(data["close"], index=pd.DatetimeIndex(data["date"]), name="close")
+
+
+def _write_npz(path: Path, closes: pd.Series, **extra) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez(
+        tmp,
+        date=closes.index.values.astype("datetime64[ns]"),
+        close=closes.to_numpy(dtype=np.float64),
+        **extra,
+    )
+    tmp.replace(path)
+
+
+def _fetch_yahoo(start: str) -> pd.Series:
+    import yfinance as yf
+
+    daily = yf.Ticker(TICKER).history(start=start, auto_adjust=True)
+    if daily.empty:
+        raise RuntimeError(f"Failed to fetch {TICKER} data from Yahoo Finance")
+    closes = daily["Close"]
+    closes.index = closes.index.tz_localize(None).normalize()
+    return closes.rename("close")
+
+
+def load_daily(start: str = DATA_START, offline: bool = False, refresh: bool = False) -> tuple[pd.Series, str]:
+    """Return daily closes from `start` and the name of the source they came from.
+
+    When both the analysis CSV and the local cache exist, the one with the
+    later last date wins, so a cache written by `refresh` is not shadowed by an
+    older CSV. `refresh` skips both and re-downloads; `offline` never touches
+    the network and raises FileNotFoundError if no cache is available.
+    """
+    if refresh and offline:
+        raise ValueError("--refresh needs the network; drop --offline")
+
+    candidates = []
+    if not refresh:
+        for path, read in ((ANALYSIS_CSV, _read_csv), (DAILY_CACHE, _read_npz)):
+            if path.exists():
+                candidates.append((read(path), str(path)))
+
+    if candidates:
+        # max() keeps the first (the CSV) when the last dates are equal
+        closes, source = max(candidates, key=lambda c: c[0].index.max())
+    elif offline:
+        raise FileNotFoundError(
+            f"No cached BTC data at {ANALYSIS_CSV} or {DAILY_CACHE}; run once without --offline"
+        )
+    else:
+        closes = _fetch_yahoo(DATA_START)
+        _write_npz(DAILY_CACHE, closes)
+        source = "Yahoo Finance"
+
+    closes = closes.sort_index()
+    return closes[closes.index >= pd.Timestamp(start)].dropna(), source
+
+
+def _fingerprint(closes: pd.Series) -> str:
+    digest = hashlib.sha256()
+    digest.update(closes.index.values.astype("datetime64[ns]").tobytes())
+    digest.update(closes.to_numpy(dtype=np.float64).tobytes())
+    digest.update(WEEKLY_RULE.encode())
+    return digest.hexdigest()
+
+
+def load_weekly(start: str = DATA_START, offline: bool = False, refresh: bool = False) -> tuple[pd.Series, str]:
+    """Return W-FRI weekly closes, reusing the cached resample when the daily data matches."""
+    daily, source = load_daily(start, offline=offline, refresh=refresh)
+    key = _fingerprint(daily)
+
+    if WEEKLY_CACHE.exists():
+        with np.load(WEEKLY_CACHE) as data:
+            cached_key = str(data["key"])
+        if cached_key == key:
+            return _read_npz(WEEKLY_CACHE), source
+
+    weekly = daily.resample(WEEKLY_RULE).last().dropna()
+    _write_npz(WEEKLY_CACHE, weekly, key=np.array(key))
+    return weekly, source
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve and cache BTC-USD price history")
+    parser.add_argument("--offline", action="store_true", help="Use cached data only, never the network")
+    parser.add_argument("--refresh", action="store_true", help="Re-download from Yahoo Finance and rebuild caches")
+    args = parser.parse_args()
+
+    weekly, source = load_weekly(offline=args.offline, refresh=args.refresh)
+    print(f"Source: {source}")
+    print(f"Weekly closes: {len(weekly)} ({weekly.index[0].date()} to {weekly.index[-1].date()})")
+    print(f"Cache: {WEEKLY_CACHE}")
+
+
+if __name__ == "__main__":
+    main()
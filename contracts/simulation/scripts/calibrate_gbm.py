@@ -7,9 +7,10 @@ using rolling windows on real BTC-USD weekly data. Outputs Solidity-ready consta
 PriceSimulator.sol.
 
 Usage:
-    python calibrate_gbm.py
+    python calibrate_gbm.py [--offline] [--refresh]
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -18,7 +19,9 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import yfinance as yf
+
+from btc_data import DATA_START, load_weekly
+from regime_hmm import HMM_MAX_ITER, fit_hmm_batch
 
 REPORTS_DIR = Path(__file__).resolve().parent.parent / "reports"
 
@@ -28,22 +31,18 @@ OOS_WEEKS = 52           # 1 year
 STEP_WEEKS = 26          # 6 months
 ROLLING_VOL_WINDOW = 12  # weeks for regime classification
 SIMULATION_PATHS = 1000  # Monte Carlo paths for OOS validation
-DATA_START = "2014-01-01"
-
+BATCH_ELEMENTS = 4_000_000  # max folds×paths×steps cells simulated per batch
+CALIBRATION_BACKENDS = ("threshold", "hmm")  # in-sample regime estimators
 
-def fetch_btc_weekly() -> pd.DataFrame:
-    """Fetch BTC-USD daily data from Yahoo Finance, resample to weekly closes."""
-    ticker = yf.Ticker("BTC-USD")
-    daily = ticker.history(start=DATA_START, auto_adjust=True)
-    if daily.empty:
-        raise RuntimeError("Failed to fetch BTC-USD data from Yahoo Finance")
 
-    weekly = daily["Close"].resample("W-FRI").last().dropna()
+def fetch_btc_weekly(offline: bool = False, refresh: bool = False) -> pd.DataFrame:
+    """Load BTC-USD weekly closes (see btc_data.py for source resolution and caching)."""
+    weekly, source = load_weekly(DATA_START, offline=offline, refresh=refresh)
     df = pd.DataFrame({"close": weekly})
     df["log_return"] = np.log(df["close"] / df["close"].shift(1))
     df = df.dropna()
 
-    print(f"Fetched {len(df)} weekly observations ({df.index[0].date()} to {df.index[-1].date()})")
+    print(f"Loaded {len(df)} weekly observations ({df.index[0].date()} to {df.index[-1].date()}) from {source}")
     return df
 
 
@@ -116,26 +115,72 @@ def estimate_params(log_returns: np.ndarray, regimes: np.ndarray) -> dict:
 
 def simulate_gbm(params: dict, n_steps: int, n_paths: int, seed: int = 42) -> np.ndarray:
     """Simulate regime-switching GBM paths for validation."""
-    rng = np.random.default_rng(seed)
-    prices = np.ones((n_paths, n_steps + 1))
-    regimes = np.zeros(n_paths, dtype=int)
+    return simulate_gbm_batch([params], n_steps, n_paths, [seed])[0]
+
+
+def simulate_gbm_batch(
+    params: list[dict], n_steps: int, n_paths: int, seeds: list[int]
+) -> np.ndarray:
+    """Simulate regime-switching GBM paths for several parameter sets at once.
+
+    Returns a (folds, paths, steps+1) price tensor. Each fold draws its switch
+    rolls and normals from its own seed in the same interleaved order as a
+    step-by-step simulation, so every fold is bit-identical to simulating it
+    alone. Regimes are the parity of the cumulative switch count and prices the
+    running product of per-step growth factors.
+    """
+    n_folds = len(params)
+    rolls = np.empty((n_folds, n_steps, n_paths))
+    z = np.empty((n_folds, n_steps, n_paths))
+    for f, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        for t in range(n_steps):
+            rolls[f, t] = rng.random(n_paths)
+            z[f, t] = rng.standard_normal(n_paths)
+
+    def column(key: str) -> np.ndarray:
+        return np.array([p[key] for p in params])[:, None, None]
+
+    switches = (rolls < column("p_switch")).transpose(0, 2, 1)
+    regimes = np.cumsum(switches, axis=2, dtype=np.int64) & 1
+    sigma = np.where(regimes == 0, column("sigma_low"), column("sigma_high"))
+    log_ret = column("mu") + sigma * z.transpose(0, 2, 1)
+
+    # Running product rather than exp(cumsum(log_ret)): it performs the same
+    # multiplications as the sequential loop and keeps results bit-identical.
+    prices = np.ones((n_folds, n_paths, n_steps + 1))
+    np.cumprod(np.exp(log_ret), axis=2, out=prices[:, :, 1:])
+    return prices
 
-    for t in range(1, n_steps + 1):
-        # Regime switching
-        switch_rolls = rng.random(n_paths)
-        regimes = np.where(switch_rolls < params["p_switch"], 1 - regimes, regimes)
 
-        # GBM step
-        sigma = np.where(regimes == 0, params["sigma_low"], params["sigma_high"])
-        z = rng.standard_normal(n_paths)
-        log_ret = params["mu"] + sigma * z
-        prices[:, t] = prices[:, t - 1] * np.exp(log_ret)
+def oos_metrics(sim_prices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Median simulated log return and mean path volatility per fold."""
+    log_prices = np.log(sim_prices)
+    sim_total_returns = log_prices[..., -1]
+    sim_vol = np.std(np.diff(log_prices, axis=-1), axis=-1, ddof=1).mean(axis=-1)
+    return np.median(sim_total_returns, axis=-1), sim_vol
 
-    return prices
 
+def estimate_params_hmm(is_windows: list[np.ndarray]) -> list[dict]:
+    """Fit the two-state HMM to every in-sample window at once (see regime_hmm.py)."""
+    fit = fit_hmm_batch(np.stack(is_windows))
+    return [
+        {key: (value[i].item() if isinstance(value, np.ndarray) else value)
+         for key, value in fit.items() if key != "iterations"}
+        for i in range(len(is_windows))
+    ]
+
+
+def walk_forward(df: pd.DataFrame, backend: str = "threshold") -> pd.DataFrame:
+    """Execute walk-forward analysis with rolling calibration/validation windows.
+
+    `backend` selects the in-sample regime estimator: the rolling-volatility
+    median threshold, or the Baum-Welch HMM fit, which also adds per-fold
+    `loglik` and `converged` columns.
+    """
+    if backend not in CALIBRATION_BACKENDS:
+        raise ValueError(f"Unknown calibration backend '{backend}', expected one of {CALIBRATION_BACKENDS}")
 
-def walk_forward(df: pd.DataFrame) -> pd.DataFrame:
-    """Execute walk-forward analysis with rolling calibration/validation windows."""
     log_returns = df["log_return"].values
     n = len(log_returns)
     min_required = IN_SAMPLE_WEEKS + OOS_WEEKS
@@ -143,31 +188,45 @@ def walk_forward(df: pd.DataFrame) -> pd.DataFrame:
     if n < min_required:
         raise ValueError(f"Need at least {min_required} weeks, have {n}")
 
-    folds = []
-    fold_idx = 0
+    # In-sample windows and OOS actuals for every fold
+    windows = []
+    is_windows = []
     start = 0
-
     while start + min_required <= n:
         is_end = start + IN_SAMPLE_WEEKS
         oos_end = is_end + OOS_WEEKS
-
-        # In-sample calibration
-        is_returns = log_returns[start:is_end]
-        is_regimes = classify_regimes(is_returns)
-        params = estimate_params(is_returns, is_regimes)
-
-        # Out-of-sample validation
+        is_windows.append(log_returns[start:is_end])
         oos_returns = log_returns[is_end:oos_end]
-        oos_actual_vol = np.std(oos_returns, ddof=1)
-        oos_actual_total_return = np.sum(oos_returns)
+        windows.append((start, oos_end, np.std(oos_returns, ddof=1), np.sum(oos_returns)))
+        start += STEP_WEEKS
 
-        # Simulate OOS paths
-        sim_prices = simulate_gbm(params, len(oos_returns), SIMULATION_PATHS, seed=fold_idx)
-        sim_total_returns = np.log(sim_prices[:, -1])
-        sim_vol = np.std(np.diff(np.log(sim_prices), axis=1), axis=1, ddof=1).mean()
+    # In-sample calibration
+    if backend == "hmm":
+        fold_params = estimate_params_hmm(is_windows)
+        stalled = [i for i, p in enumerate(fold_params) if not p["converged"]]
+        if stalled:
+            print(f"  Warning: HMM EM hit {HMM_MAX_ITER} iterations without converging "
+                  f"for folds {stalled}")
+    else:
+        fold_params = [estimate_params(w, classify_regimes(w)) for w in is_windows]
+
+    # Simulate OOS paths for all folds in memory-capped batches
+    sim_medians = np.empty(len(windows))
+    sim_vols = np.empty(len(windows))
+    batch = max(1, BATCH_ELEMENTS // (SIMULATION_PATHS * (OOS_WEEKS + 1)))
+    for lo in range(0, len(windows), batch):
+        hi = min(lo + batch, len(windows))
+        sim_prices = simulate_gbm_batch(
+            fold_params[lo:hi], OOS_WEEKS, SIMULATION_PATHS, list(range(lo, hi))
+        )
+        sim_medians[lo:hi], sim_vols[lo:hi] = oos_metrics(sim_prices)
 
+    folds = []
+    for fold_idx, (start, oos_end, oos_actual_vol, oos_actual_total_return) in enumerate(windows):
+        params = fold_params[fold_idx]
+        sim_vol = sim_vols[fold_idx]
         vol_ratio = sim_vol / oos_actual_vol if oos_actual_vol > 0 else float("nan")
-        return_mae = np.abs(np.median(sim_total_returns) - oos_actual_total_return)
+        return_mae = np.abs(sim_medians[fold_idx] - oos_actual_total_return)
 
         is_start_date = df.index[start].date()
         oos_end_date = df.index[min(oos_end - 1, n - 1)].date()
@@ -187,14 +246,15 @@ def walk_forward(df: pd.DataFrame) -> pd.DataFrame:
             "oos_vol_ratio": vol_ratio,
             "oos_return_mae": return_mae,
         })
+        if "loglik" in params:
+            folds[-1]["loglik"] = params["loglik"]
+            folds[-1]["converged"] = params["converged"]
 
         print(f"  Fold {fold_idx}: IS {is_start_date} | OOS→{oos_end_date} | "
               f"σ_low={params['sigma_low']:.4f} σ_high={params['sigma_high']:.4f} "
               f"μ={params['mu']:.6f} p_sw={params['p_switch']:.4f} "
-              f"vol_ratio={vol_ratio:.3f}")
-
-        fold_idx += 1
-        start += STEP_WEEKS
+              f"vol_ratio={vol_ratio:.3f}"
+              + (f" loglik={params['loglik']:.2f}" if "loglik" in params else ""))
 
     return pd.DataFrame(folds)
 
@@ -261,17 +321,25 @@ def save_diagnostics(results: pd.DataFrame) -> None:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Walk-forward GBM calibration from BTC-USD weekly history")
+    parser.add_argument("--offline", action="store_true", help="Use cached price data only, never the network")
+    parser.add_argument("--refresh", action="store_true", help="Re-download price data and rebuild the caches")
+    parser.add_argument("--backend", choices=CALIBRATION_BACKENDS, default="threshold",
+                        help="In-sample regime estimator: rolling-vol median threshold or two-state Gaussian HMM")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Walk-Forward GBM Calibration — BTC-USD Weekly")
     print("=" * 60)
 
     # Fetch data
-    print("\n[1/4] Fetching BTC-USD weekly data...")
-    df = fetch_btc_weekly()
+    print("\n[1/4] Loading BTC-USD weekly data...")
+    df = fetch_btc_weekly(offline=args.offline, refresh=args.refresh)
 
     # Walk-forward analysis
-    print(f"\n[2/4] Running walk-forward analysis (IS={IN_SAMPLE_WEEKS}w, OOS={OOS_WEEKS}w, step={STEP_WEEKS}w)...")
-    results = walk_forward(df)
+    print(f"\n[2/4] Running walk-forward analysis (IS={IN_SAMPLE_WEEKS}w, OOS={OOS_WEEKS}w, step={STEP_WEEKS}w, "
+          f"backend={args.backend})...")
+    results = walk_forward(df, backend=args.backend)
 
     # Compute full-history CAGR for drift
     print(f"\n[3/5] Computing full-history CAGR...")
@@ -351,6 +419,9 @@ def main():
     print("=" * 60)
     print(f"  Median OOS vol ratio:      {results['oos_vol_ratio'].median():.3f}  (1.0 = perfect)")
     print(f"  Median OOS return MAE:     {results['oos_return_mae'].median():.4f}")
+    if "loglik" in results.columns:
+        print(f"  Median IS log-likelihood:  {results['loglik'].median():.2f}")
+        print(f"  HMM folds converged:       {int(results['converged'].sum())}/{len(results)}")
 
     # Save diagnostics
     print("\n[5/5] Saving diagnostics...")
@@ -7,7 +7,8 @@ Discovers runs in contracts/simulation/sim_results/ and generates:
 Features:
   - Cross-run metric comparison with deltas
   - Failure drill-down: treemap + time-series per tick
-  - Invariant alert system: configurable bounds with R/Y/G indicators
+  - Invariant alert system: configurable bounds with R/Y/G indicators, plus the
+    per-run tick-level alerts from invariant_config (cached in each run's alerts.json)
   - Trend regression diff: auto-compare against baseline
 """
 
@@ -18,6 +19,8 @@ import sys
 from collections import defaultdict
 from pathlib import Path
 
+from invariant_config import load_run_alerts, summarize_alerts
+
 SIM_ROOT = Path(__file__).parent.parent
 REPORTS_DIR = SIM_ROOT / "reports"
 SIM_RESULTS_DIR = SIM_ROOT / "sim_results"
@@ -120,6 +123,9 @@ def aggregate_run(run_info):
     tick_count = summary["tickCount"]
     fail_series = [fail_by_tick.get(t, 0) for t in range(tick_count)]
 
+    # Tick-level invariant alerts (reuses the run's alerts.json when current)
+    alerts = load_run_alerts(run_info["dir"], tick_count, actions=actions)
+
     return {
         "id": run_info["id"],
         "seed": summary["seed"],
@@ -140,6 +146,7 @@ def aggregate_run(run_info):
         "failByAction": dict(fail_by_action),
         "successByAction": dict(success_by_action),
         "failSeries": fail_series,
+        "alertSummary": summarize_alerts(alerts),
     }
 
 
@@ -420,6 +427,26 @@ def _invariants(runs_data, invariant_defaults):
             f'</div>'
         )
 
+    alert_rows = []
+    for r in runs_data:
+        if not r["alertSummary"]:
+            alert_rows.append(
+                f'<div class="invariant-row"><div>{r["id"]}</div><div>0</div><div>0</div>'
+                f'<div>-</div><div>-</div><div class="status">🟢</div></div>'
+            )
+        for entry in r["alertSummary"]:
+            status = "🔴" if entry["critical"] else "🟡"
+            alert_rows.append(
+                f'<div class="invariant-row">'
+                f'<div>{r["id"]} / {entry["label"]}</div>'
+                f'<div>{entry["critical"]}</div>'
+                f'<div>{entry["warning"]}</div>'
+                f'<div>{entry["firstTick"]}</div>'
+                f'<div>{entry["lastTick"]}</div>'
+                f'<div class="status">{status}</div>'
+                f'</div>'
+            )
+
     run_options = "".join(f'<option value="{r["id"]}">{r["id"]}</option>' for r in runs_data)
 
     return f'''<div id="invariants" class="section">
@@ -436,6 +463,11 @@ def _invariants(runs_data, invariant_defaults):
 </div>
 {"".join(rows)}
 <div class="hint">Green = within bounds. Yellow = in warning zone. Red = outside bounds.</div>
+<h2 style="margin-top:24px">Tick-Level Alerts (invariants.json)</h2>
+<div class="invariant-row header">
+<div>Run / Invariant</div><div>Critical</div><div>Warning</div><div>First Tick</div><div>Last Tick</div><div>Status</div>
+</div>
+{"".join(alert_rows)}
 </div>'''
 
 
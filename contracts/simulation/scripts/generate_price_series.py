@@ -8,11 +8,16 @@ SwarmOrchestrator.loadPriceSeries().
 
 Usage:
     python generate_price_series.py [--seed 42] [--ticks 320] [--initial-price 60000]
+    python generate_price_series.py --ensemble 10000 [--scenarios bull,bear] [--workers 0]
+    python generate_price_series.py --path 6794   # export one ensemble path
 """
 
 import argparse
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
 import matplotlib
@@ -40,6 +45,10 @@ DEFAULT_SCENARIO = "bull"
 
 PRECISION = 10**18
 
+# Paths per independently seeded block in generate_paths. Fixed, so path i
+# is the same whatever the ensemble size.
+PATH_BLOCK = 1024
+
 
 def generate(seed: int, ticks: int, initial_price: float, scenario: str = DEFAULT_SCENARIO) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """Generate GBM price series with asymmetric regime switching.
@@ -71,6 +80,121 @@ def generate(seed: int, ticks: int, initial_price: float, scenario: str = DEFAUL
     return prices, regimes, np.arange(ticks)
 
 
+def simulate_paths(rng: np.random.Generator, n_paths: int, ticks: int, initial_price: float,
+                   drift: float, low_sigma: float = LOW_VOL_SIGMA, high_sigma: float = HIGH_VOL_SIGMA,
+                   p_to_high: float = P_SWITCH_TO_HIGH,
+                   p_to_low: float = P_SWITCH_TO_LOW) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized regime-switching GBM: n_paths x ticks in array operations.
+
+    Same model as generate(), but regimes come from geometric run lengths
+    instead of a per-tick coin flip: starting in low-vol before tick 0, the
+    first low-vol run lasts Geom(p_to_high) - 1 ticks (the first tick may
+    already switch), then high/low runs alternate with Geom(p_to_low) /
+    Geom(p_to_high) lengths. Regime = cumsum(switches) & 1. Prices are
+    exp(cumsum(log returns)) rather than a running product, so they agree
+    with the scalar loop to rounding, not bit for bit.
+
+    All normals are drawn first, then run lengths, so the draws for a given
+    rng and shape are deterministic.
+
+    Returns (prices, regimes): float64 and uint8 arrays of shape (n_paths, ticks).
+    """
+    z = rng.standard_normal((n_paths, ticks))
+
+    # Run lengths until every path covers all ticks. Expected run count is
+    # ticks * p, so a 1.5x first draw rarely needs topping up.
+    n_runs = max(2, int(ticks * max(p_to_high, p_to_low) * 1.5) + 2)
+    lengths = np.empty((n_paths, 0), dtype=np.int64)
+    while True:
+        p = np.where(np.arange(lengths.shape[1], lengths.shape[1] + n_runs) % 2 == 0, p_to_high, p_to_low)
+        lengths = np.concatenate([lengths, rng.geometric(p, size=(n_paths, n_runs))], axis=1)
+        if (lengths.sum(axis=1) - 1 >= ticks).all():
+            break
+    lengths[:, 0] -= 1  # first low-vol run counts failures before the first switch
+
+    # Switch k lands on tick (sum of the first k run lengths). Runs after
+    # the first are >= 1 tick, so switch ticks are distinct; those past the
+    # last tick share a spare column that is dropped.
+    boundaries = np.minimum(np.cumsum(lengths, axis=1), ticks)
+    switches = np.zeros((n_paths, ticks + 1), dtype=np.int32)
+    switches[np.arange(n_paths)[:, None], boundaries] = 1
+    regimes = (np.cumsum(switches[:, :ticks], axis=1) & 1).astype(np.uint8)
+
+    sigma = np.where(regimes == 0, low_sigma, high_sigma)
+    log_prices = np.cumsum(drift + sigma * z, axis=1)
+    prices = initial_price * np.exp(log_prices)
+    return prices, regimes
+
+
+def generate_paths(seed: int, n_paths: int, ticks: int, initial_price: float,
+                   scenario: str = DEFAULT_SCENARIO) -> tuple[np.ndarray, np.ndarray]:
+    """Generate an ensemble of n_paths price series (2-D arrays, one row per path).
+
+    Path 0 is generate(seed) exactly, so single-path output stays
+    reproducible. Paths 1.. come from simulate_paths() in blocks of
+    PATH_BLOCK, block b seeded by SeedSequence(seed, spawn_key=(b,)); each
+    block is always drawn in full, so a path does not depend on n_paths.
+
+    Returns (prices, regimes) of shape (n_paths, ticks).
+    """
+    prices = np.empty((n_paths, ticks))
+    regimes = np.empty((n_paths, ticks), dtype=np.uint8)
+    if n_paths == 0:
+        return prices, regimes
+
+    prices[0], regimes[0], _ = generate(seed, ticks, initial_price, scenario)
+    for block, start in enumerate(range(1, n_paths, PATH_BLOCK)):
+        stop = min(start + PATH_BLOCK, n_paths)
+        block_prices, block_regimes = generate_block(seed, block, ticks, initial_price, scenario)
+        prices[start:stop] = block_prices[:stop - start]
+        regimes[start:stop] = block_regimes[:stop - start]
+    return prices, regimes
+
+
+def generate_block(seed: int, block: int, ticks: int, initial_price: float,
+                   scenario: str = DEFAULT_SCENARIO) -> tuple[np.ndarray, np.ndarray]:
+    """Paths 1 + block * PATH_BLOCK .. of generate_paths (a full block)."""
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block,)))
+    return simulate_paths(rng, PATH_BLOCK, ticks, initial_price, SCENARIO_DRIFTS[scenario])
+
+
+def generate_path(seed: int, index: int, ticks: int, initial_price: float,
+                  scenario: str = DEFAULT_SCENARIO) -> tuple[np.ndarray, np.ndarray]:
+    """Single path `index` of generate_paths(seed, ...), generating only its block."""
+    if index == 0:
+        prices, regimes, _ = generate(seed, ticks, initial_price, scenario)
+        return prices, regimes
+    block, row = divmod(index - 1, PATH_BLOCK)
+    prices, regimes = generate_block(seed, block, ticks, initial_price, scenario)
+    return prices[row], regimes[row]
+
+
+def generate_paths_parallel(seed: int, n_paths: int, ticks: int, initial_price: float,
+                            scenario: str = DEFAULT_SCENARIO,
+                            workers: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """generate_paths() with blocks spread over worker processes (0 = one per CPU).
+
+    Blocks are seeded independently, so the output is identical to
+    generate_paths() whatever the worker count.
+    """
+    workers = workers or os.cpu_count() or 1
+    n_blocks = -(-(n_paths - 1) // PATH_BLOCK) if n_paths > 1 else 0
+    if workers <= 1 or n_blocks <= 1:
+        return generate_paths(seed, n_paths, ticks, initial_price, scenario)
+
+    prices = np.empty((n_paths, ticks))
+    regimes = np.empty((n_paths, ticks), dtype=np.uint8)
+    prices[0], regimes[0], _ = generate(seed, ticks, initial_price, scenario)
+    block_fn = partial(generate_block, seed, ticks=ticks, initial_price=initial_price, scenario=scenario)
+    with ProcessPoolExecutor(max_workers=min(workers, n_blocks)) as executor:
+        for block, (block_prices, block_regimes) in enumerate(executor.map(block_fn, range(n_blocks))):
+            start = 1 + block * PATH_BLOCK
+            stop = min(start + PATH_BLOCK, n_paths)
+            prices[start:stop] = block_prices[:stop - start]
+            regimes[start:stop] = block_regimes[:stop - start]
+    return prices, regimes
+
+
 def validate(prices: np.ndarray, regimes: np.ndarray, initial_price: float) -> dict:
     """Compute validation statistics for the generated series."""
     final_price = prices[-1]
@@ -104,11 +228,11 @@ def validate(prices: np.ndarray, regimes: np.ndarray, initial_price: float) -> d
 
     return {
         "seed": 0,  # set by caller
-        "initialPrice": str(int(initial_price * PRECISION)),
+        "initialPrice": str(to_fixed_point(initial_price).item()),
         "ticks": ticks,
-        "finalPrice": str(int(final_price * PRECISION)),
-        "minPrice": str(int(min_price * PRECISION)),
-        "maxPrice": str(int(max_price * PRECISION)),
+        "finalPrice": str(to_fixed_point(final_price).item()),
+        "minPrice": str(to_fixed_point(min_price).item()),
+        "maxPrice": str(to_fixed_point(max_price).item()),
         "totalReturnPct": total_return_pct,
         "maxDrawdownPct": max_drawdown_pct,
         "annualizedVol": f"{annualized_vol:.6f}",
@@ -119,6 +243,131 @@ def validate(prices: np.ndarray, regimes: np.ndarray, initial_price: float) -> d
     }
 
 
+def validate_paths(prices: np.ndarray, regimes: np.ndarray, initial_price: float) -> dict[str, np.ndarray]:
+    """validate() statistics for every row of (n_paths, ticks) arrays at once.
+
+    Returns metric name -> array of shape (n_paths,), using the same
+    definitions (and key names) as validate().
+    """
+    n_paths, ticks = prices.shape
+    all_prices = np.concatenate([np.full((n_paths, 1), initial_price), prices], axis=1)
+    final_price = prices[:, -1]
+
+    peak = np.maximum.accumulate(all_prices, axis=1)
+    max_drawdown = ((peak - all_prices) / peak).max(axis=1)
+
+    log_returns = np.diff(np.log(all_prices), axis=1)
+    annualized_vol = np.std(log_returns, axis=1, ddof=1) * np.sqrt(52)
+
+    n_years = ticks / 52.0
+    cagr = (final_price / initial_price) ** (1 / n_years) - 1
+
+    high_vol_ticks = regimes.sum(axis=1, dtype=np.int64)
+    return {
+        "totalReturnPct": (final_price / initial_price - 1) * 100,
+        "maxDrawdownPct": max_drawdown * 100,
+        "annualizedVol": annualized_vol,
+        "annualizedCAGR": cagr,
+        "lowVolTicks": ticks - high_vol_ticks,
+        "highVolTicks": high_vol_ticks,
+        "regimeSwitches": (regimes[:, 1:] != regimes[:, :-1]).sum(axis=1),
+        "minPrice": prices.min(axis=1),
+        "finalPrice": final_price,
+    }
+
+
+ENSEMBLE_PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Tail selections: name -> (metric, True for the highest values)
+ENSEMBLE_TAILS = {
+    "worstDrawdown": ("maxDrawdownPct", True),
+    "lowestCAGR": ("annualizedCAGR", False),
+    "highestCAGR": ("annualizedCAGR", True),
+    "lowestMinPrice": ("minPrice", False),
+    "mostSwitches": ("regimeSwitches", True),
+}
+
+
+def summarize_ensemble(prices: np.ndarray, regimes: np.ndarray, initial_price: float,
+                       tail: int = 5) -> dict:
+    """Percentiles, per-tick price bands, tail paths and a representative path.
+
+    Paths are identified by their index in the ensemble (export one with
+    --path INDEX). The representative path is the one whose drawdown, CAGR
+    and volatility ranks are jointly closest to the median.
+    """
+    stats = validate_paths(prices, regimes, initial_price)
+    n_paths = prices.shape[0]
+
+    def path_entry(i: int) -> dict:
+        return {"path": int(i), **{name: values[i].item() if values.dtype.kind in "iu"
+                                   else round(float(values[i]), 6) for name, values in stats.items()}}
+
+    percentiles = {
+        name: {f"p{q}": round(float(v), 6) for q, v in zip(ENSEMBLE_PERCENTILES,
+                                                           np.percentile(values, ENSEMBLE_PERCENTILES))}
+        for name, values in stats.items()
+    }
+
+    tails = {}
+    for name, (metric, highest) in ENSEMBLE_TAILS.items():
+        order = np.argsort(stats[metric], kind="stable")
+        picked = order[::-1][:tail] if highest else order[:tail]
+        tails[name] = [path_entry(i) for i in picked]
+
+    # Distance of each path's ranks from the median rank
+    ranks = [np.argsort(np.argsort(stats[m], kind="stable"), kind="stable")
+             for m in ("maxDrawdownPct", "annualizedCAGR", "annualizedVol")]
+    distance = sum(np.abs(r - (n_paths - 1) / 2) for r in ranks)
+    representative = path_entry(int(np.argmin(distance)))
+
+    bands = np.percentile(prices, BAND_PERCENTILES, axis=0)
+    return {
+        "paths": n_paths,
+        "ticks": prices.shape[1],
+        "percentiles": percentiles,
+        "priceBands": {f"p{q}": [round(float(v), 2) for v in band] for q, band in zip(BAND_PERCENTILES, bands)},
+        "representative": representative,
+        "tails": tails,
+    }
+
+
+def run_ensemble(args) -> None:
+    """Generate --ensemble paths per scenario and write ensemble_<scenario>.json."""
+    output_dir = Path(args.output).parent
+    output_dir.mkdir(parents=True, exist_ok=True)
+    scenarios = args.scenarios.split(",") if args.scenarios else list(SCENARIO_DRIFTS)
+    for scenario in scenarios:
+        if scenario not in SCENARIO_DRIFTS:
+            sys.exit(f"Unknown scenario '{scenario}'. Available: {', '.join(SCENARIO_DRIFTS)}")
+
+    print(f"=== ENSEMBLE: {args.ensemble} paths x {args.ticks} ticks, seed {args.seed} ===")
+    for scenario in scenarios:
+        prices, regimes = generate_paths_parallel(args.seed, args.ensemble, args.ticks,
+                                                  args.initial_price, scenario, args.workers)
+        summary = summarize_ensemble(prices, regimes, args.initial_price, args.tail)
+        summary = {"seed": args.seed, "scenario": scenario, "initialPrice": args.initial_price, **summary}
+
+        json_path = output_dir / f"ensemble_{scenario}.json"
+        with open(json_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        if args.export_paths:
+            csv_paths = export_ensemble_csv(prices, regimes, output_dir / f"ensemble_{scenario}.csv")
+
+        pct = summary["percentiles"]
+        rep = summary["representative"]
+        worst = summary["tails"]["worstDrawdown"][0]
+        print(f"{scenario:>9}: CAGR p5/p50/p95 {pct['annualizedCAGR']['p5']:.1%} / "
+              f"{pct['annualizedCAGR']['p50']:.1%} / {pct['annualizedCAGR']['p95']:.1%} | "
+              f"Max DD p50/p95 {pct['maxDrawdownPct']['p50']:.1f}% / {pct['maxDrawdownPct']['p95']:.1f}% | "
+              f"representative path {rep['path']}, worst drawdown path {worst['path']} "
+              f"({worst['maxDrawdownPct']:.1f}%)")
+        print(f"           JSON: {json_path}")
+        if args.export_paths:
+            print(f"           CSV: {csv_paths[0]}, {csv_paths[1]}")
+
+
 def generate_chart(prices: np.ndarray, regimes: np.ndarray, initial_price: float,
                     stats: dict, seed: int, output: Path) -> None:
     """Generate WBTC/USDC price chart PNG with regime shading and log returns."""
@@ -184,14 +433,82 @@ def generate_chart(prices: np.ndarray, regimes: np.ndarray, initial_price: float
     print(f"PNG: {png_path}")
 
 
+def to_fixed_point(values) -> np.ndarray:
+    """Exact 18-decimal fixed point: floor(value * 10**18) as Python ints.
+
+    Multiplying the float by 1e18 rounds to 53 bits, so int(price * PRECISION)
+    is off in the low digits for every price above ~9. Here each float is
+    split exactly as m * 2**e (frexp, with m a 53-bit integer), and
+    m * 10**18 is shifted by e in integer arithmetic, so the result is the
+    exact truncation of the float's true value. Same truncation as int()
+    for non-negative prices. Returns an object array with values' shape.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    shape = values.shape
+    values = values.reshape(-1)  # object arithmetic on 0-d arrays returns bare ints
+    if not np.isfinite(values).all() or (values < 0).any():
+        raise ValueError("fixed point needs finite, non-negative prices")
+
+    mantissa, exponent = np.frexp(values)  # value = mantissa * 2**exponent, 0.5 <= mantissa < 1
+    m = np.ldexp(mantissa, 53).astype(np.int64).astype(object)  # exact 53-bit integer
+    shift = (exponent - 53).astype(np.int64)  # value = m * 2**shift
+
+    scaled = m * PRECISION
+    fixed = np.empty(values.size, dtype=object)
+    down = shift < 0
+    fixed[down] = scaled[down] >> (-shift[down]).astype(object)
+    fixed[~down] = scaled[~down] << shift[~down].astype(object)
+    return fixed.reshape(shape)
+
+
+# Output buffer for CSV writers, and ticks converted per chunk for columnar files
+CSV_BUFFER_BYTES = 1 << 20
+CSV_CHUNK_TICKS = 64
+
+
 def export_csv(prices: np.ndarray, regimes: np.ndarray, output: Path) -> None:
-    """Write price series CSV in Solidity-compatible format (18-decimal fixed-point)."""
+    """Write price series CSV in Solidity-compatible format (18-decimal fixed-point).
+
+    Layout is tick,price,regime (as read for SwarmOrchestrator.loadPriceSeries);
+    prices go through to_fixed_point and the file is written in one pass.
+    """
     output.parent.mkdir(parents=True, exist_ok=True)
-    with open(output, "w") as f:
+    fixed = to_fixed_point(prices)
+    lines = [f"{t},{p},{r}\n" for t, p, r in zip(range(len(prices)), fixed, regimes.tolist())]
+    with open(output, "w", buffering=CSV_BUFFER_BYTES) as f:
         f.write("tick,price,regime\n")
-        for t in range(len(prices)):
-            price_fp = int(prices[t] * PRECISION)
-            f.write(f"{t},{price_fp},{regimes[t]}\n")
+        f.write("".join(lines))
+
+
+def export_ensemble_csv(prices: np.ndarray, regimes: np.ndarray, output: Path) -> tuple[Path, Path]:
+    """Write an ensemble as two columnar CSVs: one row per tick, one column per path.
+
+    <output>_prices.csv holds 18-decimal fixed-point prices and
+    <output>_regimes.csv the regimes, both with header tick,path_0,path_1,...
+    Column i is path i (export it alone with --path i for loadPriceSeries).
+    Ticks are converted and written CSV_CHUNK_TICKS at a time to bound memory.
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    n_paths, ticks = prices.shape
+    header = "tick," + ",".join(f"path_{i}" for i in range(n_paths)) + "\n"
+    prices_path = output.with_name(output.stem + "_prices.csv")
+    regimes_path = output.with_name(output.stem + "_regimes.csv")
+
+    with open(prices_path, "w", buffering=CSV_BUFFER_BYTES) as f_prices, \
+            open(regimes_path, "w", buffering=CSV_BUFFER_BYTES) as f_regimes:
+        f_prices.write(header)
+        f_regimes.write(header)
+        for start in range(0, ticks, CSV_CHUNK_TICKS):
+            stop = min(start + CSV_CHUNK_TICKS, ticks)
+            fixed = to_fixed_point(prices[:, start:stop].T)
+            regime_rows = regimes[:, start:stop].T.astype(str)
+            f_prices.write("".join(
+                f"{t}," + ",".join(map(str, row)) + "\n" for t, row in zip(range(start, stop), fixed)
+            ))
+            f_regimes.write("".join(
+                f"{t}," + ",".join(row) + "\n" for t, row in zip(range(start, stop), regime_rows)
+            ))
+    return prices_path, regimes_path
 
 
 def main():
@@ -202,12 +519,27 @@ def main():
     parser.add_argument("--scenario", type=str, default=DEFAULT_SCENARIO, choices=SCENARIO_DRIFTS.keys(),
                         help="Price scenario: bull (~56%% CAGR), moderate (~22%%), stagnant (~5%%), bear (~-10%%)")
     parser.add_argument("--output", type=str, default=str(REPORTS_DIR / "price_series.csv"))
+    parser.add_argument("--ensemble", type=int, default=0, metavar="N",
+                        help="Generate N paths per scenario and write ensemble_<scenario>.json summaries")
+    parser.add_argument("--scenarios", type=str, default=None,
+                        help="Comma-separated scenarios for --ensemble (default: all)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Worker processes for --ensemble (0 = one per CPU)")
+    parser.add_argument("--tail", type=int, default=5, help="Tail paths listed per metric in --ensemble")
+    parser.add_argument("--export-paths", action="store_true",
+                        help="With --ensemble, also write every path to columnar ensemble_<scenario>_prices/_regimes.csv")
+    parser.add_argument("--path", type=int, default=0, metavar="INDEX",
+                        help="Export path INDEX of the seed's ensemble (0 = the classic single path)")
     args = parser.parse_args()
 
+    if args.ensemble:
+        run_ensemble(args)
+        return
+
     output_path = Path(args.output)
 
     # Generate
-    prices, regimes, _ = generate(args.seed, args.ticks, args.initial_price, args.scenario)
+    prices, regimes = generate_path(args.seed, args.path, args.ticks, args.initial_price, args.scenario)
 
     # Export CSV
     export_csv(prices, regimes, output_path)
@@ -216,6 +548,8 @@ def main():
     stats = validate(prices, regimes, args.initial_price)
     stats["seed"] = args.seed
     stats["scenario"] = args.scenario
+    if args.path:
+        stats["path"] = args.path
 
     # Export validation JSON
     json_path = output_path.parent / "price_validation.json"
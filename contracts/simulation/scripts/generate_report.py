@@ -10,6 +10,7 @@ Reads from contracts/simulation/reports/:
 
 Writes:
   - reports/simulation.html self-contained Chart.js dashboard
+  - reports/alerts.json     cached invariant alerts (invariant_config.load_run_alerts)
 """
 
 import csv
@@ -19,17 +20,9 @@ import sys
 from collections import defaultdict
 from pathlib import Path
 
-REPORTS_DIR = Path(__file__).parent.parent / "reports"
-
-# Load invariant configuration
-INVARIANTS_PATH = Path(__file__).parent / "invariants.json"
-
+from invariant_config import load_run_alerts
 
-def load_invariants():
-    if INVARIANTS_PATH.exists():
-        with open(INVARIANTS_PATH) as f:
-            return json.load(f)
-    return {"invariants": []}
+REPORTS_DIR = Path(__file__).parent.parent / "reports"
 
 ARCHETYPE_NAMES = [
     "Diamond Hands", "Yield Farmer", "Momentum Trader",
@@ -126,108 +119,6 @@ def load_summary():
         return json.load(f)
 
 
-def compute_tick_alerts(market, actions, tick_count, inv_config):
-    """Compute alerts per tick based on invariant configuration.
-
-    Returns list of alerts: {tick, invariant_id, label, severity, message}
-    """
-    invs = inv_config.get("invariants", [])
-    alerts = []
-
-    # Pre-compute per-tick failure counts from actions
-    tick_fail_counts = defaultdict(int)
-    tick_total_counts = defaultdict(int)
-    for act in actions:
-        t = act["tick"]
-        tick_total_counts[t] += 1
-        if not act["success"]:
-            tick_fail_counts[t] += 1
-
-    for tick in range(tick_count):
-        row = market[tick] if tick < len(market) else {}
-        for inv in invs:
-            if not inv.get("enabled", True):
-                continue
-            inv_type = inv.get("type", "")
-            inv_id = inv.get("id", "")
-            label = inv.get("label", inv_id)
-            severity = inv.get("severity", "critical")
-
-            if inv_type == "range":
-                scale = inv.get("scale", 1)
-                raw = row.get(inv.get("column", ""), 0)
-                # Skip uninitialized pool (vbtcRatio == 0 before AMM seeding)
-                if inv_id == "vbtc_ratio_bounds" and raw == 0:
-                    continue
-                val = raw / scale
-                min_v = inv.get("min", float("-inf"))
-                max_v = inv.get("max", float("inf"))
-                if val < min_v or val > max_v:
-                    alerts.append({
-                        "tick": tick,
-                        "id": inv_id,
-                        "label": label,
-                        "severity": severity,
-                        "message": f"{label} = {val:.4f} (bounds [{min_v}, {max_v}])",
-                    })
-
-            elif inv_type == "threshold_high":
-                window = inv.get("window_ticks", 1)
-                total_actions = sum(tick_total_counts.get(t, 0) for t in range(max(0, tick - window + 1), tick + 1))
-                failed_actions = sum(tick_fail_counts.get(t, 0) for t in range(max(0, tick - window + 1), tick + 1))
-                rate = (failed_actions / total_actions * 100) if total_actions > 0 else 0.0
-                crit = inv.get("critical_threshold", float("inf"))
-                warn = inv.get("warn_threshold", float("inf"))
-                if rate > crit:
-                    alerts.append({
-                        "tick": tick,
-                        "id": inv_id,
-                        "label": label,
-                        "severity": "critical",
-                        "message": f"{label} = {rate:.1f}% (critical threshold {crit}%)",
-                    })
-                elif rate > warn and severity == "warning":
-                    alerts.append({
-                        "tick": tick,
-                        "id": inv_id,
-                        "label": label,
-                        "severity": "warning",
-                        "message": f"{label} = {rate:.1f}% (warning threshold {warn}%)",
-                    })
-
-            elif inv_type == "solvency":
-                bal = row.get(inv.get("balance_column", ""), 0)
-                liab = row.get(inv.get("liability_column", ""), 0)
-                mult = inv.get("multiplier", 1)
-                # Skip when no activity (both zero)
-                if bal == 0 and liab == 0:
-                    continue
-                if bal < liab * mult:
-                    alerts.append({
-                        "tick": tick,
-                        "id": inv_id,
-                        "label": label,
-                        "severity": severity,
-                        "message": f"{label}: balance {bal} < liability {liab} x{mult}",
-                    })
-
-            elif inv_type == "max_ratio":
-                num = row.get(inv.get("numerator_column", ""), 0)
-                den = row.get(inv.get("denominator_column", ""), 0)
-                max_r = inv.get("max_ratio", float("inf"))
-                if den > 0 and (num / den) > max_r:
-                    ratio = num / den
-                    alerts.append({
-                        "tick": tick,
-                        "id": inv_id,
-                        "label": label,
-                        "severity": severity,
-                        "message": f"{label}: ratio {ratio:.4f} > max {max_r}",
-                    })
-
-    return alerts
-
-
 def format_alert_html(alerts):
     """Render alert list as HTML rows."""
     rows = []
@@ -385,9 +276,8 @@ def generate_html(market, agent_nw, configs, summary, actions):
     match_pools = [r["matchPool"] for r in market]
     regimes = [r["regime"] for r in market]
 
-    # Compute invariant alerts
-    inv_config = load_invariants()
-    alerts = compute_tick_alerts(market, actions, tick_count, inv_config)
+    # Invariant alerts (shared engine, cached per run directory)
+    alerts = [a.to_dict() for a in load_run_alerts(REPORTS_DIR, tick_count, market=market, actions=actions)]
     alert_json = json.dumps(alerts)
     current_tick_alerts = [a for a in alerts if a["tick"] == tick_count - 1]
 
@@ -5,20 +5,32 @@ checking them against tick-level market data and action logs, and
 generating structured alerts with red/yellow/green severity levels.
 
 Usage:
-    from invariant_config import load_invariants, check_all_ticks, Severity
+    from invariant_config import load_invariants, compute_tick_alerts, load_run_alerts
 
     invariants = load_invariants(Path("invariants.json"))
-    alerts = check_all_ticks(invariants, market_rows, actions, tick_count)
+    alerts = compute_tick_alerts(invariants, market_rows, actions, tick_count)
+
+    # Per run directory, cached in <run_dir>/alerts.json and shared by all reports
+    alerts = load_run_alerts(run_dir, tick_count)
 """
 
 from __future__ import annotations
 
+import csv
+import hashlib
 import json
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
-from collections import defaultdict
+from typing import List, Dict, Any, Mapping, Optional, Sequence, Union
 from pathlib import Path
 from enum import Enum
+from fractions import Fraction
+
+import numpy as np
+
+
+DEFAULT_INVARIANTS_PATH = Path(__file__).parent / "invariants.json"
+ALERTS_FILE = "alerts.json"
+ALERTS_FORMAT = 2  # bump when alert semantics change, to invalidate cached files
 
 
 class Severity(Enum):
@@ -132,6 +144,45 @@ class Invariant:
             max_ratio=d.get("max_ratio"),
         )
 
+    def _alert(self, tick: int, severity: Severity, message: str) -> Alert:
+        return Alert(tick=tick, invariant_id=self.id, label=self.label, severity=severity, message=message)
+
+    def range_bounds(self) -> tuple:
+        """(crit_low, crit_high, warn_low, warn_high), open ends as +/-inf."""
+        crit_low = self.min if self.min is not None else float("-inf")
+        crit_high = self.max if self.max is not None else float("inf")
+        warn_low = self.warn_min if self.warn_min is not None else crit_low
+        warn_high = self.warn_max if self.warn_max is not None else crit_high
+        return crit_low, crit_high, warn_low, warn_high
+
+    def range_alert(self, tick: int, val: float, critical: bool) -> Alert:
+        crit_low, crit_high, warn_low, warn_high = self.range_bounds()
+        if critical:
+            return self._alert(tick, Severity.CRITICAL,
+                               f"{self.label} = {val:.4f} (bounds [{crit_low}, {crit_high}])")
+        return self._alert(tick, Severity.WARNING,
+                           f"{self.label} = {val:.4f} (warning bounds [{warn_low}, {warn_high}])")
+
+    def threshold_limits(self) -> tuple:
+        """(critical, warning) failure-rate thresholds in percent, unset as inf."""
+        crit = self.critical_threshold if self.critical_threshold is not None else float("inf")
+        warn = self.warn_threshold if self.warn_threshold is not None else float("inf")
+        return crit, warn
+
+    def threshold_alert(self, tick: int, rate: float, critical: bool) -> Alert:
+        crit, warn = self.threshold_limits()
+        if critical:
+            return self._alert(tick, Severity.CRITICAL, f"{self.label} = {rate:.1f}% (critical threshold {crit}%)")
+        return self._alert(tick, Severity.WARNING, f"{self.label} = {rate:.1f}% (warning threshold {warn}%)")
+
+    def solvency_alert(self, tick: int, bal: Any, liab: Any) -> Alert:
+        return self._alert(tick, self.severity,
+                           f"{self.label}: balance {bal} < liability {liab} x{self.multiplier}")
+
+    def max_ratio_alert(self, tick: int, ratio: float) -> Alert:
+        max_r = self.max_ratio if self.max_ratio is not None else float("inf")
+        return self._alert(tick, self.severity, f"{self.label}: ratio {ratio:.4f} > max {max_r}")
+
     def check_range(self, row: Dict[str, Any]) -> Optional[Alert]:
         if self.type != InvariantType.RANGE:
             return None
@@ -140,33 +191,12 @@ class Invariant:
         if self.id == "vbtc_ratio_bounds" and raw == 0:
             return None
         val = raw / self.scale
-
-        # Critical bounds
-        crit_low = self.min if self.min is not None else float("-inf")
-        crit_high = self.max if self.max is not None else float("inf")
+        crit_low, crit_high, warn_low, warn_high = self.range_bounds()
 
         if val < crit_low or val > crit_high:
-            return Alert(
-                tick=row.get("tick", 0),
-                invariant_id=self.id,
-                label=self.label,
-                severity=Severity.CRITICAL,
-                message=f"{self.label} = {val:.4f} (bounds [{crit_low}, {crit_high}])",
-            )
-
-        # Warning bounds
-        warn_low = self.warn_min if self.warn_min is not None else crit_low
-        warn_high = self.warn_max if self.warn_max is not None else crit_high
-
+            return self.range_alert(row.get("tick", 0), val, critical=True)
         if val < warn_low or val > warn_high:
-            return Alert(
-                tick=row.get("tick", 0),
-                invariant_id=self.id,
-                label=self.label,
-                severity=Severity.WARNING,
-                message=f"{self.label} = {val:.4f} (warning bounds [{warn_low}, {warn_high}])",
-            )
-
+            return self.range_alert(row.get("tick", 0), val, critical=False)
         return None
 
     def check_threshold_high(
@@ -177,26 +207,12 @@ class Invariant:
         if total_actions == 0:
             return None
         rate = failed_actions / total_actions * 100
-
-        crit = self.critical_threshold if self.critical_threshold is not None else float("inf")
-        warn = self.warn_threshold if self.warn_threshold is not None else float("inf")
+        crit, warn = self.threshold_limits()
 
         if rate > crit:
-            return Alert(
-                tick=tick,
-                invariant_id=self.id,
-                label=self.label,
-                severity=Severity.CRITICAL,
-                message=f"{self.label} = {rate:.1f}% (critical threshold {crit}%)",
-            )
+            return self.threshold_alert(tick, rate, critical=True)
         elif rate > warn:
-            return Alert(
-                tick=tick,
-                invariant_id=self.id,
-                label=self.label,
-                severity=Severity.WARNING,
-                message=f"{self.label} = {rate:.1f}% (warning threshold {warn}%)",
-            )
+            return self.threshold_alert(tick, rate, critical=False)
         return None
 
     def check_solvency(self, row: Dict[str, Any]) -> Optional[Alert]:
@@ -208,13 +224,7 @@ class Invariant:
         if bal == 0 and liab == 0:
             return None
         if bal < liab * self.multiplier:
-            return Alert(
-                tick=row.get("tick", 0),
-                invariant_id=self.id,
-                label=self.label,
-                severity=self.severity,
-                message=f"{self.label}: balance {bal} < liability {liab} x{self.multiplier}",
-            )
+            return self.solvency_alert(row.get("tick", 0), bal, liab)
         return None
 
     def check_max_ratio(self, row: Dict[str, Any]) -> Optional[Alert]:
@@ -224,14 +234,7 @@ class Invariant:
         den = row.get(self.denominator_column, 0)
         max_r = self.max_ratio if self.max_ratio is not None else float("inf")
         if den > 0 and (num / den) > max_r:
-            ratio = num / den
-            return Alert(
-                tick=row.get("tick", 0),
-                invariant_id=self.id,
-                label=self.label,
-                severity=self.severity,
-                message=f"{self.label}: ratio {ratio:.4f} > max {max_r}",
-            )
+            return self.max_ratio_alert(row.get("tick", 0), num / den)
         return None
 
 
@@ -244,59 +247,433 @@ def load_invariants(path: Path) -> List[Invariant]:
     return [Invariant.from_dict(inv) for inv in data.get("invariants", [])]
 
 
+# Market data as row dicts (one per tick) or as columns (name -> per-tick values)
+MarketData = Union[Sequence[Dict[str, Any]], Mapping[str, Any]]
+
+# Relative slack for the float64 candidate masks. Row checks compare Python
+# ints exactly, so masks over-select by a hair and every candidate is
+# confirmed by the scalar Invariant.check_* method.
+_MASK_SLACK = 1e-12
+
+
+def market_columns(market: MarketData, names: Sequence[str], tick_count: int) -> Dict[str, np.ndarray]:
+    """Per-tick float64 arrays for `names`, padded with 0 like a missing row or key."""
+    columns = {}
+    for name in names:
+        col = np.zeros(tick_count)
+        if isinstance(market, Mapping):
+            values = market.get(name)
+            if values is not None:
+                values = np.asarray(values)[:tick_count]
+                col[:len(values)] = values
+        else:
+            n = min(len(market), tick_count)
+            col[:n] = np.fromiter((float(row.get(name, 0)) for row in market[:n]), dtype=np.float64, count=n)
+        columns[name] = col
+    return columns
+
+
+def _market_row(market: MarketData, tick: int) -> Dict[str, Any]:
+    if isinstance(market, Mapping):
+        row = {name: values[tick].item() if hasattr(values[tick], "item") else values[tick]
+               for name, values in market.items() if tick < len(values)}
+    else:
+        row = dict(market[tick]) if tick < len(market) else {}
+    row["tick"] = tick
+    return row
+
+
+def _action_counts(actions: List[Dict[str, Any]], tick_count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per-tick (total, failed) action counts for ticks in [0, tick_count)."""
+    ticks = np.fromiter((act["tick"] for act in actions), dtype=np.int64, count=len(actions))
+    failed = np.fromiter((not act.get("success", True) for act in actions), dtype=bool, count=len(actions))
+    in_range = (ticks >= 0) & (ticks < tick_count)
+    total = np.bincount(ticks[in_range], minlength=tick_count)
+    fails = np.bincount(ticks[in_range & failed], minlength=tick_count)
+    return total, fails
+
+
+def _rolling_sum(counts: np.ndarray, window: int) -> np.ndarray:
+    """Sum of counts[max(0, t - window + 1) .. t] for every t, via prefix sums."""
+    prefix = np.concatenate([[0], np.cumsum(counts)])
+    ticks = np.arange(len(counts))
+    return prefix[ticks + 1] - prefix[np.maximum(0, ticks - window + 1)]
+
+
+def _candidate_ticks(inv: Invariant, cols: Dict[str, np.ndarray]) -> np.ndarray:
+    """Ticks whose row may violate `inv` (a superset of the scalar check's hits)."""
+    if inv.type == InvariantType.RANGE:
+        raw = cols[inv.column]
+        val = raw / inv.scale
+        crit_low, crit_high, warn_low, warn_high = inv.range_bounds()
+        low, high = max(crit_low, warn_low), min(crit_high, warn_high)
+        if np.isfinite(low):
+            low += abs(low) * _MASK_SLACK
+        if np.isfinite(high):
+            high -= abs(high) * _MASK_SLACK
+        mask = (val < low) | (val > high)
+        if inv.id == "vbtc_ratio_bounds":
+            mask &= raw != 0
+
+    elif inv.type == InvariantType.SOLVENCY:
+        bal = cols[inv.balance_column]
+        liab = cols[inv.liability_column] * inv.multiplier
+        slack = (np.abs(bal) + np.abs(liab)) * _MASK_SLACK
+        mask = (bal < liab + slack) & ~((bal == 0) & (cols[inv.liability_column] == 0))
+
+    elif inv.type == InvariantType.MAX_RATIO:
+        if inv.max_ratio is None:
+            return np.empty(0, dtype=np.int64)
+        num = cols[inv.numerator_column]
+        den = cols[inv.denominator_column]
+        positive = den > 0
+        ratio = np.divide(num, den, out=np.zeros_like(num), where=positive)
+        mask = positive & (ratio > inv.max_ratio - abs(inv.max_ratio) * _MASK_SLACK)
+
+    else:
+        return np.empty(0, dtype=np.int64)
+
+    return np.flatnonzero(mask)
+
+
+# ---------------------------------------------------------------------------
+# Exact mode: integer columns and rational bounds, compared by cross-multiplication
+# ---------------------------------------------------------------------------
+
+_INT64_LIMIT = 2**63
+
+
+def _fraction(value: Any) -> Fraction:
+    """Exact rational for a configured number, reading floats by their decimal text (0.1 -> 1/10)."""
+    return Fraction(str(value)) if isinstance(value, float) else Fraction(value)
+
+
+def _value(x: Any) -> Any:
+    return x.item() if isinstance(x, np.generic) else x
+
+
+def _exact_array(values: Any) -> np.ndarray:
+    """int64 array when every value is an integer within int64, else an object array of
+    Python ints (and Fractions for non-integer data)."""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "i":
+        return values.astype(np.int64, copy=False)
+    items = values.tolist() if isinstance(values, np.ndarray) else list(values)
+    if all(isinstance(v, int) for v in items):
+        try:
+            return np.array(items, dtype=np.int64)
+        except OverflowError:
+            pass
+    exact = np.empty(len(items), dtype=object)
+    exact[:] = [v if isinstance(v, int) else Fraction(v) for v in items]
+    return exact
+
+
+def exact_market_columns(market: MarketData, names: Sequence[str], tick_count: int) -> Dict[str, np.ndarray]:
+    """market_columns() for exact mode: integer (or object) arrays, padded with 0."""
+    columns = {}
+    for name in names:
+        if isinstance(market, Mapping):
+            values = market.get(name)
+            if isinstance(values, np.ndarray) and values.dtype.kind == "i":
+                col = np.zeros(tick_count, dtype=np.int64)
+                col[:min(len(values), tick_count)] = values[:tick_count]
+                columns[name] = col
+                continue
+            values = [_value(v) for v in values[:tick_count]] if values is not None else []
+        else:
+            values = [row.get(name, 0) for row in market[:tick_count]]
+        values += [0] * (tick_count - len(values))
+        columns[name] = _exact_array(values)
+    return columns
+
+
+def _scaled(col: np.ndarray, factor: int) -> np.ndarray:
+    """col * factor, in int64 when the product provably fits, else as Python ints."""
+    if col.dtype != object and abs(factor) < _INT64_LIMIT:
+        peak = max(int(col.max(initial=0)), -int(col.min(initial=0)))
+        if peak * abs(factor) < _INT64_LIMIT:
+            return col * np.int64(factor)
+    return col.astype(object) * factor
+
+
+def _native(x: Any) -> bool:
+    if isinstance(x, np.ndarray):
+        return x.dtype != object
+    return -_INT64_LIMIT <= x < _INT64_LIMIT
+
+
+def _less(a: Any, b: Any) -> np.ndarray:
+    """Elementwise a < b for int64/object arrays and Python ints, without overflow."""
+    if _native(a) and _native(b):
+        return np.asarray(a < b)
+    a = a.astype(object) if isinstance(a, np.ndarray) else a
+    b = b.astype(object) if isinstance(b, np.ndarray) else b
+    return np.asarray(a < b, dtype=bool)
+
+
+def _exact_row_alerts(inv: Invariant, cols: Dict[str, np.ndarray]) -> List[tuple]:
+    """(tick, alert) pairs for a row invariant, classified in exact arithmetic."""
+    if inv.type == InvariantType.RANGE:
+        raw = cols[inv.column]
+        scale = _fraction(inv.scale)
+        if scale <= 0:
+            raise ValueError(f"Invariant {inv.id}: exact mode needs a positive scale, got {inv.scale}")
+
+        # raw / (sn/sd) < bn/bd  <=>  raw * sd * bd < bn * sn   (sd, bd, sn > 0)
+        def below(bound):
+            if bound is None:
+                return np.zeros(len(raw), dtype=bool)
+            b = _fraction(bound)
+            return _less(_scaled(raw, scale.denominator * b.denominator), b.numerator * scale.numerator)
+
+        def above(bound):
+            if bound is None:
+                return np.zeros(len(raw), dtype=bool)
+            b = _fraction(bound)
+            return _less(b.numerator * scale.numerator, _scaled(raw, scale.denominator * b.denominator))
+
+        critical = below(inv.min) | above(inv.max)
+        warning = ~critical & (
+            below(inv.warn_min if inv.warn_min is not None else inv.min)
+            | above(inv.warn_max if inv.warn_max is not None else inv.max)
+        )
+        if inv.id == "vbtc_ratio_bounds":
+            initialized = np.asarray(raw != 0, dtype=bool)
+            critical &= initialized
+            warning &= initialized
+        hits = [(t, True) for t in np.flatnonzero(critical).tolist()]
+        hits += [(t, False) for t in np.flatnonzero(warning).tolist()]
+        return [(t, inv.range_alert(t, _value(raw[t]) / inv.scale, critical=crit)) for t, crit in hits]
+
+    if inv.type == InvariantType.SOLVENCY:
+        bal = cols[inv.balance_column]
+        liab = cols[inv.liability_column]
+        m = _fraction(inv.multiplier)
+        # bal < liab * mn/md  <=>  bal * md < liab * mn
+        mask = _less(_scaled(bal, m.denominator), _scaled(liab, m.numerator))
+        mask &= ~np.asarray((bal == 0) & (liab == 0), dtype=bool)
+        return [(t, inv.solvency_alert(t, _value(bal[t]), _value(liab[t]))) for t in np.flatnonzero(mask).tolist()]
+
+    if inv.type == InvariantType.MAX_RATIO:
+        if inv.max_ratio is None:
+            return []
+        num = cols[inv.numerator_column]
+        den = cols[inv.denominator_column]
+        r = _fraction(inv.max_ratio)
+        # num / den > rn/rd  <=>  num * rd > rn * den   (den > 0)
+        mask = np.asarray(den > 0, dtype=bool) & _less(_scaled(den, r.numerator), _scaled(num, r.denominator))
+        return [(t, inv.max_ratio_alert(t, _value(num[t]) / _value(den[t]))) for t in np.flatnonzero(mask).tolist()]
+
+    return []
+
+
+def _exact_threshold_alerts(inv: Invariant, total: np.ndarray, failed: np.ndarray) -> List[tuple]:
+    """(tick, alert) pairs for a THRESHOLD_HIGH invariant, rates compared exactly."""
+    active = total > 0
+
+    # failed / total * 100 > tn/td  <=>  failed * 100 * td > tn * total   (total > 0)
+    def exceeds(threshold):
+        if threshold is None:
+            return np.zeros(len(total), dtype=bool)
+        t = _fraction(threshold)
+        return active & _less(_scaled(total, t.numerator), _scaled(failed, 100 * t.denominator))
+
+    critical = exceeds(inv.critical_threshold)
+    warning = ~critical & exceeds(inv.warn_threshold)
+    hits = [(t, True) for t in np.flatnonzero(critical).tolist()]
+    hits += [(t, False) for t in np.flatnonzero(warning).tolist()]
+    return [(t, inv.threshold_alert(t, int(failed[t]) / int(total[t]) * 100, critical=crit)) for t, crit in hits]
+
+
 def compute_tick_alerts(
     invariants: List[Invariant],
-    market: List[Dict[str, Any]],
+    market: MarketData,
     actions: List[Dict[str, Any]],
     tick_count: int,
+    exact: bool = False,
 ) -> List[Alert]:
     """Compute all alerts across all ticks.
 
+    Columnar engine: market columns are loaded once as NumPy arrays, row
+    invariants are evaluated as vector masks and windowed failure rates
+    through prefix sums, and Alert objects are only built for violating
+    ticks. Alerts are ordered by tick, then by invariant order, with the
+    same content as checking every row with the Invariant.check_* methods.
+
+    With `exact`, values stay integers (int64, or Python ints past 2^63)
+    and bounds become rationals from their decimal text, so comparisons
+    are exact cross-multiplications instead of float divisions. This can
+    differ from the float checks for values within rounding of a bound.
+
     Returns a list of Alert objects, one per invariant violation.
     """
-    # Pre-compute per-tick failure counts from actions
-    tick_fail_counts: Dict[int, int] = defaultdict(int)
-    tick_total_counts: Dict[int, int] = defaultdict(int)
-    for act in actions:
-        t = act["tick"]
-        tick_total_counts[t] += 1
-        if not act.get("success", True):
-            tick_fail_counts[t] += 1
-
-    alerts: List[Alert] = []
-    for tick in range(tick_count):
-        row = market[tick] if tick < len(market) else {}
-        row = dict(row)
-        row["tick"] = tick
-
-        for inv in invariants:
-            if not inv.enabled:
+    active = [inv for inv in invariants if inv.enabled]
+    names = set()
+    for inv in active:
+        if inv.type == InvariantType.RANGE:
+            names.add(inv.column)
+        elif inv.type == InvariantType.SOLVENCY:
+            names.update((inv.balance_column, inv.liability_column))
+        elif inv.type == InvariantType.MAX_RATIO:
+            names.update((inv.numerator_column, inv.denominator_column))
+    if exact:
+        cols = exact_market_columns(market, sorted(names), tick_count)
+    else:
+        cols = market_columns(market, sorted(names), tick_count)
+
+    counts = None
+    rows: Dict[int, Dict[str, Any]] = {}
+    hits = []  # (tick, invariant index, alert)
+    for order, inv in enumerate(active):
+        if inv.type == InvariantType.THRESHOLD_HIGH:
+            if counts is None:
+                counts = _action_counts(actions, tick_count)
+            total = _rolling_sum(counts[0], inv.window_ticks)
+            failed = _rolling_sum(counts[1], inv.window_ticks)
+            if exact:
+                hits += [(tick, order, alert) for tick, alert in _exact_threshold_alerts(inv, total, failed)]
                 continue
-
-            if inv.type == InvariantType.RANGE:
-                alert = inv.check_range(row)
-                if alert:
-                    alerts.append(alert)
-
-            elif inv.type == InvariantType.THRESHOLD_HIGH:
-                window = inv.window_ticks
-                total = sum(tick_total_counts.get(t, 0) for t in range(max(0, tick - window + 1), tick + 1))
-                failed = sum(tick_fail_counts.get(t, 0) for t in range(max(0, tick - window + 1), tick + 1))
-                alert = inv.check_threshold_high(tick, total, failed)
+            limit = min(inv.threshold_limits())
+            rate = np.divide(failed, total, out=np.zeros(tick_count), where=total > 0) * 100
+            for tick in np.flatnonzero((total > 0) & (rate > limit)).tolist():
+                alert = inv.check_threshold_high(tick, int(total[tick]), int(failed[tick]))
                 if alert:
-                    alerts.append(alert)
+                    hits.append((tick, order, alert))
+            continue
+
+        if exact:
+            hits += [(tick, order, alert) for tick, alert in _exact_row_alerts(inv, cols)]
+            continue
+
+        check = {
+            InvariantType.RANGE: inv.check_range,
+            InvariantType.SOLVENCY: inv.check_solvency,
+            InvariantType.MAX_RATIO: inv.check_max_ratio,
+        }[inv.type]
+        for tick in _candidate_ticks(inv, cols).tolist():
+            row = rows.get(tick)
+            if row is None:
+                row = rows[tick] = _market_row(market, tick)
+            alert = check(row)
+            if alert:
+                hits.append((tick, order, alert))
+
+    hits.sort(key=lambda hit: (hit[0], hit[1]))
+    return [alert for _, _, alert in hits]
+
+
+def load_market_columns(path: Path) -> Dict[str, List[int]]:
+    """Read market_data.csv as integer columns (empty cells count as 0)."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        columns = [[] for _ in header]
+        for record in reader:
+            for col, value in zip(columns, record):
+                col.append(int(value or 0))
+    return dict(zip(header, columns))
+
+
+def load_action_outcomes(path: Path) -> List[Dict[str, Any]]:
+    """Read the tick and success flag of every action in agent_actions.csv."""
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        return [{"tick": int(row["tick"]), "success": row["success"] == "true"} for row in reader]
+
+
+def run_fingerprint(run_dir: Path, tick_count: int, invariants_path: Path = DEFAULT_INVARIANTS_PATH) -> str:
+    """Hash of everything a run's alerts depend on: inputs, bounds and engine format."""
+    digest = hashlib.sha256(f"{ALERTS_FORMAT}:{tick_count}".encode())
+    for path in (invariants_path, run_dir / "market_data.csv", run_dir / "agent_actions.csv"):
+        digest.update(b"\0" + path.name.encode() + b"\0")
+        if path.exists():
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def encode_alerts(alerts: List[Alert], fingerprint: str) -> Dict[str, Any]:
+    """Compact alerts-file payload: invariant id/label table plus [tick, index, severity, message] rows."""
+    index: Dict[tuple, int] = {}
+    rows = []
+    for a in alerts:
+        key = (a.invariant_id, a.label)
+        rows.append([a.tick, index.setdefault(key, len(index)), a.severity.value, a.message])
+    return {
+        "format": ALERTS_FORMAT,
+        "fingerprint": fingerprint,
+        "invariants": [list(key) for key in index],
+        "alerts": rows,
+    }
+
+
+def decode_alerts(data: Dict[str, Any]) -> List[Alert]:
+    """Inverse of encode_alerts()."""
+    invariants = data["invariants"]
+    return [
+        Alert(tick=tick, invariant_id=invariants[i][0], label=invariants[i][1],
+              severity=Severity(severity), message=message)
+        for tick, i, severity, message in data["alerts"]
+    ]
+
+
+def load_run_alerts(
+    run_dir: Path,
+    tick_count: int,
+    invariants_path: Path = DEFAULT_INVARIANTS_PATH,
+    market: Optional[MarketData] = None,
+    actions: Optional[List[Dict[str, Any]]] = None,
+) -> List[Alert]:
+    """Alerts for the run in `run_dir`, computed once (in exact mode) and cached in its alerts file.
 
-            elif inv.type == InvariantType.SOLVENCY:
-                alert = inv.check_solvency(row)
-                if alert:
-                    alerts.append(alert)
+    The cache is reused while the run's market/action CSVs, the invariant
+    bounds and the tick count are unchanged. `market` and `actions` may be
+    passed when the caller has already loaded them; otherwise they are read
+    from the run directory.
+    """
+    run_dir = Path(run_dir)
+    fingerprint = run_fingerprint(run_dir, tick_count, invariants_path)
+    cache_path = run_dir / ALERTS_FILE
+    if cache_path.exists():
+        try:
+            with open(cache_path) as f:
+                data = json.load(f)
+            if data.get("format") == ALERTS_FORMAT and data.get("fingerprint") == fingerprint:
+                return decode_alerts(data)
+        except (ValueError, KeyError, IndexError, TypeError):
+            pass  # unreadable cache: recompute and overwrite
+
+    if market is None:
+        market_path = run_dir / "market_data.csv"
+        market = load_market_columns(market_path) if market_path.exists() else {}
+    if actions is None:
+        actions = load_action_outcomes(run_dir / "agent_actions.csv")
+
+    alerts = compute_tick_alerts(load_invariants(invariants_path), market, actions, tick_count, exact=True)
+    with open(cache_path, "w") as f:
+        json.dump(encode_alerts(alerts, fingerprint), f, separators=(",", ":"))
+    return alerts
 
-            elif inv.type == InvariantType.MAX_RATIO:
-                alert = inv.check_max_ratio(row)
-                if alert:
-                    alerts.append(alert)
 
-    return alerts
+def load_runs_alerts(
+    runs: List[tuple],
+    invariants_path: Path = DEFAULT_INVARIANTS_PATH,
+) -> Dict[Path, List[Alert]]:
+    """Batch load_run_alerts() over (run_dir, tick_count) pairs, keyed by run_dir."""
+    return {Path(run_dir): load_run_alerts(run_dir, tick_count, invariants_path) for run_dir, tick_count in runs}
+
+
+def summarize_alerts(alerts: List[Alert]) -> List[Dict[str, Any]]:
+    """Per-invariant alert counts by severity, with first and last tick, in first-seen order."""
+    summary: Dict[str, Dict[str, Any]] = {}
+    for a in alerts:
+        entry = summary.setdefault(a.invariant_id, {
+            "id": a.invariant_id, "label": a.label,
+            "critical": 0, "warning": 0, "info": 0,
+            "firstTick": a.tick, "lastTick": a.tick,
+        })
+        entry[a.severity.value] += 1
+        entry["lastTick"] = a.tick
+    return list(summary.values())
 
 
 def get_current_tick_alerts(alerts: List[Alert], tick: int) -> List[Alert]:
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Two-state Gaussian HMM regime estimation for GBM calibration.
+
+Alternative to the rolling-volatility threshold in calibrate_gbm.py: fits a
+low-vol/high-vol hidden Markov model with a shared drift by Baum-Welch (EM),
+running the forward-backward recursions in log space and vectorized across a
+batch of return windows, so all walk-forward folds are fitted together.
+
+Usage:
+    python regime_hmm.py [--offline]
+"""
+
+import argparse
+
+import numpy as np
+
+HMM_MAX_ITER = 200
+HMM_TOL = 1e-6          # a fold stops once its log-likelihood improves by less than this
+SIGMA_FLOOR = 1e-4      # keeps a state from collapsing onto a single observation
+INIT_P_SWITCH = 0.1
+
+
+def _logsumexp(a: np.ndarray, axis: int) -> np.ndarray:
+    peak = np.max(a, axis=axis, keepdims=True)
+    return np.squeeze(peak, axis=axis) + np.log(np.sum(np.exp(a - peak), axis=axis))
+
+
+def _emission_logpdf(x: np.ndarray, mu: np.ndarray, sigma: np.ndarray) -> np.ndarray:
+    """Log N(x | mu, sigma_k) as (batch, T, 2) for x (batch, T), mu (batch,), sigma (batch, 2)."""
+    z = (x[:, :, None] - mu[:, None, None]) / sigma[:, None, :]
+    return -0.5 * z**2 - np.log(sigma[:, None, :]) - 0.5 * np.log(2 * np.pi)
+
+
+def forward_backward(log_b: np.ndarray, log_pi: np.ndarray, log_a: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Log-space forward-backward over a batch.
+
+    Returns (log_gamma (batch, T, 2), log_xi (batch, T-1, 2, 2), loglik (batch,)).
+    """
+    n_batch, n_obs, _ = log_b.shape
+    log_alpha = np.empty_like(log_b)
+    log_beta = np.zeros_like(log_b)
+
+    # Two states: the sum over the previous/next state is a single logaddexp
+    log_alpha[:, 0] = log_pi + log_b[:, 0]
+    for t in range(1, n_obs):
+        prev = log_alpha[:, t - 1]
+        log_alpha[:, t] = np.logaddexp(prev[:, :1] + log_a[:, 0], prev[:, 1:] + log_a[:, 1]) + log_b[:, t]
+    for t in range(n_obs - 2, -1, -1):
+        nxt = log_b[:, t + 1] + log_beta[:, t + 1]
+        log_beta[:, t] = np.logaddexp(log_a[:, :, 0] + nxt[:, :1], log_a[:, :, 1] + nxt[:, 1:])
+
+    loglik = _logsumexp(log_alpha[:, -1], axis=1)
+    log_gamma = log_alpha + log_beta - loglik[:, None, None]
+    log_xi = (log_alpha[:, :-1, :, None] + log_a[:, None]
+              + (log_b[:, 1:] + log_beta[:, 1:])[:, :, None, :]
+              - loglik[:, None, None, None])
+    return log_gamma, log_xi, loglik
+
+
+def fit_hmm_batch(returns: np.ndarray, max_iter: int = HMM_MAX_ITER, tol: float = HMM_TOL) -> dict:
+    """Fit a two-state Gaussian HMM with shared mean to each row of `returns` (batch, T).
+
+    Returns arrays keyed like estimate_params() plus "loglik", "iterations" and
+    "converged" (False where EM stopped at max_iter). "mu" is the fitted shared
+    mean, so "loglik" is the likelihood of exactly the returned parameters.
+    State 0 is the lower-volatility state.
+    """
+    x = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    n_batch, n_obs = x.shape
+    if n_obs < 3:
+        raise ValueError("Need at least 3 observations per window to fit the HMM")
+
+    # Deterministic start: split the sample std around its level, sticky regimes
+    std = np.std(x, axis=1, ddof=1)
+    mu = x.mean(axis=1)
+    sigma = np.maximum(np.stack([0.7 * std, 1.3 * std], axis=1), SIGMA_FLOOR)
+    log_pi = np.full((n_batch, 2), np.log(0.5))
+    stay = np.log(1 - INIT_P_SWITCH)
+    switch = np.log(INIT_P_SWITCH)
+    log_a = np.tile(np.array([[stay, switch], [switch, stay]]), (n_batch, 1, 1))
+
+    # EM runs on the folds that have not converged yet
+    active = np.arange(n_batch)
+    prev = np.full(n_batch, -np.inf)
+    iterations = np.zeros(n_batch, dtype=np.int64)
+    converged = np.zeros(n_batch, dtype=bool)
+    for _ in range(max_iter):
+        xa, sa = x[active], sigma[active]
+        log_gamma, log_xi, loglik = forward_backward(_emission_logpdf(xa, mu[active], sa), log_pi[active], log_a[active])
+        gamma = np.exp(log_gamma)
+
+        # M-step (ECM for the shared mean: mean given current sigmas, then sigmas)
+        log_pi[active] = log_gamma[:, 0]
+        new_a = _logsumexp(log_xi, axis=1)
+        log_a[active] = new_a - _logsumexp(new_a, axis=2)[:, :, None]
+        precision = gamma / sa[:, None, :] ** 2
+        mu_a = np.sum(precision * xa[:, :, None], axis=(1, 2)) / np.sum(precision, axis=(1, 2))
+        resid_sq = (xa - mu_a[:, None]) ** 2
+        occupancy = gamma.sum(axis=1)
+        sa = np.sqrt(np.sum(gamma * resid_sq[:, :, None], axis=1) / np.maximum(occupancy, 1e-300))
+        mu[active] = mu_a
+        sigma[active] = np.maximum(sa, SIGMA_FLOOR)
+        iterations[active] += 1
+
+        done = loglik - prev[active] <= tol
+        prev[active] = loglik
+        converged[active[done]] = True
+        active = active[~done]
+        if active.size == 0:
+            break
+
+    # Final likelihood and posteriors under the converged parameters
+    log_gamma, _, loglik = forward_backward(_emission_logpdf(x, mu, sigma), log_pi, log_a)
+
+    # Order states so 0 = low vol
+    swap = sigma[:, 0] > sigma[:, 1]
+    sigma[swap] = sigma[swap][:, ::-1]
+    log_a[swap] = log_a[swap][:, ::-1, ::-1]
+    log_gamma[swap] = log_gamma[swap][:, :, ::-1]
+
+    transition = np.exp(log_a)
+    states = np.argmax(log_gamma, axis=2)
+    n_high = states.sum(axis=1)
+    p_low_to_high = transition[:, 0, 1]
+    p_high_to_low = transition[:, 1, 0]
+
+    return {
+        "mu": mu,
+        "sigma_low": sigma[:, 0],
+        "sigma_high": sigma[:, 1],
+        "p_switch": (p_low_to_high + p_high_to_low) / 2.0,
+        "p_switch_low_to_high": p_low_to_high,
+        "p_switch_high_to_low": p_high_to_low,
+        "n_low": n_obs - n_high,
+        "n_high": n_high,
+        "loglik": loglik,
+        "iterations": iterations,
+        "converged": converged,
+    }
+
+
+def main():
+    from btc_data import load_weekly
+
+    parser = argparse.ArgumentParser(description="Fit a two-state Gaussian HMM to BTC-USD weekly log returns")
+    parser.add_argument("--offline", action="store_true", help="Use cached price data only, never the network")
+    args = parser.parse_args()
+
+    weekly, source = load_weekly(offline=args.offline)
+    log_returns = np.diff(np.log(weekly.to_numpy()))
+    fit = fit_hmm_batch(log_returns[None, :])
+
+    print(f"Source: {source} ({len(log_returns)} weekly returns)")
+    print(f"  Log-likelihood:       {fit['loglik'][0]:.4f}  ({fit['iterations'][0]} EM iterations)")
+    print(f"  Low-vol sigma:        {fit['sigma_low'][0]:.6f}")
+    print(f"  High-vol sigma:       {fit['sigma_high'][0]:.6f}")
+    print(f"  P(low→high):          {fit['p_switch_low_to_high'][0]:.4f}")
+    print(f"  P(high→low):          {fit['p_switch_high_to_low'][0]:.4f}")
+    print(f"  Weeks low/high:       {fit['n_low'][0]}/{fit['n_high'][0]}")
+    if not fit["converged"][0]:
+        print(f"  Warning: EM stopped at {HMM_MAX_ITER} iterations without converging")
+
+
+if __name__ == "__main__":
+    main()
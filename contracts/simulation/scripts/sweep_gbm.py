@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Stress-test sweep over regime-switching GBM parameters.
+
+Samples (drift, sigma_low, sigma_high, p_to_high, p_to_low) on a Latin
+hypercube or a full grid, simulates an ensemble per point with the vectorized
+simulate_paths() from generate_price_series.py, and writes a compact table of
+tail metrics (drawdown exceedance probabilities, terminal return percentiles)
+for choosing stress scenarios for the swarm simulation.
+
+Usage:
+    python sweep_gbm.py [--samples 256] [--paths 2000] [--workers 0]
+    python sweep_gbm.py --grid 3 [--drift -0.004,0.016] [--sigma-high 0.10,0.20]
+"""
+
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from generate_price_series import (
+    HIGH_VOL_SIGMA,
+    LOW_VOL_SIGMA,
+    P_SWITCH_TO_HIGH,
+    P_SWITCH_TO_LOW,
+    SCENARIO_DRIFTS,
+    simulate_paths,
+    validate_paths,
+)
+
+REPORTS_DIR = Path(__file__).resolve().parent.parent / "reports"
+
+# Default sweep bounds: calibrated constants sit inside each range, drifts
+# span the bear..bull scenarios with some margin.
+PARAM_RANGES = {
+    "drift": (-0.004, 0.016),
+    "sigma_low": (0.04, 0.10),
+    "sigma_high": (0.10, 0.20),
+    "p_to_high": (0.02, 0.25),
+    "p_to_low": (0.02, 0.25),
+}
+
+DRAWDOWN_THRESHOLDS = (50, 80)         # % drawdowns reported as P(maxDD > x)
+RETURN_PERCENTILES = (1, 5, 50, 95)    # terminal total-return percentiles
+
+
+def latin_hypercube(rng: np.random.Generator, n_samples: int, ranges: dict) -> np.ndarray:
+    """n_samples points, one per stratum in every dimension, scaled to `ranges`."""
+    n_dims = len(ranges)
+    strata = np.argsort(rng.random((n_dims, n_samples)), axis=1).T
+    unit = (strata + rng.random((n_samples, n_dims))) / n_samples
+    low, high = np.array(list(ranges.values())).T
+    return low + unit * (high - low)
+
+
+def grid(levels: int, ranges: dict) -> np.ndarray:
+    """Full factorial grid with `levels` evenly spaced values per parameter."""
+    axes = [np.linspace(lo, hi, levels) for lo, hi in ranges.values()]
+    return np.array(list(itertools.product(*axes)))
+
+
+def sweep_point(index: int, point: np.ndarray, seed: int, n_paths: int, ticks: int,
+                initial_price: float) -> dict:
+    """Simulate one parameter point and reduce the ensemble to tail metrics."""
+    drift, sigma_low, sigma_high, p_to_high, p_to_low = (float(v) for v in point)
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    prices, regimes = simulate_paths(rng, n_paths, ticks, initial_price, drift,
+                                     sigma_low, sigma_high, p_to_high, p_to_low)
+    stats = validate_paths(prices, regimes, initial_price)
+
+    drawdown = stats["maxDrawdownPct"]
+    total_return = stats["totalReturnPct"]
+    row = {
+        "point": index,
+        "drift": drift,
+        "sigma_low": sigma_low,
+        "sigma_high": sigma_high,
+        "p_to_high": p_to_high,
+        "p_to_low": p_to_low,
+    }
+    for threshold in DRAWDOWN_THRESHOLDS:
+        row[f"pDrawdown{threshold}"] = float(np.mean(drawdown > threshold))
+    row["pLoss"] = float(np.mean(total_return < 0))
+    for p, value in zip(RETURN_PERCENTILES, np.percentile(total_return, RETURN_PERCENTILES)):
+        row[f"returnP{p}"] = float(value)
+    row["cagrP50"] = float(np.median(stats["annualizedCAGR"]))
+    row["maxDrawdownP50"] = float(np.median(drawdown))
+    row["maxDrawdownP95"] = float(np.percentile(drawdown, 95))
+    return row
+
+
+def run_sweep(points: np.ndarray, seed: int, n_paths: int, ticks: int, initial_price: float,
+              workers: int = 0) -> pd.DataFrame:
+    """Evaluate every point (0 workers = one per CPU); each point has its own seed stream,
+    so results do not depend on the worker count."""
+    point_fn = partial(sweep_point, seed=seed, n_paths=n_paths, ticks=ticks, initial_price=initial_price)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(points) <= 1:
+        rows = list(map(point_fn, range(len(points)), points))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(points))) as executor:
+            chunksize = max(1, len(points) // (4 * workers))
+            rows = list(executor.map(point_fn, range(len(points)), points, chunksize=chunksize))
+    return pd.DataFrame(rows)
+
+
+def _parse_range(text: str) -> tuple[float, float]:
+    lo, hi = (float(v) for v in text.split(","))
+    if hi < lo:
+        raise argparse.ArgumentTypeError(f"range {text} has min > max")
+    return lo, hi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress-test sweep over regime-switching GBM parameters")
+    parser.add_argument("--samples", type=int, default=256, help="Latin-hypercube sample count")
+    parser.add_argument("--grid", type=int, default=0, metavar="LEVELS",
+                        help="Use a full grid with LEVELS values per parameter instead of a Latin hypercube")
+    parser.add_argument("--paths", type=int, default=2000, help="Monte Carlo paths per point")
+    parser.add_argument("--ticks", type=int, default=320)
+    parser.add_argument("--initial-price", type=float, default=60_000.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 = one per CPU)")
+    parser.add_argument("--top", type=int, default=10, help="Harshest points printed (by P(drawdown > 80%%))")
+    parser.add_argument("--output", type=str, default=str(REPORTS_DIR / "gbm_sweep.csv"))
+    for name, (lo, hi) in PARAM_RANGES.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=_parse_range, default=(lo, hi),
+                            metavar="MIN,MAX", help=f"Range for {name} (default {lo},{hi})")
+    args = parser.parse_args()
+
+    ranges = {name: getattr(args, name) for name in PARAM_RANGES}
+    if args.grid:
+        points = grid(args.grid, ranges)
+        design = f"grid {args.grid}^{len(ranges)}"
+    else:
+        points = latin_hypercube(np.random.default_rng(args.seed), args.samples, ranges)
+        design = "Latin hypercube"
+
+    print(f"=== GBM SWEEP: {len(points)} points ({design}) x {args.paths} paths x {args.ticks} ticks, "
+          f"seed {args.seed} ===")
+    print(f"Calibrated: drift={SCENARIO_DRIFTS['bull']:.6f} σ_low={LOW_VOL_SIGMA:.4f} σ_high={HIGH_VOL_SIGMA:.4f} "
+          f"p_to_high={P_SWITCH_TO_HIGH:.4f} p_to_low={P_SWITCH_TO_LOW:.4f}")
+
+    results = run_sweep(points, args.seed, args.paths, args.ticks, args.initial_price, args.workers)
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    results.to_csv(output_path, index=False, float_format="%.6g")
+
+    harshest = results.sort_values(["pDrawdown80", "returnP5"], ascending=[False, True]).head(args.top)
+    columns = ["point", *PARAM_RANGES, "pDrawdown80", "pLoss", "returnP5", "returnP50", "maxDrawdownP95"]
+    print(f"\nHarshest {len(harshest)} points by P(drawdown > 80%):")
+    print(harshest[columns].to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    print(f"\nCSV: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
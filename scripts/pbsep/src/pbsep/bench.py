@@ -0,0 +1,504 @@
+"""Benchmark and golden-output regression suite for pbsep stages."""
+
+import hashlib
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import click
+import cv2
+import numpy as np
+
+from pbsep.instrument import StageInstrument
+from pbsep.pipeline import PBSEP256Pipeline
+from pbsep.profiles import load_profile
+from pbsep.stages import (
+    apply_morphological_correction,
+    binarize,
+    downscale,
+    enhance_local_contrast,
+    export_outputs,
+    extract_luminance,
+    normalize_input,
+    vectorize_bitmap,
+)
+from pbsep.stages.export import pack_bitmap
+from pbsep.types import ContrastParams, PipelineConfig, ProfileConfig
+
+# Synthetic input sizes (square, RGB)
+SIZES = {"1k": 1024, "4k": 4096, "8k": 8192}
+
+# Golden .bin hashes, keyed "profile/input/target" (e.g. "medallion/1k/256")
+GOLDEN_PATH = Path(__file__).with_name("bench_golden.json")
+GOLDEN_PROFILES = ("medallion", "medallion_filled")
+
+# Import-time budget: module -> heavy dependencies it must not load eagerly
+IMPORT_FORBIDDEN = {
+    "pbsep.cli": ("cv2", "numpy", "skimage", "scipy", "yaml"),
+    "pbsep.profiles": ("cv2", "numpy", "skimage", "scipy"),
+    "pbsep.pipeline": ("skimage", "scipy"),
+}
+DEFAULT_IMPORT_BUDGET_MS = 250.0  # cumulative import time of pbsep.cli
+
+
+@dataclass
+class GoldenCheck:
+    """Outcome of one golden-hash comparison."""
+
+    key: str
+    variant: str  # "default", "fused", "packed" or "export"
+    digest: str
+    expected: str | None
+
+    @property
+    def status(self) -> str:
+        if self.expected is None:
+            return "missing"
+        return "ok" if self.digest == self.expected else "MISMATCH"
+
+
+def synthetic_image(size: int, seed: int = 0) -> np.ndarray:
+    """
+    Deterministic synthetic RGB test image.
+
+    Built from integer arithmetic, OpenCV primitives and PCG64 integers
+    only, so pixels are identical across platforms and NumPy builds.
+    Content is laid out relative to ``size``, so every resolution shows
+    the same scene: gradients, concentric rings, filled and outlined
+    shapes (edges for the binarizers) and low-amplitude noise.
+
+    Args:
+        size: Image dimension in pixels
+        seed: Random seed for shape placement and noise
+
+    Returns:
+        RGB image as uint8 numpy array (size, size, 3)
+    """
+    rng = np.random.default_rng(seed)
+    coords = np.arange(size, dtype=np.int64)
+
+    image = np.empty((size, size, 3), dtype=np.uint8)
+    image[:, :, 0] = ((coords[None, :] * 255) // size).astype(np.uint8)
+    image[:, :, 1] = ((coords[:, None] * 255) // size).astype(np.uint8)
+
+    # Concentric rings around the centre (integer squared distance)
+    offset = coords - size // 2
+    ring_width = max(size * size // 256, 1)
+    rings = (offset[:, None] ** 2 + offset[None, :] ** 2) // ring_width
+    image[:, :, 2] = ((rings % 8) * 32).astype(np.uint8)
+    del rings
+
+    for _ in range(48):
+        center = tuple(int(v) for v in rng.integers(0, size, 2))
+        radius = int(rng.integers(size // 64, size // 8))
+        color = tuple(int(v) for v in rng.integers(0, 256, 3))
+        thickness = -1 if rng.integers(0, 2) else max(size // 256, 1)
+        if rng.integers(0, 2):
+            cv2.circle(image, center, radius, color, thickness, cv2.LINE_8)
+        else:
+            corner = (center[0] + radius, center[1] + radius)
+            cv2.rectangle(image, center, corner, color, thickness, cv2.LINE_8)
+
+    noise = rng.integers(0, 16, size=(size, size, 1), dtype=np.uint8)
+    cv2.add(image, np.broadcast_to(noise, image.shape).copy(), dst=image)
+    return image
+
+
+def bench_stages(
+    image: np.ndarray,
+    profile: ProfileConfig,
+    size: int,
+    repeat: int,
+    trace_memory: bool = False,
+) -> dict[str, dict]:
+    """
+    Time each pipeline stage on an in-memory image.
+
+    Stages that shell out (vectorize_bitmap needs potrace, export_outputs
+    needs potrace and magick) are skipped when the tool is not installed.
+
+    Args:
+        image: Input RGB image as uint8
+        profile: Profile whose stage params to use
+        size: Target size (128 or 256)
+        repeat: Number of timed runs per stage
+        trace_memory: Also record peak allocated bytes per stage
+
+    Returns:
+        Mapping of stage name to summary (min/median wall ms, median CPU
+        ms, output shape, and peak MB when tracing memory)
+    """
+    stages = profile.stages
+    contrast_params = stages.contrast or ContrastParams()
+    has_potrace = shutil.which("potrace") is not None
+    has_magick = shutil.which("magick") is not None
+
+    runs: list[list[dict]] = []
+    with tempfile.TemporaryDirectory(prefix="pbsep-bench-") as tmp:
+        for _ in range(repeat):
+            instrument = StageInstrument(trace_memory=trace_memory)
+            stage = instrument.call
+
+            normalized = stage("normalize_input", normalize_input, image, stages.normalize)
+            luminance = stage("extract_luminance", extract_luminance, normalized, stages.luminance)
+            del normalized
+            contrasted = stage(
+                "enhance_local_contrast", enhance_local_contrast, luminance, contrast_params
+            )
+            lum_input = contrasted if stages.contrast is not None else luminance
+            scaled = stage("downscale", downscale, lum_input, size, stages.downscale)
+            del luminance, contrasted, lum_input
+            binary = stage("binarize", binarize, scaled, stages.binarize)
+            corrected = stage(
+                "apply_morphological_correction",
+                apply_morphological_correction,
+                binary,
+                stages.morphology,
+            )
+            stage(
+                "apply_morphological_correction[packed]",
+                apply_morphological_correction,
+                binary,
+                replace(stages.morphology, engine="packed"),
+            )
+            if has_potrace:
+                stage("vectorize_bitmap", vectorize_bitmap, corrected, size, True)
+            if has_potrace and has_magick:
+                with instrument.stage("export_outputs"):
+                    export_outputs(corrected, Path(tmp), "bench", size, True, {})
+            runs.append(instrument.records)
+
+    summary: dict[str, dict] = {}
+    for name in [r["stage"] for r in runs[0]]:
+        records = [r for run in runs for r in run if r["stage"] == name]
+        walls = [r["wallMs"] for r in records]
+        entry = {
+            "minMs": min(walls),
+            "medianMs": round(statistics.median(walls), 3),
+            "cpuMs": round(statistics.median(r["cpuMs"] for r in records), 3),
+        }
+        if "shape" in records[0]:
+            entry["shape"] = records[0]["shape"]
+        if trace_memory:
+            entry["peakMB"] = round(max(r["peakBytes"] for r in records) / (1024 * 1024), 1)
+        summary[name] = entry
+
+    if not has_potrace:
+        summary["vectorize_bitmap"] = {"skipped": "potrace not found"}
+    if not (has_potrace and has_magick):
+        summary["export_outputs"] = {"skipped": "potrace/magick not found"}
+    return summary
+
+
+def bench_pipeline(
+    input_path: Path, profile: ProfileConfig, size: int, repeat: int, work_dir: Path
+) -> tuple[dict, bytes]:
+    """
+    Time the full pipeline (including export) on an image file.
+
+    Returns:
+        Tuple of (timing summary, .bin bytes written by the last run)
+    """
+    config = PipelineConfig(
+        input_path=input_path,
+        output_name="bench",
+        output_dir=work_dir,
+        size=size,
+        profile_name=profile.name,
+        invert=True,
+    )
+    times = [PBSEP256Pipeline(config, profile).execute().processing_time_ms for _ in range(repeat)]
+    bin_bytes = (work_dir / f"bench_{size}x{size}.bin").read_bytes()
+    summary = {"minMs": round(min(times), 3), "medianMs": round(statistics.median(times), 3)}
+    return summary, bin_bytes
+
+
+def render_bin(input_path: Path, profile: ProfileConfig, size: int) -> bytes:
+    """Compute the on-chain .bin bytes for an image in memory (no export tools)."""
+    config = PipelineConfig(
+        input_path=input_path,
+        output_name="bench",
+        output_dir=input_path.parent,
+        size=size,
+        profile_name=profile.name,
+        invert=True,
+    )
+    binary, _ = PBSEP256Pipeline(config, profile).render()
+    return pack_bitmap(binary, True)  # execute() always exports inverted
+
+
+def load_golden(path: Path = GOLDEN_PATH) -> dict[str, str]:
+    """Load golden hashes ({} if the file does not exist yet)."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())["hashes"]
+
+
+def save_golden(hashes: dict[str, str], path: Path = GOLDEN_PATH) -> None:
+    """Write golden hashes, sorted for stable diffs."""
+    payload = {
+        "note": "sha256 of .bin output for synthetic_image(seed=0); "
+        "regenerate with `pbsep-bench --update-golden` only for intended changes",
+        "hashes": dict(sorted(hashes.items())),
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def check_golden(
+    input_path: Path, label: str, size: int, golden: dict[str, str]
+) -> list[GoldenCheck]:
+    """
+    Verify .bin output for every golden profile against stored hashes.
+
+    Each profile is also run with the fused luminance path and the packed
+    morphology engine, which must produce the same bitmap as the default.
+    """
+    checks = []
+    for profile_name in GOLDEN_PROFILES:
+        profile = load_profile(profile_name)
+        stages = profile.stages
+        variants = (
+            ("default", profile),
+            ("fused", replace(
+                profile,
+                stages=replace(stages, luminance=replace(stages.luminance, fused=True)),
+            )),
+            ("packed", replace(
+                profile,
+                stages=replace(stages, morphology=replace(stages.morphology, engine="packed")),
+            )),
+        )
+        key = f"{profile_name}/{label}/{size}"
+        for variant, variant_profile in variants:
+            digest = hashlib.sha256(render_bin(input_path, variant_profile, size)).hexdigest()
+            checks.append(GoldenCheck(key, variant, digest, golden.get(key)))
+    return checks
+
+
+def check_imports(module: str) -> tuple[float, list[str]]:
+    """
+    Import a module in a fresh interpreter under ``-X importtime``.
+
+    Returns:
+        Tuple of (cumulative import time in ms, forbidden heavy modules
+        that were loaded)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative_us = 0
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not cumulative.isdigit():
+            continue  # header line
+        loaded.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(cumulative)
+
+    forbidden = sorted(m for m in IMPORT_FORBIDDEN.get(module, ()) if m in loaded)
+    return cumulative_us / 1000, forbidden
+
+
+def _format_stage(name: str, entry: dict) -> str:
+    """Format one stage summary line."""
+    if "skipped" in entry:
+        return f"    {name:<40} skipped ({entry['skipped']})"
+    line = (
+        f"    {name:<40} {entry['minMs']:9.1f}ms min {entry['medianMs']:9.1f}ms median "
+        f"{entry['cpuMs']:9.1f}ms cpu"
+    )
+    if "peakMB" in entry:
+        line += f" {entry['peakMB']:8.1f}MB peak"
+    return line
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default="1k,4k",
+    show_default=True,
+    help=f"Comma-separated synthetic input sizes ({', '.join(SIZES)})",
+)
+@click.option(
+    "--size",
+    type=click.Choice(["128", "256"]),
+    default="256",
+    help="Output size (128x128 or 256x256)",
+)
+@click.option("--profile", default="medallion", show_default=True, help="Profile to time")
+@click.option("--repeat", type=click.IntRange(min=1), default=3, show_default=True)
+@click.option(
+    "--trace-memory",
+    is_flag=True,
+    default=False,
+    help="Record peak allocated bytes per stage (tracemalloc; slower)",
+)
+@click.option(
+    "--golden/--no-golden",
+    default=True,
+    help="Verify .bin output against stored golden hashes",
+)
+@click.option(
+    "--update-golden",
+    is_flag=True,
+    default=False,
+    help="Store current .bin hashes as the new goldens (intended output changes only)",
+)
+@click.option(
+    "--imports/--no-imports",
+    default=True,
+    help="Check that CLI and profile imports stay light and within budget",
+)
+@click.option(
+    "--import-budget-ms",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_IMPORT_BUDGET_MS,
+    show_default=True,
+    help="Maximum cumulative import time of pbsep.cli",
+)
+@click.option(
+    "--json",
+    "json_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write benchmark results as JSON",
+)
+def main(
+    sizes: str,
+    size: str,
+    profile: str,
+    repeat: int,
+    trace_memory: bool,
+    golden: bool,
+    update_golden: bool,
+    imports: bool,
+    import_budget_ms: float,
+    json_path: Path | None,
+) -> None:
+    """Benchmark pbsep stages on synthetic images and verify golden outputs."""
+    labels = [label.strip() for label in sizes.split(",") if label.strip()]
+    unknown = [label for label in labels if label not in SIZES]
+    if unknown:
+        raise click.BadParameter(f"Unknown size(s): {', '.join(unknown)}", param_hint="--sizes")
+
+    target = int(size)
+    profile_config = load_profile(profile)
+    stored = load_golden()
+    hashes = dict(stored)
+    results: dict[str, dict] = {}
+    checks: list[GoldenCheck] = []
+    run_pipeline = shutil.which("potrace") is not None and shutil.which("magick") is not None
+    import_failures: list[str] = []
+
+    if imports:
+        click.echo("imports:")
+        for module in IMPORT_FORBIDDEN:
+            elapsed_ms, forbidden = check_imports(module)
+            status = "ok"
+            if forbidden:
+                status = f"FAIL (loads {', '.join(forbidden)})"
+            elif module == "pbsep.cli" and elapsed_ms > import_budget_ms:
+                status = f"FAIL (over {import_budget_ms:.0f}ms budget)"
+            if status != "ok":
+                import_failures.append(f"{module} {status}")
+            click.echo(f"    {module:<40} {elapsed_ms:9.1f}ms {status}")
+
+    for label in labels:
+        dim = SIZES[label]
+        click.echo(f"{label} ({dim}x{dim} -> {target}x{target}, profile {profile}):")
+        image = synthetic_image(dim)
+
+        with tempfile.TemporaryDirectory(prefix="pbsep-bench-") as tmp:
+            work_dir = Path(tmp)
+            input_path = work_dir / f"synthetic_{label}.png"
+            cv2.imwrite(
+                str(input_path),
+                cv2.cvtColor(image, cv2.COLOR_RGB2BGR),
+                [cv2.IMWRITE_PNG_COMPRESSION, 1],
+            )
+
+            stage_summary = bench_stages(image, profile_config, target, repeat, trace_memory)
+            del image
+            for name, entry in stage_summary.items():
+                click.echo(_format_stage(name, entry))
+
+            entry = {"stages": stage_summary}
+            if run_pipeline:
+                pipeline_summary, bin_bytes = bench_pipeline(
+                    input_path, profile_config, target, repeat, work_dir
+                )
+                entry["pipeline"] = pipeline_summary
+                click.echo(
+                    f"    {'pipeline':<40} {pipeline_summary['minMs']:9.1f}ms min "
+                    f"{pipeline_summary['medianMs']:9.1f}ms median"
+                )
+            else:
+                click.echo(f"    {'pipeline':<40} skipped (potrace/magick not found)")
+            results[label] = entry
+
+            if golden or update_golden:
+                label_checks = check_golden(input_path, label, target, stored)
+                if run_pipeline and profile in GOLDEN_PROFILES:
+                    key = f"{profile}/{label}/{target}"
+                    digest = hashlib.sha256(bin_bytes).hexdigest()
+                    label_checks.append(GoldenCheck(key, "export", digest, stored.get(key)))
+                for check in label_checks:
+                    click.echo(f"    golden {check.key:<33} {check.variant:<8} {check.status}")
+                    if check.variant == "default":
+                        hashes[check.key] = check.digest
+                checks.extend(label_checks)
+
+    if json_path:
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "profile": profile,
+            "size": target,
+            "repeat": repeat,
+            "results": results,
+            "golden": [
+                {"key": c.key, "variant": c.variant, "sha256": c.digest, "status": c.status}
+                for c in checks
+            ],
+        }
+        json_path.write_text(json.dumps(payload, indent=2))
+        click.echo(f"\nResults: {json_path}")
+
+    if update_golden:
+        # Variants must agree with each other even when rewriting goldens
+        diverged = sorted({c.key for c in checks if c.digest != hashes[c.key]})
+        if diverged:
+            raise click.ClickException(f"Variants disagree, goldens not updated: {diverged}")
+        save_golden(hashes)
+        click.echo(f"\nUpdated golden hashes: {GOLDEN_PATH}")
+        return
+
+    failed = [c for c in checks if c.status == "MISMATCH"]
+    if failed:
+        raise click.ClickException(
+            "Golden output mismatch: "
+            + ", ".join(f"{c.key} ({c.variant})" for c in failed)
+        )
+    if import_failures:
+        raise click.ClickException("Import budget exceeded: " + "; ".join(import_failures))
+    missing = sorted({c.key for c in checks if c.status == "missing"})
+    if missing:
+        raise click.ClickException(
+            f"No golden hash for {', '.join(missing)}; record it with --update-golden"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Bit-packed binary images: 1 bit per pixel, MSB-first rows."""
+
+import numpy as np
+
+# Population count of every byte value (fallback for NumPy < 2.0)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class PackedBinary:
+    """
+    Binary image stored 1 bit per pixel.
+
+    Rows are packed MSB-first into bytes, exactly like ``np.packbits(...,
+    axis=1)`` and the PBM P4 raster, so for widths that are a multiple of 8
+    the buffer is also the ``.bin`` layout and can be handed out without
+    copying. Morphology works on whole words with bit shifts, touching 8x
+    less memory than 0/255 uint8 images.
+
+    Set bits are pixels > 127 in the source image. Padding bits past
+    ``width`` in the last byte of a row are always zero.
+    """
+
+    def __init__(self, rows: np.ndarray, width: int):
+        """
+        Initialize from packed rows.
+
+        Args:
+            rows: uint8 array (height, ceil(width / 8)), MSB-first
+            width: Image width in pixels
+        """
+        if rows.dtype != np.uint8 or rows.ndim != 2 or rows.shape[1] != (width + 7) // 8:
+            raise ValueError(f"Packed rows of shape {rows.shape} do not match width {width}")
+        self.rows = rows
+        self.width = width
+
+    @classmethod
+    def from_array(cls, binary: np.ndarray) -> "PackedBinary":
+        """Pack a uint8 (0 or 255) image; pixels > 127 become set bits."""
+        return cls(np.packbits(binary > 127, axis=1), binary.shape[1])
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.rows.shape[0], self.width
+
+    def to_array(self) -> np.ndarray:
+        """Unpack to a uint8 (0 or 255) image."""
+        bits = np.unpackbits(self.rows, axis=1, count=self.width)
+        return bits * np.uint8(255)
+
+    def count(self) -> int:
+        """Number of set pixels (population count)."""
+        if hasattr(np, "bitwise_count"):
+            return int(np.bitwise_count(self.rows).sum(dtype=np.int64))
+        return int(_POPCOUNT[self.rows].sum(dtype=np.int64))
+
+    def raster(self) -> memoryview:
+        """
+        Packed rows as bytes without copying.
+
+        This is the PBM P4 raster, and for widths that are a multiple of 8
+        also the ``.bin`` layout (set bits = foreground).
+        """
+        return memoryview(np.ascontiguousarray(self.rows)).cast("B")
+
+    def invert(self) -> "PackedBinary":
+        """Complement every pixel (padding bits stay zero)."""
+        return PackedBinary(np.bitwise_not(self.rows) & self._row_mask(), self.width)
+
+    def dilate(self, kernel: np.ndarray, iterations: int = 1) -> "PackedBinary":
+        """
+        Dilate with a structuring element, matching ``cv2.dilate``.
+
+        Pixels outside the image count as unset (OpenCV's default border).
+        """
+        rows = self.rows
+        for _ in range(iterations):
+            rows = self._apply(rows, kernel, fill=0)
+        return PackedBinary(rows, self.width)
+
+    def erode(self, kernel: np.ndarray, iterations: int = 1) -> "PackedBinary":
+        """
+        Erode with a structuring element, matching ``cv2.erode``.
+
+        Pixels outside the image count as set (OpenCV's default border).
+        """
+        rows = self.rows
+        for _ in range(iterations):
+            rows = self._apply(rows, kernel, fill=1)
+        return PackedBinary(rows, self.width)
+
+    def _row_mask(self) -> np.ndarray:
+        """Per-byte mask with padding bits past ``width`` cleared."""
+        mask = np.full(self.rows.shape[1], 0xFF, dtype=np.uint8)
+        tail = self.width % 8
+        if tail:
+            mask[-1] = (0xFF << (8 - tail)) & 0xFF
+        return mask
+
+    def _apply(self, rows: np.ndarray, kernel: np.ndarray, fill: int) -> np.ndarray:
+        """
+        One dilation (fill=0, OR) or erosion (fill=1, AND) pass.
+
+        ``cv2`` reads src(x + i - anchor_x, y + j - anchor_y) for every
+        nonzero kernel[j, i], with the anchor at the kernel centre. Each
+        kernel row is a horizontal OR/AND of bit-shifted rows (shared by
+        kernel rows with the same pattern), combined in place at its
+        vertical offset. Out-of-image pixels read as ``fill``, which is
+        the identity of the combining operation, so they can be skipped.
+        """
+        if not kernel.any():  # empty kernel: nothing to combine
+            return rows.copy()
+
+        mask = self._row_mask()
+        if fill:
+            rows = rows | np.bitwise_not(mask)  # row padding reads as outside
+
+        # Work on 64-bit words when rows allow it (8x fewer elements); the
+        # big-endian view keeps MSB-first bit order continuous across bytes
+        wide = rows.shape[1] % 8 == 0
+        words = rows.view(">u8").astype(np.uint64) if wide else rows
+        bits = 64 if wide else 8
+
+        height = words.shape[0]
+        anchor_y, anchor_x = kernel.shape[0] // 2, kernel.shape[1] // 2
+        combine = np.bitwise_and if fill else np.bitwise_or
+
+        result = np.zeros_like(words)
+        if fill:
+            np.bitwise_not(result, out=result)
+        horizontal: dict[tuple[int, ...], np.ndarray] = {}
+        for j in range(kernel.shape[0]):
+            offsets = tuple(int(i) - anchor_x for i in np.flatnonzero(kernel[j]))
+            if not offsets:
+                continue
+            if offsets not in horizontal:
+                combined = _shift(words, offsets[0], fill, bits)
+                for dx in offsets[1:]:
+                    combine(combined, _shift(words, dx, fill, bits), out=combined)
+                horizontal[offsets] = combined
+            source = horizontal[offsets]
+
+            dy = j - anchor_y
+            if abs(dy) >= height:
+                continue  # reads only rows outside the image
+            if dy >= 0:
+                target = result[: height - dy]
+                combine(target, source[dy:], out=target)
+            else:
+                target = result[-dy:]
+                combine(target, source[: height + dy], out=target)
+
+        if wide:
+            result = result.astype(">u8").view(np.uint8)
+        result &= mask
+        return result
+
+
+def _shift(words: np.ndarray, dx: int, fill: int, bits: int) -> np.ndarray:
+    """
+    Horizontally shifted copy of packed rows: result pixel x = source x + dx.
+
+    Rows are MSB-first unsigned words of ``bits`` bits. Pixels shifted in
+    from outside the row read as ``fill``.
+    """
+    if dx == 0:
+        return words.copy()
+
+    height, nwords = words.shape
+    fill_word = np.bitwise_not(words.dtype.type(0)) if fill else words.dtype.type(0)
+
+    # Whole words, then a bit shift carrying from the neighbouring word
+    q, r = divmod(abs(dx), bits)
+    pad = np.full((height, q + 1), fill_word, dtype=words.dtype)
+    if dx > 0:
+        # Pixel x + dx: word k + q, next bits from word k + q + 1
+        padded = np.concatenate([words, pad], axis=1)
+        hi = padded[:, q:q + nwords]
+        if r == 0:
+            return hi.copy()
+        lo = padded[:, q + 1:q + 1 + nwords]
+        return (hi << r) | (lo >> (bits - r))
+
+    # Pixel x - |dx|: word k - q, previous bits from word k - q - 1
+    padded = np.concatenate([pad, words], axis=1)
+    hi = padded[:, 1:1 + nwords]
+    if r == 0:
+        return hi.copy()
+    lo = padded[:, :nwords]
+    return (hi >> r) | (lo << (bits - r))
+
+
+class PackedBitmap:
+    """
+    Foreground mask packed 1 bit per pixel, with polarity decided once.
+
+    Set bits are foreground. Rows are MSB-first and padded to whole
+    bytes, which is both the PBM P4 raster potrace reads and (for widths
+    that are a multiple of 8) the on-chain ``.bin`` layout. The buffer is
+    exposed as a read-only memoryview, so export, vectorization and the
+    Solidity generator all consume the same bytes without copying.
+    """
+
+    def __init__(self, buffer, width: int, height: int):
+        """
+        Initialize from a packed raster.
+
+        Args:
+            buffer: Bytes-like object, ``height`` rows of ceil(width / 8) bytes
+            width: Image width in pixels
+            height: Image height in pixels
+        """
+        data = memoryview(buffer).cast("B")
+        if len(data) != height * ((width + 7) // 8):
+            raise ValueError(f"Packed buffer of {len(data)} bytes does not match {width}x{height}")
+        self.data = data.toreadonly()
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def from_binary(cls, binary: np.ndarray, invert: bool = False) -> "PackedBitmap":
+        """
+        Pack a uint8 (0 or 255) image.
+
+        Args:
+            binary: Binary image as uint8 (0 or 255)
+            invert: If True, light areas become foreground
+        """
+        foreground = binary > 127 if invert else binary < 128
+        height, width = binary.shape
+        return cls(np.packbits(foreground, axis=1), width, height)
+
+    @classmethod
+    def from_packed(cls, packed: PackedBinary, invert: bool = False) -> "PackedBitmap":
+        """Wrap a PackedBinary (set bits are light pixels), copying only if not inverted."""
+        source = packed if invert else packed.invert()
+        height, width = packed.shape
+        return cls(source.raster(), width, height)
+
+    @classmethod
+    def from_image(cls, binary: "np.ndarray | PackedBinary", invert: bool = False) -> "PackedBitmap":
+        """Pack a uint8 (0 or 255) image, or wrap an already packed one."""
+        if isinstance(binary, PackedBinary):
+            return cls.from_packed(binary, invert)
+        return cls.from_binary(binary, invert)
+
+    def bin_bytes(self) -> memoryview:
+        """
+        On-chain ``.bin`` layout: row-major, MSB-first, no row padding.
+
+        Zero-copy when the width is a multiple of 8 (128 and 256 always are).
+        """
+        if self.width % 8 == 0:
+            return self.data
+        rows = np.frombuffer(self.data, dtype=np.uint8).reshape(self.height, -1)
+        bits = np.unpackbits(rows, axis=1, count=self.width)
+        return memoryview(np.packbits(bits.ravel())).toreadonly()
+
+    def pbm_header(self) -> bytes:
+        """PBM P4 header; the raster that follows it is ``data``."""
+        return f"P4\n{self.width} {self.height}\n".encode()
+
+    def hex(self) -> str:
+        """Hex encoding of the ``.bin`` bytes (as in Solidity hex literals)."""
+        return self.bin_bytes().hex()
+
+    def __len__(self) -> int:
+        return len(self.bin_bytes())
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.bin_bytes())
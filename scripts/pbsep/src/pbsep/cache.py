@@ -0,0 +1,143 @@
+"""Content-addressed on-disk cache for intermediate stage arrays."""
+
+import hashlib
+import os
+import tempfile
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB
+
+# A cached step: (stage params, function mapping previous output -> new output).
+# The first step receives None and is responsible for loading its own input.
+CacheStep = tuple[object, Callable[[np.ndarray | None], np.ndarray]]
+
+
+def hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    Stage output cache keyed by (input file hash, stage params chain).
+
+    Entries are float32 ``.npy`` files loaded back as read-only memory maps,
+    so cached prefixes are reused without copying. Total size is capped at
+    ``max_bytes`` with least-recently-used eviction (a cache hit refreshes
+    the entry's mtime).
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize cache.
+
+        Args:
+            root: Cache directory (created if missing)
+            max_bytes: Size cap for all cached entries
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def key(self, input_hash: str, chain: Sequence[object]) -> str:
+        """
+        Derive the cache key for a stage output.
+
+        Stage params are frozen dataclasses whose repr is deterministic,
+        so the repr of the chain identifies the computation exactly.
+        """
+        digest = hashlib.sha256(input_hash.encode())
+        for params in chain:
+            digest.update(b"|")
+            digest.update(repr(params).encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.npy"
+
+    def load(self, key: str) -> np.ndarray | None:
+        """Load a cached array as a read-only memory map, or None on miss."""
+        path = self._path(key)
+        try:
+            array = np.load(path, mmap_mode="r")
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted by a concurrent store; the open memory map stays valid
+        return array
+
+    def store(self, key: str, array: np.ndarray) -> None:
+        """Store an array as float32 and evict old entries over the size cap."""
+        path = self._path(key)
+        # A unique temp file per call: worker threads may store the same key
+        # concurrently. Same key means same content, so the last replace wins.
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(array, dtype=np.float32))
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least-recently-used entries until under the size cap."""
+        entries = []
+        for path in self.root.glob("*.npy"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def run_chain(
+        self, input_hash: str, steps: Sequence[CacheStep]
+    ) -> tuple[np.ndarray, int]:
+        """
+        Run a chain of stages, reusing the longest cached prefix.
+
+        Args:
+            input_hash: Content hash of the input file
+            steps: Ordered (params, fn) stage steps
+
+        Returns:
+            Tuple of (final output, number of steps served from cache)
+        """
+        keys = []
+        chain: list[object] = []
+        for params, _ in steps:
+            chain.append(params)
+            keys.append(self.key(input_hash, chain))
+
+        # Find the longest cached prefix
+        output = None
+        start = 0
+        for i in range(len(steps) - 1, -1, -1):
+            output = self.load(keys[i])
+            if output is not None:
+                start = i + 1
+                break
+
+        for i in range(start, len(steps)):
+            _, fn = steps[i]
+            output = fn(output)
+            self.store(keys[i], output)
+
+        return output, start
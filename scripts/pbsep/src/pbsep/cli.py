@@ -1,12 +1,15 @@
 """CLI entry point for PBSEP-256."""
 
+from collections import Counter
+from dataclasses import replace
 from pathlib import Path
 
 import click
 
-from pbsep.pipeline import PBSEP256Pipeline
-from pbsep.solidity import generate_solidity_library
-from pbsep.types import PipelineConfig, PipelineError, ProfileNotFoundError
+# Only lightweight modules at import time, so `pbsep --help` and argument
+# errors don't pay for cv2/numpy/yaml. Heavy modules load inside main().
+from pbsep.instrument import StageInstrument, write_chrome_trace
+from pbsep.types import PipelineConfig, PipelineError, ProfileError
 
 
 @click.command()
@@ -47,6 +50,61 @@ from pbsep.types import PipelineConfig, PipelineError, ProfileNotFoundError
     default=None,
     help="Reference image for matrix gallery comparison",
 )
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Cache full-resolution stage outputs here for reuse across runs",
+)
+@click.option(
+    "--cache-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Stage cache size cap in MB (least recently used entries are evicted; "
+    "default: 1024)",
+)
+@click.option(
+    "--pyramid",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Area-downsample to N x target size before full-resolution stages "
+    "(0 disables; default: from profile, or off in matrix mode)",
+)
+@click.option(
+    "--pyramid-min-agreement",
+    type=click.FloatRange(0, 100),
+    default=None,
+    help="Quality gate: fail unless pyramid output agrees with the "
+    "full-resolution path on at least this percentage of pixels "
+    "(requires --pyramid or a profile pyramid_factor)",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Worker processes for matrix and search modes (0 = one per CPU core)",
+)
+@click.option(
+    "--search",
+    "search_spec",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Run a parameter-space search described by this YAML spec",
+)
+@click.option(
+    "--trace",
+    "trace_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write per-stage timings as a Chrome trace (chrome://tracing, Perfetto)",
+)
+@click.option(
+    "--trace-memory",
+    is_flag=True,
+    default=False,
+    help="Record peak allocated bytes per stage (tracemalloc; slower)",
+)
 def main(
     input_path: Path,
     output_name: str,
@@ -56,6 +114,14 @@ def main(
     output_dir: Path | None,
     matrix: bool,
     reference: Path | None,
+    cache_dir: Path | None,
+    cache_size: int | None,
+    pyramid: int | None,
+    pyramid_min_agreement: float | None,
+    workers: int,
+    search_spec: Path | None,
+    trace_path: Path | None,
+    trace_memory: bool,
 ) -> None:
     """
     Convert photorealistic image to 1-bit monochrome bitmap.
@@ -71,9 +137,60 @@ def main(
     else:
         output_dir = output_dir.resolve()
 
+    instrument = StageInstrument(trace_memory=trace_memory)
+
+    from pbsep.cache import DEFAULT_MAX_BYTES, StageCache
+    from pbsep.pipeline import PBSEP256Pipeline
+    from pbsep.profiles import load_profile
+    from pbsep.solidity import generate_solidity_library
+
+    # Matrix and search runs build their own stage configs, so options that
+    # only shape a single profile run would be silently ignored there
+    mode = "--matrix" if matrix else "--search" if search_spec else None
+    if mode:
+        ignored = ["--pyramid-min-agreement"] if pyramid_min_agreement is not None else []
+        if search_spec and pyramid is not None:
+            ignored.append("--pyramid")
+        source = click.get_current_context().get_parameter_source("profile")
+        if source is not click.core.ParameterSource.DEFAULT:
+            ignored.append("--profile")
+        if ignored:
+            raise click.UsageError(f"{', '.join(ignored)} cannot be used with {mode}")
+
+    cache = None
+    if cache_dir is not None:
+        max_bytes = cache_size * 1024 * 1024 if cache_size else DEFAULT_MAX_BYTES
+        cache = StageCache(cache_dir.resolve(), max_bytes)
+
+    # Search mode: explore parameter space, write best configs as profiles
+    if search_spec:
+        from pbsep.search import load_search_spec, run_search
+
+        search_dir = output_dir / f"{output_name}_search"
+        try:
+            spec = load_search_spec(search_spec)
+            if reference and spec.reference is None:
+                spec = replace(spec, reference=reference.resolve())
+            click.echo(f"Input: {input_path}")
+            click.echo(f"Target size: {size}x{size}")
+            click.echo(f"Running {spec.strategy} search (budget {spec.budget})...")
+            click.echo(f"Output directory: {search_dir}\n")
+            results = run_search(
+                spec, input_path, search_dir, int(size), workers=workers, cache=cache
+            )
+        except (ValueError, PipelineError, ProfileError) as e:
+            raise click.ClickException(str(e))
+
+        click.echo(f"\nEvaluated {len(results)} configurations")
+        click.echo(f"\nTop {min(spec.top, len(results))} by score:")
+        for rank, r in enumerate(results[:spec.top], start=1):
+            click.echo(f"  #{rank:02d}: score={r.score:.3f}, {r.opacity_pct:5.1f}% - {r.params}")
+        click.echo(f"Profiles and search.json: {search_dir}")
+        return
+
     # Matrix mode: run 20 configurations
     if matrix:
-        from pbsep.gallery import generate_gallery
+        from pbsep.gallery import GalleryWriter
         from pbsep.matrix import run_matrix
 
         matrix_dir = output_dir / f"{output_name}_matrix"
@@ -82,25 +199,47 @@ def main(
         click.echo(f"Running matrix configuration (20 variants)...")
         click.echo(f"Output directory: {matrix_dir}\n")
 
-        try:
-            results = run_matrix(input_path, matrix_dir, output_name, int(size))
-        except PipelineError as e:
-            raise click.ClickException(str(e))
-
         # Copy reference image to matrix directory if provided
         ref_in_dir = None
         if reference:
             import shutil
 
+            matrix_dir.mkdir(parents=True, exist_ok=True)
             ref_in_dir = matrix_dir / reference.name
             shutil.copy(reference, ref_in_dir)
 
-        gallery_path = generate_gallery(results, matrix_dir, ref_in_dir)
+        # Gallery cards are written as each configuration finishes
+        try:
+            with GalleryWriter(matrix_dir, ref_in_dir) as gallery:
+                results = run_matrix(
+                    input_path,
+                    matrix_dir,
+                    output_name,
+                    int(size),
+                    workers=workers,
+                    instrument=instrument,
+                    on_result=gallery.add,
+                    cache=cache,
+                    pyramid_factor=pyramid or 0,
+                )
+        except PipelineError as e:
+            raise click.ClickException(str(e))
+        gallery_path = gallery.gallery_path
+
+        if trace_path:
+            records = instrument.records + [s for r in results for s in r.stages]
+            click.echo(f"Trace: {write_chrome_trace(records, trace_path)}")
 
         click.echo(f"\nGenerated {len(results)} configurations")
         click.echo(f"Gallery: {gallery_path}")
         click.echo(f"Matrix JSON: {matrix_dir / 'matrix.json'}")
 
+        best_counts = Counter(r.encodings["best"] for r in results)
+        click.echo(
+            "Smallest encodings: "
+            + ", ".join(f"{name} x{count}" for name, count in best_counts.most_common())
+        )
+
         # Show top 5 by opacity closest to 17% target
         sorted_by_target = sorted(results, key=lambda r: abs(r.opacity_pct - 17.0))
         click.echo("\nTop 5 closest to 17% target:")
@@ -129,11 +268,25 @@ def main(
 
     # Execute pipeline
     try:
-        pipeline = PBSEP256Pipeline(config)
+        profile_config = load_profile(profile)
+        if pyramid is not None:
+            stages = profile_config.stages
+            profile_config = replace(
+                profile_config,
+                stages=replace(
+                    stages,
+                    downscale=replace(stages.downscale, pyramid_factor=pyramid),
+                ),
+            )
+        pipeline = PBSEP256Pipeline(
+            config,
+            profile_config,
+            cache=cache,
+            pyramid_min_agreement=pyramid_min_agreement,
+            instrument=instrument,
+        )
         result = pipeline.execute()
-    except ProfileNotFoundError as e:
-        raise click.ClickException(str(e))
-    except PipelineError as e:
+    except (ValueError, PipelineError, ProfileError) as e:
         raise click.ClickException(str(e))
 
     # Report results
@@ -143,6 +296,28 @@ def main(
     )
     click.echo(f"Bitmap size: {len(result.bitmap)} bytes")
     click.echo(f"Processing time: {result.processing_time_ms:.1f}ms")
+    if cache is not None:
+        click.echo(f"Cached stages reused: {result.metadata['cachedStages']}")
+    if "pyramidAgreementPct" in result.metadata:
+        click.echo(
+            f"Pyramid agreement: {result.metadata['pyramidAgreementPct']:.2f}% "
+            f"(factor {result.metadata['pyramidFactor']})"
+        )
+
+    click.echo("\nStage timings:")
+    for record in result.metadata["stages"]:
+        line = f"  {record['stage']:<20} {record['wallMs']:9.1f}ms wall {record['cpuMs']:9.1f}ms cpu"
+        if "peakBytes" in record:
+            line += f" {record['peakBytes'] / (1024 * 1024):8.1f}MB peak"
+        click.echo(line)
+    if trace_path:
+        click.echo(f"Trace: {write_chrome_trace(result.metadata['stages'], trace_path)}")
+
+    encodings = result.metadata["encodings"]
+    click.echo(f"\nEncodings (smallest: {encodings['best']}):")
+    for name, stats in encodings.items():
+        if name != "best":
+            click.echo(f"  {name:<10} {stats['bytes']:6d} bytes {stats['decodeSteps']:6d} decode steps")
 
     # Output paths
     svg_path = output_dir / f"{output_name}_{size}x{size}_1bit.svg"
@@ -158,7 +333,7 @@ def main(
     sol_path = output_dir / f"{sol_name}.sol"
     sol_code = generate_solidity_library(
         output_name,
-        result.bitmap,
+        result.packed,
         int(size),
     )
     sol_path.write_text(sol_code)
@@ -0,0 +1,517 @@
+"""Compact encodings for packed bitmaps stored on-chain."""
+
+import numpy as np
+
+# PackBits limits: a header byte covers at most 128 literals or 128 repeats
+MAX_RUN = 128
+
+# Deployment cost model (Shanghai+): code deposit per runtime byte, plus the
+# same bytes paid again as initcode calldata and per-word initcode metering
+CODE_DEPOSIT_GAS = 200
+CALLDATA_ZERO_GAS = 4
+CALLDATA_NONZERO_GAS = 16
+INITCODE_WORD_GAS = 2
+EIP170_CODE_LIMIT = 24_576  # max runtime bytecode per contract
+
+
+def rle_encode(data: bytes) -> bytes:
+    """
+    PackBits run-length encoding.
+
+    Header byte ``n``: 0..127 copies the next n + 1 bytes literally;
+    129..255 repeats the next byte 257 - n times; 128 is never emitted.
+    Runs of 2 or more identical bytes become repeats.
+
+    Args:
+        data: Bytes to encode
+
+    Returns:
+        Encoded bytes
+    """
+    values = np.frombuffer(bytes(data), dtype=np.uint8)
+    if values.size == 0:
+        return b""
+
+    # Run boundaries and lengths
+    starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+    lengths = np.diff(np.append(starts, values.size))
+
+    out = bytearray()
+    literal_start = None
+    for start, length in zip(starts.tolist(), lengths.tolist()):
+        if length == 1:
+            if literal_start is None:
+                literal_start = start
+            continue
+        if literal_start is not None:
+            _emit_literals(out, values, literal_start, start)
+            literal_start = None
+        value = int(values[start])
+        while length > 0:
+            count = min(length, MAX_RUN)
+            if count == 1:
+                out += bytes((0, value))
+            else:
+                out += bytes((257 - count, value))
+            length -= count
+    if literal_start is not None:
+        _emit_literals(out, values, literal_start, values.size)
+    return bytes(out)
+
+
+def _emit_literals(out: bytearray, values: np.ndarray, start: int, stop: int) -> None:
+    """Append literal packets for values[start:stop]."""
+    for offset in range(start, stop, MAX_RUN):
+        chunk = values[offset:min(offset + MAX_RUN, stop)]
+        out.append(chunk.size - 1)
+        out += chunk.tobytes()
+
+
+def rle_decode(data: bytes, length: int | None = None) -> bytes:
+    """
+    Decode PackBits data (inverse of rle_encode).
+
+    Args:
+        data: Encoded bytes
+        length: Expected decoded length (checked if given)
+
+    Returns:
+        Decoded bytes
+
+    Raises:
+        ValueError: On truncated input or length mismatch
+    """
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        n = data[i]
+        i += 1
+        if n < 128:
+            if i + n + 1 > len(data):
+                raise ValueError("Truncated RLE literal packet")
+            out += data[i:i + n + 1]
+            i += n + 1
+        elif n > 128:
+            if i >= len(data):
+                raise ValueError("Truncated RLE repeat packet")
+            out += bytes((data[i],)) * (257 - n)
+            i += 1
+    if length is not None and len(out) != length:
+        raise ValueError(f"RLE decoded to {len(out)} bytes, expected {length}")
+    return bytes(out)
+
+
+def delta_encode(base: bytes, target: bytes) -> bytes:
+    """
+    Encode ``target`` relative to ``base``: RLE of their XOR.
+
+    Near-identical bitmaps XOR to mostly zero bytes, which RLE collapses.
+    """
+    if len(base) != len(target):
+        raise ValueError(f"Delta needs equal lengths, got {len(base)} and {len(target)}")
+    xor = np.bitwise_xor(np.frombuffer(base, np.uint8), np.frombuffer(target, np.uint8))
+    return rle_encode(xor.tobytes())
+
+
+def delta_decode(base: bytes, delta: bytes) -> bytes:
+    """Inverse of delta_encode."""
+    xor = np.frombuffer(rle_decode(delta, len(base)), dtype=np.uint8)
+    return np.bitwise_xor(np.frombuffer(base, np.uint8), xor).tobytes()
+
+
+def similarity(bitmaps: list[bytes]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pairwise byte- and bit-level similarity of equal-length bitmaps.
+
+    Args:
+        bitmaps: Packed bitmaps, all the same length
+
+    Returns:
+        Tuple of (byte similarity, bit similarity), each an (N, N) float
+        array of the fraction of equal bytes / equal bits
+    """
+    if len({len(b) for b in bitmaps}) > 1:
+        raise ValueError("Similarity needs bitmaps of equal length")
+    n = len(bitmaps)
+    if n == 0:
+        return np.zeros((0, 0)), np.zeros((0, 0))
+
+    stack = np.stack([np.frombuffer(b, dtype=np.uint8) for b in bitmaps])
+    length = stack.shape[1]
+    byte_sim = np.ones((n, n))
+    bit_sim = np.ones((n, n))
+    for i in range(n - 1):
+        # One row against all later rows at a time keeps memory at O(N * L)
+        xor = np.bitwise_xor(stack[i + 1:], stack[i])
+        equal_bytes = (xor == 0).sum(axis=1)
+        differing_bits = np.unpackbits(xor, axis=1).sum(axis=1)
+        byte_sim[i, i + 1:] = byte_sim[i + 1:, i] = equal_bytes / max(length, 1)
+        bit_sim[i, i + 1:] = bit_sim[i + 1:, i] = 1 - differing_bits / max(8 * length, 1)
+    return byte_sim, bit_sim
+
+
+def deploy_gas(data: bytes) -> int:
+    """
+    Estimate deployment gas for ``data`` embedded in contract bytecode.
+
+    Counts the code deposit, the initcode calldata carrying it, and
+    initcode word metering. Excludes the fixed 32,000 transaction/create
+    cost and the surrounding function code.
+    """
+    values = np.frombuffer(bytes(data), dtype=np.uint8)
+    zeros = int(np.count_nonzero(values == 0))
+    nonzero = values.size - zeros
+    words = (values.size + 31) // 32
+    return (
+        CODE_DEPOSIT_GAS * values.size
+        + CALLDATA_ZERO_GAS * zeros
+        + CALLDATA_NONZERO_GAS * nonzero
+        + INITCODE_WORD_GAS * words
+    )
+
+
+# Encodings compared by encoding_report, in tie-break order
+ENCODINGS = ("raw", "packbits", "rowRle", "quadtree")
+
+QUADTREE_LEAF = 8  # leaf blocks are 8x8 pixels (8 bytes when stored literally)
+_QT_CLEAR, _QT_SET, _QT_SPLIT, _QT_LITERAL = range(4)
+
+
+def unpack_batch(bitmaps: list, width: int, height: int) -> np.ndarray:
+    """
+    Unpack ``.bin`` bitmaps into a boolean stack.
+
+    Args:
+        bitmaps: Bytes-like ``.bin`` bitmaps (or PackedBitmaps), all width x height
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        Boolean array (N, height, width), True = set bit (foreground)
+    """
+    raw = [bytes(b) for b in bitmaps]
+    if not raw:
+        return np.zeros((0, height, width), dtype=bool)
+    flat = np.frombuffer(b"".join(raw), dtype=np.uint8).reshape(len(raw), -1)
+    bits = np.unpackbits(flat, axis=1, count=width * height)
+    return bits.reshape(len(raw), height, width).astype(bool)
+
+
+def row_rle_encode(bits: np.ndarray) -> bytes:
+    """
+    Row run-length encoding of a binary image.
+
+    Each row is a sequence of run lengths, one byte each, alternating
+    clear/set and starting with clear (a row starting with a set pixel
+    begins with a 0 run). Runs over 255 continue as 255, 0, rest.
+
+    Args:
+        bits: Boolean array (height, width)
+
+    Returns:
+        Encoded bytes
+    """
+    out = bytearray()
+    for lengths in _row_runs(bits[None]):
+        for length in lengths:
+            while length > 255:
+                out += b"\xff\x00"
+                length -= 255
+            out.append(length)
+    return bytes(out)
+
+
+def row_rle_decode(data: bytes, width: int, height: int) -> np.ndarray:
+    """
+    Decode row RLE data (inverse of row_rle_encode).
+
+    Returns:
+        Boolean array (height, width)
+
+    Raises:
+        ValueError: If runs overrun a row or the data is truncated
+    """
+    bits = np.zeros((height, width), dtype=bool)
+    i = 0
+    for y in range(height):
+        x, value = 0, False
+        while x < width:
+            if i >= len(data):
+                raise ValueError("Truncated row RLE data")
+            length = data[i]
+            i += 1
+            if x + length > width:
+                raise ValueError(f"Row RLE run overruns row {y}")
+            bits[y, x:x + length] = value
+            x += length
+            value = not value
+    return bits
+
+
+def _row_runs(stack: np.ndarray) -> list[list[int]]:
+    """Per-row run lengths (clear first) for a boolean stack (N, H, W)."""
+    runs = []
+    for image in stack:
+        for row in image:
+            starts = np.flatnonzero(np.concatenate(([True], row[1:] != row[:-1])))
+            lengths = np.diff(np.append(starts, row.size)).tolist()
+            if row[0]:
+                lengths.insert(0, 0)
+            runs.append(lengths)
+    return runs
+
+
+def quadtree_encode(bits: np.ndarray) -> bytes:
+    """
+    Quadtree encoding with 8x8 leaves and 2-bit node codes.
+
+    The image is padded with clear pixels to a square of side 8 * 2^k.
+    Nodes are visited in preorder (children top-left, top-right,
+    bottom-left, bottom-right) and coded 0 = all clear, 1 = all set,
+    2 = split, 3 = literal 8x8 leaf. Layout: 2-byte big-endian count of
+    code bytes, codes packed four per byte MSB-first, then 8 bytes per
+    literal leaf (rows MSB-first).
+
+    Args:
+        bits: Boolean array (height, width)
+
+    Returns:
+        Encoded bytes
+    """
+    padded = _pad_square(bits[None])
+    levels = _quadtree_levels(padded)
+    codes: list[int] = []
+    literals = bytearray()
+
+    def visit(level: int, y: int, x: int) -> None:
+        any_set, all_set = levels[level][0][0, y, x], levels[level][1][0, y, x]
+        if all_set:
+            codes.append(_QT_SET)
+        elif not any_set:
+            codes.append(_QT_CLEAR)
+        elif level == 0:
+            codes.append(_QT_LITERAL)
+            top, left = y * QUADTREE_LEAF, x * QUADTREE_LEAF
+            block = padded[0, top:top + QUADTREE_LEAF, left:left + QUADTREE_LEAF]
+            literals.extend(np.packbits(block, axis=1).tobytes())
+        else:
+            codes.append(_QT_SPLIT)
+            for dy, dx in ((0, 0), (0, 1), (1, 0), (1, 1)):
+                visit(level - 1, 2 * y + dy, 2 * x + dx)
+
+    visit(len(levels) - 1, 0, 0)
+    code_bits = np.array(
+        [[(code >> 1) & 1, code & 1] for code in codes], dtype=np.uint8
+    ).ravel()
+    packed_codes = np.packbits(code_bits).tobytes()
+    return len(packed_codes).to_bytes(2, "big") + packed_codes + bytes(literals)
+
+
+def quadtree_decode(data: bytes, width: int, height: int) -> np.ndarray:
+    """
+    Decode quadtree data (inverse of quadtree_encode).
+
+    Returns:
+        Boolean array (height, width)
+
+    Raises:
+        ValueError: If the data is truncated
+    """
+    side = _quadtree_side(width, height)
+    code_bytes = int.from_bytes(data[:2], "big")
+    code_bits = np.unpackbits(np.frombuffer(data[2:2 + code_bytes], dtype=np.uint8))
+    codes = (code_bits[0::2] << 1 | code_bits[1::2]).tolist()
+    literal_offset = 2 + code_bytes
+    bits = np.zeros((side, side), dtype=bool)
+    state = {"code": 0, "literal": literal_offset}
+
+    def visit(block: int, y: int, x: int) -> None:
+        if state["code"] >= len(codes):
+            raise ValueError("Truncated quadtree codes")
+        code = codes[state["code"]]
+        state["code"] += 1
+        if code == _QT_SET:
+            bits[y:y + block, x:x + block] = True
+        elif code == _QT_LITERAL:
+            start = state["literal"]
+            leaf = np.frombuffer(data[start:start + QUADTREE_LEAF], dtype=np.uint8)
+            if leaf.size != QUADTREE_LEAF:
+                raise ValueError("Truncated quadtree literal")
+            bits[y:y + block, x:x + block] = np.unpackbits(leaf[:, None], axis=1).astype(bool)
+            state["literal"] = start + QUADTREE_LEAF
+        elif code == _QT_SPLIT:
+            half = block // 2
+            for dy, dx in ((0, 0), (0, half), (half, 0), (half, half)):
+                visit(half, y + dy, x + dx)
+
+    visit(side, 0, 0)
+    return bits[:height, :width]
+
+
+def _quadtree_side(width: int, height: int) -> int:
+    """Side of the padded quadtree square: 8 * 2^k >= width, height."""
+    side = QUADTREE_LEAF
+    while side < max(width, height):
+        side *= 2
+    return side
+
+
+def _pad_square(stack: np.ndarray) -> np.ndarray:
+    """Pad a boolean stack (N, H, W) with clear pixels to the quadtree square."""
+    _, height, width = stack.shape
+    side = _quadtree_side(width, height)
+    if (height, width) == (side, side):
+        return stack
+    return np.pad(stack, ((0, 0), (0, side - height), (0, side - width)))
+
+
+def _quadtree_levels(stack: np.ndarray) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    (any set, all set) per node for a padded stack, from leaves to root.
+
+    Level 0 holds the 8x8 leaves as (N, side / 8, side / 8) arrays; each
+    level above halves both block counts.
+    """
+    n, side, _ = stack.shape
+    blocks = side // QUADTREE_LEAF
+    leaves = stack.reshape(n, blocks, QUADTREE_LEAF, blocks, QUADTREE_LEAF)
+    levels = [(leaves.any(axis=(2, 4)), leaves.all(axis=(2, 4)))]
+    while blocks > 1:
+        blocks //= 2
+        any_set, all_set = levels[-1]
+        levels.append((
+            any_set.reshape(n, blocks, 2, blocks, 2).any(axis=(2, 4)),
+            all_set.reshape(n, blocks, 2, blocks, 2).all(axis=(2, 4)),
+        ))
+    return levels
+
+
+def encoded_sizes(stack: np.ndarray) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """
+    Encoded size and decode steps of every encoding, for a whole batch.
+
+    Sizes are computed from run and block statistics with array
+    operations over the batch, without building the encoded bytes, and
+    match len() of the corresponding encoder's output. Decode steps
+    count the units a decoder loop processes: PackBits packets, row RLE
+    runs (bytes), and quadtree nodes plus literal leaves. Raw bitmaps
+    need no decoding.
+
+    Args:
+        stack: Boolean array (N, height, width), True = set bit
+
+    Returns:
+        Encoding name -> (bytes, decode steps), each an int64 array (N,)
+    """
+    n, height, width = stack.shape
+    raw_bytes = (height * width + 7) // 8
+    flat = np.packbits(stack.reshape(n, -1), axis=1)
+    return {
+        "raw": (np.full(n, raw_bytes, dtype=np.int64), np.zeros(n, dtype=np.int64)),
+        "packbits": _packbits_sizes(flat),
+        "rowRle": _row_rle_sizes(stack),
+        "quadtree": _quadtree_sizes(stack),
+    }
+
+
+def _runs(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Runs of equal values along the last axis of a 2-D array.
+
+    Returns:
+        Tuple of (flat start index, run length, row index) per run
+    """
+    rows, length = values.shape
+    boundary = np.ones(values.shape, dtype=bool)
+    boundary[:, 1:] = values[:, 1:] != values[:, :-1]
+    starts = np.flatnonzero(boundary)
+    # Every row starts a run, so no run crosses a row end
+    lengths = np.diff(np.append(starts, rows * length))
+    return starts, lengths, starts // length
+
+
+def _count(index: np.ndarray, weights: np.ndarray, n: int) -> np.ndarray:
+    """Integer-weighted bincount as int64 (bincount returns int64 for empty weights, else float64)."""
+    return np.bincount(index, weights, minlength=n).astype(np.int64)
+
+
+def _packbits_sizes(flat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """PackBits (rle_encode) sizes and packet counts for byte rows (N, B)."""
+    n = flat.shape[0]
+    if flat.shape[1] == 0:
+        return np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+    _, lengths, image = _runs(flat)
+
+    # Repeats: one 2-byte packet per 128 bytes of run
+    repeat = lengths >= 2
+    repeat_packets = -(-lengths[repeat] // MAX_RUN)
+    size = _count(image[repeat], 2 * repeat_packets, n)
+    packets = _count(image[repeat], repeat_packets, n)
+
+    # Literals: consecutive single-byte runs within an image share packets
+    single = ~repeat
+    new_image = np.ones(lengths.size, dtype=bool)
+    new_image[1:] = image[1:] != image[:-1]
+    previous_single = np.concatenate(([False], single[:-1]))
+    group_start = single & (new_image | ~previous_single)
+    group = np.cumsum(group_start) - 1
+    literal_counts = np.bincount(group[single], minlength=int(group_start.sum()))
+    literal_packets = -(-literal_counts // MAX_RUN)
+    group_image = image[group_start]
+    size += _count(group_image, literal_counts + literal_packets, n)
+    packets += _count(group_image, literal_packets, n)
+    return size, packets
+
+
+def _row_rle_sizes(stack: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Row RLE sizes for a boolean stack; every byte is one decode step."""
+    n, height, width = stack.shape
+    if width == 0 or height == 0:
+        return np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+    rows = stack.reshape(n * height, width)
+    _, lengths, row = _runs(rows)
+    # Runs over 255 continue as 255, 0, rest: two extra bytes per 255
+    run_bytes = 1 + 2 * ((lengths - 1) // 255)
+    size = _count(row // height, run_bytes, n)
+    # Rows starting with a set pixel need a leading zero-length clear run
+    size += stack[:, :, 0].sum(axis=1)
+    return size, size.copy()
+
+
+def _quadtree_sizes(stack: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Quadtree sizes and node + literal counts for a boolean stack."""
+    levels = _quadtree_levels(_pad_square(stack))
+    mixed = [
+        (any_set & ~all_set).reshape(stack.shape[0], -1).sum(axis=1)
+        for any_set, all_set in levels
+    ]
+    literals = mixed[0]
+    # The root is always coded; every mixed node above the leaves adds 4 children
+    codes = 1 + 4 * sum(mixed[1:], np.zeros_like(literals))
+    size = 2 + -(-codes // 4) + QUADTREE_LEAF * literals
+    return size.astype(np.int64), (codes + literals).astype(np.int64)
+
+
+def encoding_report(bitmaps: list, width: int, height: int) -> list[dict]:
+    """
+    Compare on-chain encodings for a batch of ``.bin`` bitmaps.
+
+    Args:
+        bitmaps: Bytes-like ``.bin`` bitmaps (or PackedBitmaps), all width x height
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        One dictionary per bitmap: ``{encoding: {"bytes", "decodeSteps"}}``
+        for every name in ENCODINGS, plus ``"best"``, the smallest encoding
+    """
+    sizes = encoded_sizes(unpack_batch(bitmaps, width, height))
+    report = []
+    for i in range(len(bitmaps)):
+        entry = {
+            name: {"bytes": int(size[i]), "decodeSteps": int(steps[i])}
+            for name, (size, steps) in sizes.items()
+        }
+        entry["best"] = min(ENCODINGS, key=lambda name: entry[name]["bytes"])
+        report.append(entry)
+    return report
@@ -1,10 +1,145 @@
 """HTML gallery generator for matrix comparison."""
 
+import html
 import json
 from pathlib import Path
+from typing import IO
+
+import cv2
 
 from pbsep.matrix import MatrixResult
 
+THUMBNAIL_SIZE = 160
+CHUNK_SIZE = 500  # results per NDJSON chunk
+
+
+class GalleryWriter:
+    """
+    Incremental gallery writer for matrix results.
+
+    Cards are appended to gallery.html as results arrive, so memory stays
+    flat however many configurations run. Each card shows a small
+    thumbnail (full PNG on click) loaded with ``loading="lazy"``, and
+    cards off screen are skipped by the browser's layout via
+    ``content-visibility``. Result records go to NDJSON chunks of
+    ``chunk_size`` lines (matrix-00000.ndjson, ...); matrix.json is an
+    index of those chunks, written on close.
+
+    Usage::
+
+        with GalleryWriter(output_dir) as gallery:
+            run_matrix(..., on_result=gallery.add)
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        reference_path: Path | None = None,
+        thumbnail_size: int = THUMBNAIL_SIZE,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        """
+        Initialize writer.
+
+        Args:
+            output_dir: Output directory (holds the result PNGs)
+            reference_path: Optional reference image path (e.g., Adobe output)
+            thumbnail_size: Thumbnail edge length in pixels
+            chunk_size: Result records per NDJSON chunk
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.output_dir = output_dir
+        self.reference_path = reference_path
+        self.thumbnail_size = thumbnail_size
+        self.chunk_size = chunk_size
+        self.gallery_path = output_dir / "gallery.html"
+        self.count = 0
+        self._chunks: list[dict] = []
+        self._html: IO[str] | None = None
+        self._chunk: IO[str] | None = None
+
+    def __enter__(self) -> "GalleryWriter":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """Create the output files and write the page header."""
+        (self.output_dir / "thumbs").mkdir(parents=True, exist_ok=True)
+        self._html = open(self.gallery_path, "w")
+        self._html.write(_HEADER)
+
+        # Add reference card if provided
+        if self.reference_path and self.reference_path.exists():
+            name = html.escape(self.reference_path.name)
+            self._html.write(f"""
+        <div class="card reference" data-opacity="-1">
+            <img src="{name}" data-full="{name}" alt="Reference (Adobe)" loading="lazy" onclick="showModal(this)">
+            <div class="info">
+                <strong>REFERENCE (Adobe)</strong><br>
+                Target quality
+            </div>
+        </div>
+""")
+
+    def add(self, result: MatrixResult) -> None:
+        """Write one result: thumbnail, gallery card and NDJSON record."""
+        if self._html is None:
+            raise RuntimeError("GalleryWriter.add() called before open()")
+
+        thumbnail = self._write_thumbnail(result.png_path)
+        self._html.write(_card_html(result, thumbnail))
+        self._html.flush()  # the page is viewable while the matrix runs
+
+        if self._chunk is None or self._chunks[-1]["count"] >= self.chunk_size:
+            self._next_chunk()
+        record = _result_record(result)
+        record["thumbnail"] = thumbnail
+        self._chunk.write(json.dumps(record) + "\n")
+        self._chunks[-1]["count"] += 1
+        self.count += 1
+
+    def close(self) -> None:
+        """Finish the page and write the matrix.json chunk index."""
+        if self._html is None:
+            return
+        self._html.write(_FOOTER)
+        self._html.close()
+        self._html = None
+        if self._chunk is not None:
+            self._chunk.close()
+            self._chunk = None
+
+        index = {"total": self.count, "chunkSize": self.chunk_size, "chunks": self._chunks}
+        with open(self.output_dir / "matrix.json", "w") as f:
+            json.dump(index, f, indent=2)
+
+    def _next_chunk(self) -> None:
+        """Close the current NDJSON chunk and start the next one."""
+        if self._chunk is not None:
+            self._chunk.close()
+        name = f"matrix-{len(self._chunks):05d}.ndjson"
+        self._chunk = open(self.output_dir / name, "w")
+        self._chunks.append({"path": name, "count": 0})
+
+    def _write_thumbnail(self, png_path: Path) -> str:
+        """Downscale a result PNG into thumbs/; returns its relative path."""
+        relative = f"thumbs/{png_path.name}"
+        image = cv2.imread(str(png_path), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            return png_path.name  # unreadable: let the card use the full image
+        if max(image.shape) > self.thumbnail_size:
+            image = cv2.resize(
+                image,
+                (self.thumbnail_size, self.thumbnail_size),
+                interpolation=cv2.INTER_AREA,
+            )
+        cv2.imwrite(str(self.output_dir / relative), image, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+        return relative
+
 
 def generate_gallery(
     results: list[MatrixResult],
@@ -22,189 +157,164 @@ def generate_gallery(
     Returns:
         Path to generated gallery.html
     """
-    # Sort by opacity for comparison
-    sorted_results = sorted(results, key=lambda r: r.opacity_pct)
-
-    # Generate matrix.json
-    matrix_data = {
-        "results": [
-            {
-                "id": r.config.id,
-                "method": r.config.method,
-                "pre_blur_sigma": r.config.pre_blur_sigma,
-                "opaque_count": r.opaque_count,
-                "total_pixels": r.total_pixels,
-                "opacity_pct": r.opacity_pct,
-                "png_path": r.png_path.name,
-                # Canny-specific
-                **({"low_threshold": r.config.low_threshold,
-                    "high_threshold": r.config.high_threshold,
-                    "pipeline_order": r.config.pipeline_order,
-                    "dilate_kernel": r.config.dilate_kernel,
-                    "dilate_iterations": r.config.dilate_iterations,
-                    "erode_iterations": r.config.erode_iterations,
-                    "skeletonize": r.config.skeletonize}
-                   if r.config.method == "canny" else {}),
-                # Adaptive-specific
-                **({"block_size": r.config.block_size,
-                    "c_constant": r.config.c_constant,
-                    "use_clahe": r.config.use_clahe}
-                   if r.config.method != "canny" else {}),
-            }
-            for r in sorted_results
-        ]
-    }
+    with GalleryWriter(output_dir, reference_path) as gallery:
+        # Sort by opacity for comparison
+        for result in sorted(results, key=lambda r: r.opacity_pct):
+            gallery.add(result)
+    return gallery.gallery_path
 
-    json_path = output_dir / "matrix.json"
-    with open(json_path, "w") as f:
-        json.dump(matrix_data, f, indent=2)
 
-    # Generate HTML
-    html_content = _generate_html(sorted_results, reference_path)
+def _result_record(r: MatrixResult) -> dict:
+    """JSON record for one result."""
+    return {
+        "id": r.config.id,
+        "method": r.config.method,
+        "pre_blur_sigma": r.config.pre_blur_sigma,
+        "opaque_count": r.opaque_count,
+        "total_pixels": r.total_pixels,
+        "opacity_pct": r.opacity_pct,
+        "png_path": r.png_path.name,
+        "encodings": r.encodings,
+        # Canny-specific
+        **({"low_threshold": r.config.low_threshold,
+            "high_threshold": r.config.high_threshold,
+            "pipeline_order": r.config.pipeline_order,
+            "dilate_kernel": r.config.dilate_kernel,
+            "dilate_iterations": r.config.dilate_iterations,
+            "erode_iterations": r.config.erode_iterations,
+            "skeletonize": r.config.skeletonize}
+           if r.config.method == "canny" else {}),
+        # Adaptive-specific
+        **({"block_size": r.config.block_size,
+            "c_constant": r.config.c_constant,
+            "use_clahe": r.config.use_clahe}
+           if r.config.method != "canny" else {}),
+    }
 
-    gallery_path = output_dir / "gallery.html"
-    with open(gallery_path, "w") as f:
-        f.write(html_content)
 
-    return gallery_path
+def _card_html(r: MatrixResult, thumbnail: str) -> str:
+    """Gallery card for one result."""
+    if r.config.method == "canny":
+        # Canny-specific card info
+        pipeline_label = "down→edge" if r.config.pipeline_order == "down_edge" else "edge→down"
+        extra_info = ""
+        if r.config.dilate_iterations > 0:
+            extra_info += f", dilate={r.config.dilate_kernel}"
+        if r.config.erode_iterations > 0:
+            extra_info += f", erode={r.config.erode_iterations}"
+        if r.config.skeletonize:
+            extra_info += ", skel"
 
+        method_label = "CANNY"
+        detail_line1 = f"low={r.config.low_threshold}, high={r.config.high_threshold}"
+        detail_line2 = f"blur={r.config.pre_blur_sigma}, {pipeline_label}{extra_info}"
+    else:
+        # Adaptive threshold card info
+        method_label = "ADAPTIVE"
+        detail_line1 = f"block={r.config.block_size}, C={r.config.c_constant}"
+        detail_line2 = f"blur={r.config.pre_blur_sigma}"
+        if r.config.use_clahe:
+            detail_line2 += ", CLAHE"
 
-def _generate_html(
-    results: list[MatrixResult],
-    reference_path: Path | None,
-) -> str:
-    """Generate HTML content for gallery."""
-    cards_html = ""
-
-    # Add reference card if provided
-    if reference_path and reference_path.exists():
-        cards_html += f"""
-        <div class="card reference">
-            <img src="{reference_path.name}" alt="Reference (Adobe)" onclick="showModal(this.src)">
-            <div class="info">
-                <strong>REFERENCE (Adobe)</strong><br>
-                Target quality
-            </div>
-        </div>
-        """
+    # Method-specific card styling
+    card_class = "card canny" if r.config.method == "canny" else "card adaptive"
 
-    # Add result cards
-    for r in results:
-        if r.config.method == "canny":
-            # Canny-specific card info
-            pipeline_label = "down→edge" if r.config.pipeline_order == "down_edge" else "edge→down"
-            extra_info = ""
-            if r.config.dilate_iterations > 0:
-                extra_info += f", dilate={r.config.dilate_kernel}"
-            if r.config.erode_iterations > 0:
-                extra_info += f", erode={r.config.erode_iterations}"
-            if r.config.skeletonize:
-                extra_info += ", skel"
-
-            method_label = "CANNY"
-            detail_line1 = f"low={r.config.low_threshold}, high={r.config.high_threshold}"
-            detail_line2 = f"blur={r.config.pre_blur_sigma}, {pipeline_label}{extra_info}"
-        else:
-            # Adaptive threshold card info
-            method_label = "ADAPTIVE"
-            detail_line1 = f"block={r.config.block_size}, C={r.config.c_constant}"
-            detail_line2 = f"blur={r.config.pre_blur_sigma}"
-            if r.config.use_clahe:
-                detail_line2 += ", CLAHE"
-
-        # Method-specific card styling
-        card_class = "card canny" if r.config.method == "canny" else "card adaptive"
-
-        cards_html += f"""
-        <div class="{card_class}">
-            <img src="{r.png_path.name}" alt="Config {r.config.id}" onclick="showModal(this.src)">
+    return f"""
+        <div class="{card_class}" data-opacity="{r.opacity_pct:.4f}">
+            <img src="{html.escape(thumbnail)}" data-full="{html.escape(r.png_path.name)}" alt="Config {r.config.id}" loading="lazy" decoding="async" onclick="showModal(this)">
             <div class="info">
                 <strong>#{r.config.id}</strong> <span class="method-badge">{method_label}</span> - {r.opacity_pct:.1f}%<br>
                 {detail_line1}<br>
                 {detail_line2}
             </div>
         </div>
-        """
+"""
+
 
-    return f"""<!DOCTYPE html>
+_HEADER = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>PBSEP Matrix Comparison</title>
     <style>
-        * {{ box-sizing: border-box; }}
-        body {{
+        * { box-sizing: border-box; }
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             background: #1a1a1a;
             color: #fff;
             margin: 0;
             padding: 20px;
-        }}
-        h1 {{
+        }
+        h1 {
             text-align: center;
             margin-bottom: 10px;
-        }}
-        .subtitle {{
+        }
+        .subtitle {
             text-align: center;
             color: #888;
             margin-bottom: 30px;
-        }}
-        .grid {{
+        }
+        .grid {
             display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(280px, 1fr));
+            grid-template-columns: repeat(auto-fill, minmax(180px, 1fr));
             gap: 20px;
             max-width: 1800px;
             margin: 0 auto;
-        }}
-        .card {{
+        }
+        .card {
             background: #2a2a2a;
             border-radius: 8px;
             overflow: hidden;
             transition: transform 0.2s;
-        }}
-        .card:hover {{
+            /* Skip layout and paint for cards far off screen */
+            content-visibility: auto;
+            contain-intrinsic-size: auto 260px;
+        }
+        .card:hover {
             transform: scale(1.02);
-        }}
-        .card.reference {{
+        }
+        .card.reference {
             border: 2px solid #4CAF50;
-        }}
-        .card.canny {{
+        }
+        .card.canny {
             border-left: 3px solid #2196F3;
-        }}
-        .card.adaptive {{
+        }
+        .card.adaptive {
             border-left: 3px solid #FF9800;
-        }}
-        .method-badge {{
+        }
+        .method-badge {
             font-size: 10px;
             padding: 2px 6px;
             border-radius: 3px;
             font-weight: bold;
-        }}
-        .card.canny .method-badge {{
+        }
+        .card.canny .method-badge {
             background: #2196F3;
             color: #fff;
-        }}
-        .card.adaptive .method-badge {{
+        }
+        .card.adaptive .method-badge {
             background: #FF9800;
             color: #000;
-        }}
-        .card img {{
+        }
+        .card img {
             width: 100%;
             height: auto;
+            aspect-ratio: 1;
             display: block;
             cursor: pointer;
             background: #fff;
-        }}
-        .info {{
+            image-rendering: pixelated;
+        }
+        .info {
             padding: 12px;
             font-size: 13px;
             line-height: 1.4;
-        }}
-        .info strong {{
+        }
+        .info strong {
             color: #4CAF50;
-        }}
-        .modal {{
+        }
+        .modal {
             display: none;
             position: fixed;
             top: 0;
@@ -215,35 +325,35 @@ def _generate_html(
             z-index: 1000;
             justify-content: center;
             align-items: center;
-        }}
-        .modal.active {{
+        }
+        .modal.active {
             display: flex;
-        }}
-        .modal img {{
+        }
+        .modal img {
             max-width: 90%;
             max-height: 90%;
             background: #fff;
-        }}
-        .modal-close {{
+        }
+        .modal-close {
             position: absolute;
             top: 20px;
             right: 30px;
             font-size: 40px;
             color: #fff;
             cursor: pointer;
-        }}
-        .legend {{
+        }
+        .legend {
             max-width: 1800px;
             margin: 0 auto 30px;
             padding: 15px;
             background: #2a2a2a;
             border-radius: 8px;
             font-size: 13px;
-        }}
-        .legend h3 {{
+        }
+        .legend h3 {
             margin: 0 0 10px 0;
             color: #4CAF50;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -267,9 +377,10 @@ def _generate_html(
         <strong>CLAHE</strong>: Contrast enhancement enabled</p>
     </div>
 
-    <div class="grid">
-        {cards_html}
-    </div>
+    <div class="grid" id="grid">
+"""
+
+_FOOTER = """    </div>
 
     <div class="modal" id="modal" onclick="hideModal()">
         <span class="modal-close">&times;</span>
@@ -277,16 +388,21 @@ def _generate_html(
     </div>
 
     <script>
-        function showModal(src) {{
-            document.getElementById('modal-img').src = src;
+        function showModal(img) {
+            document.getElementById('modal-img').src = img.dataset.full;
             document.getElementById('modal').classList.add('active');
-        }}
-        function hideModal() {{
+        }
+        function hideModal() {
             document.getElementById('modal').classList.remove('active');
-        }}
-        document.addEventListener('keydown', (e) => {{
+        }
+        document.addEventListener('keydown', (e) => {
             if (e.key === 'Escape') hideModal();
-        }});
+        });
+        // Cards are written in completion order; sort them by opacity
+        const grid = document.getElementById('grid');
+        const cards = Array.from(grid.children);
+        cards.sort((a, b) => a.dataset.opacity - b.dataset.opacity);
+        grid.append(...cards);
     </script>
 </body>
 </html>
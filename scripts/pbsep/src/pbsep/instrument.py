@@ -0,0 +1,157 @@
+"""Per-stage timing and memory instrumentation."""
+
+import json
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any
+
+
+class StageSpan:
+    """Handle for an in-progress stage; attach the stage output for its shape."""
+
+    def __init__(self) -> None:
+        self.shape: tuple[int, ...] | None = None
+        self.dtype: str | None = None
+
+    def output(self, value: Any) -> Any:
+        """Record the output array's shape and dtype, and return it unchanged."""
+        shape = getattr(value, "shape", None)
+        if shape is not None:
+            self.shape = tuple(int(d) for d in shape)
+            self.dtype = str(getattr(value, "dtype", ""))
+        return value
+
+
+class StageInstrument:
+    """
+    Records wall time, CPU time, peak allocation and output shape per stage.
+
+    Records are plain dicts appended to ``records`` (JSON-ready, so the list
+    can be placed directly in pipeline metadata). Subclass and override
+    ``on_record`` to forward records elsewhere (logging, metrics, ...).
+
+    Peak allocated bytes come from tracemalloc, which NumPy reports its
+    buffers to. Tracing slows pure-Python code, so it is opt-in.
+    """
+
+    def __init__(self, trace_memory: bool = False, lane: int = 0):
+        """
+        Initialize instrument.
+
+        Args:
+            trace_memory: Track peak allocated bytes per stage via tracemalloc
+            lane: Lane id for trace export (e.g. matrix config id)
+        """
+        self.trace_memory = trace_memory
+        self.lane = lane
+        self.records: list[dict] = []
+        self._prefix = ""
+        self._lock = threading.Lock()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def reset(self) -> list[dict]:
+        """Start a fresh record list (e.g. per pipeline run) and return it."""
+        with self._lock:
+            self.records = []
+        return self.records
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageSpan]:
+        """Measure the enclosed block as one stage. Stages must not nest."""
+        span = StageSpan()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base_bytes = tracemalloc.get_traced_memory()[0]
+        start_epoch_us = time.time_ns() // 1000
+        start_wall = time.perf_counter()
+        start_cpu = _cpu_time()
+        try:
+            yield span
+        finally:
+            record = {
+                "stage": self._prefix + name,
+                "wallMs": round((time.perf_counter() - start_wall) * 1000, 3),
+                "cpuMs": round((_cpu_time() - start_cpu) * 1000, 3),
+                "startUs": start_epoch_us,
+                "pid": os.getpid(),
+                "lane": self.lane,
+            }
+            if self.trace_memory:
+                record["peakBytes"] = max(tracemalloc.get_traced_memory()[1] - base_bytes, 0)
+            if span.shape is not None:
+                record["shape"] = list(span.shape)
+                record["dtype"] = span.dtype
+            with self._lock:
+                self.records.append(record)
+            self.on_record(record)
+
+    def call(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` as a stage, recording the shape of its result."""
+        with self.stage(name) as span:
+            return span.output(fn(*args, **kwargs))
+
+    @contextmanager
+    def scope(self, prefix: str) -> Iterator[None]:
+        """Prefix stage names recorded inside the block (e.g. "fullres/")."""
+        previous = self._prefix
+        self._prefix = previous + prefix
+        try:
+            yield
+        finally:
+            self._prefix = previous
+
+    def on_record(self, record: dict) -> None:
+        """Hook called after each stage completes. No-op by default."""
+
+
+def _cpu_time() -> float:
+    """CPU seconds of this process plus waited-for children (potrace, magick)."""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def timed(instrument: StageInstrument | None, name: str):
+    """Stage context if an instrument is given, otherwise a no-op context."""
+    if instrument is None:
+        return nullcontext(StageSpan())
+    return instrument.stage(name)
+
+
+def write_chrome_trace(records: Iterable[dict], path: Path) -> Path:
+    """
+    Export stage records in Chrome trace event format.
+
+    Open in chrome://tracing or https://ui.perfetto.dev. Each process is a
+    track; lanes (e.g. matrix config ids) are threads within it.
+
+    Args:
+        records: Stage records from one or more StageInstrument
+        path: Output JSON path
+
+    Returns:
+        Path to the written trace
+    """
+    events = []
+    for record in records:
+        args = {k: v for k, v in record.items() if k not in ("stage", "startUs", "wallMs", "pid", "lane")}
+        events.append({
+            "name": record["stage"],
+            "cat": "pbsep",
+            "ph": "X",
+            "ts": record["startUs"],
+            "dur": round(record["wallMs"] * 1000, 1),
+            "pid": record["pid"],
+            "tid": record["lane"],
+            "args": args,
+        })
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+    return path
@@ -1,11 +1,18 @@
 """Matrix configuration batch processing for parameter exploration."""
 
-from dataclasses import dataclass
+import json
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 
 import cv2
 import numpy as np
 
+from pbsep.cache import StageCache, hash_file
+from pbsep.encoding import encoding_report
+from pbsep.instrument import StageInstrument
+from pbsep.parallel import resolve_workers, shared_array, shared_array_pool
 from pbsep.stages import (
     apply_morphological_correction,
     binarize,
@@ -14,6 +21,7 @@ from pbsep.stages import (
     export_outputs,
     extract_luminance,
     normalize_input,
+    prescale,
 )
 from pbsep.types import (
     BinarizeParams,
@@ -63,6 +71,16 @@ class MatrixResult:
     total_pixels: int
     opacity_pct: float
     png_path: Path
+    stages: list[dict] = field(default_factory=list)  # per-stage instrument records
+    bitmap: bytes = b""  # packed .bin bitmap
+    encodings: dict = field(default_factory=dict)  # encoding sizes, see encoding_report
+    metadata: dict = field(default_factory=dict)  # written to metadata_path once encoded
+    metadata_path: Path | None = None
+
+
+# Results whose encodings are compared in one encoding_report call (every
+# current matrix fits in one batch; larger runs stay bounded in memory)
+ENCODE_BATCH = 256
 
 
 # Phase 20: Adaptive-only matrix - No block=7, opacity ≥16% (10 configs)
@@ -100,6 +118,11 @@ def run_matrix(
     output_dir: Path,
     output_name: str,
     size: int = 256,
+    workers: int = 1,
+    instrument: StageInstrument | None = None,
+    on_result: Callable[[MatrixResult], None] | None = None,
+    cache: StageCache | None = None,
+    pyramid_factor: int = 0,
 ) -> list[MatrixResult]:
     """
     Run all matrix configurations and generate comparison outputs.
@@ -109,151 +132,275 @@ def run_matrix(
         output_dir: Output directory for matrix results
         output_name: Base name for outputs
         size: Target size (128 or 256)
+        workers: Worker processes for running configs concurrently
+            (1 = sequential, 0 = one per CPU core)
+        instrument: Optional instrument for the shared luminance stages.
+            Each config is timed separately (with memory tracing if this
+            instrument traces memory) into MatrixResult.stages
+        on_result: Optional callback given each result once its encodings
+            are known (in MATRIX_CONFIGS order), e.g. GalleryWriter.add
+        cache: Optional stage cache for the shared luminance. Keyed like
+            the pipeline's luminance step, so entries are shared with
+            single runs using the same normalize/luminance params
+        pyramid_factor: Area-downsample the input to this many times the
+            target size before the shared luminance stages (0 disables),
+            as the pipeline's pyramid mode
 
     Returns:
-        List of MatrixResult for each configuration
+        List of MatrixResult for each configuration, in MATRIX_CONFIGS order,
+        with encoding sizes compared across up to ENCODE_BATCH results at once
     """
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Load and prepare image once
-    image = cv2.imread(str(input_path), cv2.IMREAD_COLOR)
-    if image is None:
-        raise PipelineError(f"Failed to load image: {input_path}")
-
-    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    instrument = instrument or StageInstrument()
 
     # Normalize and extract luminance (shared across all configs)
     normalize_params = NormalizeParams(gamma=2.2, percentile_low=1, percentile_high=99)
     luminance_params = LuminanceParams(method="lab_l")
-    downscale_params = DownscaleParams(interpolation="area")
+    prescale_params = DownscaleParams(interpolation="area", pyramid_factor=pyramid_factor)
+    luminance_key = (normalize_params, luminance_params)
+    if pyramid_factor > 0:
+        luminance_key += (prescale_params, size)
+
+    def luminance_step(_: None) -> np.ndarray:
+        # Load and prepare image once
+        with instrument.stage("load") as span:
+            image = cv2.imread(str(input_path), cv2.IMREAD_COLOR)
+            if image is None:
+                raise PipelineError(f"Failed to load image: {input_path}")
+
+            image = span.output(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+        if pyramid_factor > 0:
+            image = instrument.call("prescale", prescale, image, size, prescale_params)
+        normalized = instrument.call("normalize", normalize_input, image, normalize_params)
+        del image
+        return instrument.call("luminance", extract_luminance, normalized, luminance_params)
+
+    if cache is None:
+        luminance = luminance_step(None)
+    else:
+        luminance, _ = cache.run_chain(
+            hash_file(input_path), [(luminance_key, luminance_step)]
+        )
 
-    normalized = normalize_input(image, normalize_params)
-    luminance = extract_luminance(normalized, luminance_params)
+    run = partial(
+        _run_config,
+        input_path=input_path,
+        output_dir=output_dir,
+        output_name=output_name,
+        size=size,
+        trace_memory=instrument.trace_memory,
+        pyramid_factor=pyramid_factor,
+    )
+
+    workers = min(resolve_workers(workers), len(MATRIX_CONFIGS))
+    if workers <= 1:
+        results_iter = (run(config, luminance) for config in MATRIX_CONFIGS)
+        return _collect(results_iter, size, instrument, on_result)
+
+    # Workers map the luminance from shared memory instead of each
+    # receiving a pickled full-resolution copy. executor.map yields in
+    # submission order, so progress output stays deterministic.
+    with shared_array_pool(luminance, workers) as executor:
+        results_iter = executor.map(partial(_run_config_shared, run), MATRIX_CONFIGS)
+        return _collect(results_iter, size, instrument, on_result)
+
+
+def _collect(
+    results_iter,
+    size: int,
+    instrument: StageInstrument,
+    on_result: Callable[[MatrixResult], None] | None = None,
+) -> list[MatrixResult]:
+    """
+    Gather matrix results in order, printing progress as each arrives.
 
+    Encodings are compared once per ENCODE_BATCH results, then each
+    result's metadata file is written and it is handed to ``on_result``.
+    """
     results: list[MatrixResult] = []
+    pending: list[MatrixResult] = []
     total_configs = len(MATRIX_CONFIGS)
-
-    for config in MATRIX_CONFIGS:
-        # Build unified binarization params
-        binarize_params = BinarizeParams(
-            method=config.method,
-            pre_blur_sigma=config.pre_blur_sigma,
-            low_threshold=config.low_threshold,
-            high_threshold=config.high_threshold,
-            dilate_kernel=config.dilate_kernel,
-            dilate_iterations=config.dilate_iterations,
-            block_size=config.block_size,
-            c_constant=config.c_constant,
+    for result in results_iter:
+        results.append(result)
+        pending.append(result)
+        print(
+            f"  [{result.config.id:02d}/{total_configs}] "
+            f"{result.opacity_pct:5.1f}% opaque - {result.png_path.name}"
         )
+        if len(pending) == ENCODE_BATCH:
+            _encode_batch(pending, size, instrument, on_result)
+            pending = []
+    if pending:
+        _encode_batch(pending, size, instrument, on_result)
+    return results
 
-        # Per-config morphology params with erode/skeletonize
-        morphology_params = MorphologyParams(
-            kernel_shape="ellipse",
-            kernel_size=3,
-            close_iterations=1,
-            open_iterations=1,
-            erode_iterations=config.erode_iterations,
-            skeletonize=config.skeletonize,
-        )
 
-        # Prepare luminance (optionally with CLAHE for adaptive methods)
-        lum_input = luminance
-        if config.use_clahe:
-            contrast_params = ContrastParams(method="clahe", clip_limit=2.0, tile_size=8)
-            lum_input = enhance_local_contrast(luminance, contrast_params)
-
-        if config.method == "canny" and config.pipeline_order == "edge_down":
-            # Edge detection first, then downscale (Canny only)
-            binary_highres = binarize(lum_input, binarize_params)
-            binary_scaled = downscale(
-                binary_highres.astype(np.float32) / 255.0,
-                size,
-                downscale_params,
-            )
-            binary = (binary_scaled > 0.1).astype(np.uint8) * 255
-        else:
-            # Downscale first, then binarize (default for all methods)
-            scaled = downscale(lum_input, size, downscale_params)
-            binary = binarize(scaled, binarize_params)
-
-        corrected = apply_morphological_correction(binary, morphology_params)
-
-        opaque_count = int(np.count_nonzero(corrected > 127))
-        total_pixels = size * size
-        opacity_pct = (opaque_count / total_pixels) * 100
-
-        # Generate filename with method-specific details
-        if config.method == "canny":
-            config_name = (
-                f"{output_name}_{config.id:03d}_canny_"
-                f"low{config.low_threshold}_high{config.high_threshold}_"
-                f"blur{config.pre_blur_sigma}"
-            )
-            if config.pipeline_order == "edge_down":
-                config_name += f"_dilate{config.dilate_kernel}"
-            if config.erode_iterations > 0:
-                config_name += f"_erode{config.erode_iterations}"
-            if config.skeletonize:
-                config_name += "_skel"
-        else:
-            # Adaptive threshold methods
-            config_name = (
-                f"{output_name}_{config.id:03d}_adaptive_"
-                f"block{config.block_size}_c{config.c_constant}"
-            )
-            if config.use_clahe:
-                config_name += "_clahe"
-
-        metadata = {
-            "source": str(input_path),
-            "size": size,
-            "format": "1-bit monochrome",
-            "profile": "matrix",
-            "config_id": config.id,
-            "method": config.method,
-            "pre_blur_sigma": config.pre_blur_sigma,
-            "opaquePixels": opaque_count,
-            "totalPixels": total_pixels,
-            "opacity_pct": round(opacity_pct, 2),
-        }
-        # Add method-specific metadata
-        if config.method == "canny":
-            metadata.update({
-                "low_threshold": config.low_threshold,
-                "high_threshold": config.high_threshold,
-                "pipeline_order": config.pipeline_order,
-                "dilate_kernel": config.dilate_kernel,
-                "dilate_iterations": config.dilate_iterations,
-                "erode_iterations": config.erode_iterations,
-                "skeletonize": config.skeletonize,
-            })
-        else:
-            metadata.update({
-                "block_size": config.block_size,
-                "c_constant": config.c_constant,
-                "use_clahe": config.use_clahe,
-            })
-
-        export_params = ExportParams(format="1bit_png", foreground_color="000000")
-        _, _, png_path, _ = export_outputs(
-            corrected,
-            output_dir,
-            config_name,
+def _encode_batch(
+    batch: list[MatrixResult],
+    size: int,
+    instrument: StageInstrument,
+    on_result: Callable[[MatrixResult], None] | None,
+) -> None:
+    """Compare encodings for a batch of results in one vectorized pass."""
+    with instrument.stage("encode"):
+        report = encoding_report([r.bitmap for r in batch], size, size)
+    for result, encodings in zip(batch, report):
+        result.encodings = encodings
+        result.metadata["encodings"] = encodings
+        if result.metadata_path is not None:
+            result.metadata_path.write_text(json.dumps(result.metadata, indent=2))
+        if on_result is not None:
+            on_result(result)
+
+
+def _run_config_shared(run, config: MatrixConfig) -> MatrixResult:
+    """Worker entry point: run a config against the shared luminance."""
+    return run(config, shared_array())
+
+
+def _run_config(
+    config: MatrixConfig,
+    luminance: np.ndarray,
+    input_path: Path,
+    output_dir: Path,
+    output_name: str,
+    size: int,
+    trace_memory: bool = False,
+    pyramid_factor: int = 0,
+) -> MatrixResult:
+    """Run a single matrix configuration on a precomputed luminance image."""
+    instrument = StageInstrument(trace_memory=trace_memory, lane=config.id)
+    stage = instrument.call
+    downscale_params = DownscaleParams(interpolation="area")
+
+    # Build unified binarization params
+    binarize_params = BinarizeParams(
+        method=config.method,
+        pre_blur_sigma=config.pre_blur_sigma,
+        low_threshold=config.low_threshold,
+        high_threshold=config.high_threshold,
+        dilate_kernel=config.dilate_kernel,
+        dilate_iterations=config.dilate_iterations,
+        block_size=config.block_size,
+        c_constant=config.c_constant,
+    )
+
+    # Per-config morphology params with erode/skeletonize
+    morphology_params = MorphologyParams(
+        kernel_shape="ellipse",
+        kernel_size=3,
+        close_iterations=1,
+        open_iterations=1,
+        erode_iterations=config.erode_iterations,
+        skeletonize=config.skeletonize,
+    )
+
+    # Prepare luminance (optionally with CLAHE for adaptive methods)
+    lum_input = luminance
+    if config.use_clahe:
+        contrast_params = ContrastParams(method="clahe", clip_limit=2.0, tile_size=8)
+        lum_input = stage("contrast", enhance_local_contrast, luminance, contrast_params)
+
+    if config.method == "canny" and config.pipeline_order == "edge_down":
+        # Edge detection first, then downscale (Canny only)
+        binary_highres = stage("binarize", binarize, lum_input, binarize_params)
+        binary_scaled = stage(
+            "downscale",
+            downscale,
+            binary_highres.astype(np.float32) / 255.0,
             size,
-            True,  # invert for display
-            metadata,
+            downscale_params,
         )
-
-        results.append(
-            MatrixResult(
-                config=config,
-                opaque_count=opaque_count,
-                total_pixels=total_pixels,
-                opacity_pct=opacity_pct,
-                png_path=png_path,
-            )
+        binary = (binary_scaled > 0.1).astype(np.uint8) * 255
+    else:
+        # Downscale first, then binarize (default for all methods)
+        scaled = stage("downscale", downscale, lum_input, size, downscale_params)
+        binary = stage("binarize", binarize, scaled, binarize_params)
+
+    corrected = stage("morphology", apply_morphological_correction, binary, morphology_params)
+
+    opaque_count = int(np.count_nonzero(corrected > 127))
+    total_pixels = size * size
+    opacity_pct = (opaque_count / total_pixels) * 100
+
+    # Generate filename with method-specific details
+    if config.method == "canny":
+        config_name = (
+            f"{output_name}_{config.id:03d}_canny_"
+            f"low{config.low_threshold}_high{config.high_threshold}_"
+            f"blur{config.pre_blur_sigma}"
         )
-
-        print(f"  [{config.id:02d}/{total_configs}] {opacity_pct:5.1f}% opaque - {png_path.name}")
-
-    return results
+        if config.pipeline_order == "edge_down":
+            config_name += f"_dilate{config.dilate_kernel}"
+        if config.erode_iterations > 0:
+            config_name += f"_erode{config.erode_iterations}"
+        if config.skeletonize:
+            config_name += "_skel"
+    else:
+        # Adaptive threshold methods
+        config_name = (
+            f"{output_name}_{config.id:03d}_adaptive_"
+            f"block{config.block_size}_c{config.c_constant}"
+        )
+        if config.use_clahe:
+            config_name += "_clahe"
+
+    metadata = {
+        "source": str(input_path),
+        "size": size,
+        "format": "1-bit monochrome",
+        "profile": "matrix",
+        "config_id": config.id,
+        "method": config.method,
+        "pre_blur_sigma": config.pre_blur_sigma,
+        "opaquePixels": opaque_count,
+        "totalPixels": total_pixels,
+        "opacity_pct": round(opacity_pct, 2),
+        "stages": instrument.records,
+    }
+    if pyramid_factor > 0:
+        metadata["pyramidFactor"] = pyramid_factor
+    # Add method-specific metadata
+    if config.method == "canny":
+        metadata.update({
+            "low_threshold": config.low_threshold,
+            "high_threshold": config.high_threshold,
+            "pipeline_order": config.pipeline_order,
+            "dilate_kernel": config.dilate_kernel,
+            "dilate_iterations": config.dilate_iterations,
+            "erode_iterations": config.erode_iterations,
+            "skeletonize": config.skeletonize,
+        })
+    else:
+        metadata.update({
+            "block_size": config.block_size,
+            "c_constant": config.c_constant,
+            "use_clahe": config.use_clahe,
+        })
+
+    export_params = ExportParams(format="1bit_png", foreground_color="000000")
+    # Encodings are compared across the whole batch in _collect
+    bitmap, _, png_path, metadata_path = export_outputs(
+        corrected,
+        output_dir,
+        config_name,
+        size,
+        True,  # invert for display
+        metadata,
+        instrument=instrument,
+        encode=False,
+    )
+
+    return MatrixResult(
+        config=config,
+        opaque_count=opaque_count,
+        total_pixels=total_pixels,
+        opacity_pct=opacity_pct,
+        png_path=png_path,
+        stages=instrument.records,
+        bitmap=bytes(bitmap),
+        metadata=metadata,
+        metadata_path=metadata_path,
+    )
@@ -0,0 +1,69 @@
+"""Process pool sharing a read-only array with workers via shared memory."""
+
+import os
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Per-process view of the shared array (set in each worker by _attach)
+_shared: dict = {}
+
+
+def resolve_workers(workers: int) -> int:
+    """Resolve a worker count, where 0 means one per CPU core."""
+    if workers < 0:
+        raise ValueError(f"Invalid worker count: {workers}")
+    return workers or os.cpu_count() or 1
+
+
+def _attach(name: str, shape: tuple[int, ...], dtype: str) -> None:
+    """Pool initializer: map the parent's shared memory block."""
+    shm = shared_memory.SharedMemory(name=name)
+    _shared["shm"] = shm  # keep the mapping alive for the worker's lifetime
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    array.flags.writeable = False
+    _shared["array"] = array
+
+
+def shared_array() -> np.ndarray:
+    """Return the array shared by the enclosing shared_array_pool (worker side)."""
+    try:
+        return _shared["array"]
+    except KeyError:
+        raise RuntimeError("shared_array() called outside a shared_array_pool worker") from None
+
+
+@contextmanager
+def shared_array_pool(array: np.ndarray, workers: int) -> Iterator[ProcessPoolExecutor]:
+    """
+    Process pool whose workers can read ``array`` without copying it.
+
+    The array is copied once into a shared memory block; each worker maps
+    the block read-only in its initializer and reads it via shared_array().
+    Works with any multiprocessing start method (fork, spawn, forkserver).
+
+    Args:
+        array: Array to share (e.g. full-resolution luminance)
+        workers: Number of worker processes
+
+    Yields:
+        ProcessPoolExecutor bound to the shared array
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    try:
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        view[...] = array
+        del view
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach,
+            initargs=(shm.name, array.shape, array.dtype.str),
+        ) as executor:
+            yield executor
+    finally:
+        shm.close()
+        shm.unlink()
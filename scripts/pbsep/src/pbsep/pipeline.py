@@ -1,21 +1,36 @@
 """Main PBSEP-256 pipeline orchestrator."""
 
 import time
+from dataclasses import replace
 
 import cv2
 import numpy as np
 
+from pbsep.bitpack import PackedBinary, PackedBitmap
+from pbsep.cache import StageCache, hash_file
+from pbsep.encoding import encoding_report
+from pbsep.instrument import StageInstrument
 from pbsep.profiles import load_profile
 from pbsep.stages import (
     apply_morphological_correction,
+    apply_morphological_correction_packed,
     binarize,
     downscale,
     enhance_local_contrast,
     export_outputs,
     extract_luminance,
+    extract_luminance_fused,
     normalize_input,
+    prescale,
+)
+from pbsep.quality import pixel_agreement
+from pbsep.types import (
+    PipelineConfig,
+    PipelineError,
+    PipelineResult,
+    ProfileConfig,
+    StageParams,
 )
-from pbsep.types import PipelineConfig, PipelineError, PipelineResult, ProfileConfig
 
 
 class PBSEP256Pipeline:
@@ -26,16 +41,32 @@ class PBSEP256Pipeline:
     images to 1-bit monochrome bitmaps.
     """
 
-    def __init__(self, config: PipelineConfig, profile: ProfileConfig | None = None):
+    def __init__(
+        self,
+        config: PipelineConfig,
+        profile: ProfileConfig | None = None,
+        cache: StageCache | None = None,
+        pyramid_min_agreement: float | None = None,
+        instrument: StageInstrument | None = None,
+    ):
         """
         Initialize pipeline.
 
         Args:
             config: Pipeline configuration
             profile: Optional profile config (loads from config.profile_name if None)
+            cache: Optional stage cache for full-resolution intermediates
+            pyramid_min_agreement: Quality gate for pyramid mode. When set,
+                the binary output is also computed on the full-resolution
+                path and must agree on at least this percentage of pixels
+            instrument: Optional stage instrument (timing-only by default).
+                Records for each run land in metadata["stages"]
         """
         self.config = config
         self.profile = profile or load_profile(config.profile_name)
+        self.cache = cache
+        self.pyramid_min_agreement = pyramid_min_agreement
+        self.instrument = instrument or StageInstrument()
         self._validate()
 
     def _validate(self) -> None:
@@ -50,10 +81,23 @@ class PBSEP256Pipeline:
                 f"Input file not found: {self.config.input_path}"
             )
 
-    def execute(self) -> PipelineResult:
+        if (
+            self.pyramid_min_agreement is not None
+            and self.profile.stages.downscale.pyramid_factor == 0
+        ):
+            raise ValueError(
+                "pyramid_min_agreement requires pyramid mode "
+                f"(profile '{self.profile.name}' has pyramid_factor 0)"
+            )
+
+    def execute(self, export: bool = True) -> PipelineResult:
         """
         Execute the complete PBSEP-256 pipeline.
 
+        Args:
+            export: Write .bin, SVG, PNG and metadata files. When False, the
+                bitmap is only packed in memory (no potrace/magick processes)
+
         Returns:
             PipelineResult with bitmap and metadata
 
@@ -62,36 +106,16 @@ class PBSEP256Pipeline:
         """
         start_time = time.perf_counter()
         stages = self.profile.stages
+        stage_records = self.instrument.reset()
 
-        # Load image
-        image = cv2.imread(str(self.config.input_path), cv2.IMREAD_COLOR)
-        if image is None:
-            raise PipelineError(f"Failed to load image: {self.config.input_path}")
-
-        # Convert BGR to RGB
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-
-        # Stage 1: Input normalization (full resolution)
-        normalized = normalize_input(image, stages.normalize)
-
-        # Stage 2: Semantic luminance extraction (full resolution)
-        luminance = extract_luminance(normalized, stages.luminance)
-
-        # Stage 3: Optional contrast enhancement (for adaptive threshold modes)
-        if stages.contrast is not None:
-            luminance = enhance_local_contrast(luminance, stages.contrast)
-
-        # Stage 4: Downscale to target size
-        scaled = downscale(luminance, self.config.size, stages.downscale)
-
-        # Stage 5: Binarization (Canny or adaptive threshold)
-        binary = binarize(scaled, stages.binarize)
-
-        # Stage 6: Morphological correction
-        corrected = apply_morphological_correction(binary, stages.morphology)
+        # Stages 1-6: Luminance through morphology (bit-packed with the packed engine)
+        corrected, cached_stages = self._render()
 
         # Count opaque pixels (edges are 255, background is 0)
-        opaque_count = int(np.count_nonzero(corrected > 127))
+        if isinstance(corrected, PackedBinary):
+            opaque_count = corrected.count()
+        else:
+            opaque_count = int(np.count_nonzero(corrected > 127))
 
         total_pixels = self.config.size * self.config.size
 
@@ -105,26 +129,182 @@ class PBSEP256Pipeline:
             "opaquePixels": opaque_count,
             "totalPixels": total_pixels,
             "bytes": total_pixels // 8,
+            # Filled in as stages run; export appends its own steps before
+            # writing the metadata JSON
+            "stages": stage_records,
         }
+        if self.cache is not None:
+            metadata["cachedStages"] = cached_stages
+        if stages.downscale.pyramid_factor > 0:
+            metadata["pyramidFactor"] = stages.downscale.pyramid_factor
+            if self.pyramid_min_agreement is not None:
+                agreement = self._check_pyramid_quality(corrected, stages)
+                metadata["pyramidAgreementPct"] = round(agreement, 3)
 
         # Stage 6: Export
         # Edge detection outputs edges as 255, so we always use invert=True
         # to display them as black foreground on white background
-        bitmap, svg_path, png_path, metadata_path = export_outputs(
-            corrected,
-            self.config.output_dir,
-            self.config.output_name,
-            self.config.size,
-            True,  # Always invert for edge detection (edges=255 → black foreground)
-            metadata,
-        )
+        if export:
+            packed, svg_path, png_path, metadata_path = export_outputs(
+                corrected,
+                self.config.output_dir,
+                self.config.output_name,
+                self.config.size,
+                True,  # Always invert for edge detection (edges=255 → black foreground)
+                metadata,
+                vectorize=stages.export.vectorize,
+                instrument=self.instrument,
+            )
+        else:
+            packed = self.instrument.call("pack", PackedBitmap.from_image, corrected, True)
+            with self.instrument.stage("encode"):
+                metadata["encodings"] = encoding_report([packed], packed.width, packed.height)[0]
 
         elapsed_ms = (time.perf_counter() - start_time) * 1000
 
         return PipelineResult(
-            bitmap=bitmap,
+            bitmap=bytes(packed),
             opaque_count=opaque_count,
             total_pixels=total_pixels,
             metadata=metadata,
             processing_time_ms=elapsed_ms,
+            packed=packed,
+        )
+
+    def render(self) -> tuple[np.ndarray, int]:
+        """
+        Run stages 1-6 (normalize through morphology) without exporting.
+
+        Returns:
+            Tuple of (binary image as uint8 0/255, stages served from cache)
+        """
+        corrected, cached_stages = self._render()
+        if isinstance(corrected, PackedBinary):
+            corrected = corrected.to_array()
+        return corrected, cached_stages
+
+    def _render(self) -> tuple[np.ndarray | PackedBinary, int]:
+        """Run stages 1-6, keeping the packed engine's output bit-packed."""
+        stages = self.profile.stages
+
+        # Stages 1-3: Luminance at input (or pyramid) resolution, optionally cached
+        luminance, cached_stages = self._luminance(stages)
+
+        # Stages 4-6: Downscale, binarize, morphology
+        return self._binarize(luminance, stages), cached_stages
+
+    def _load_image(self) -> np.ndarray:
+        """Load the input image as RGB uint8."""
+        image = cv2.imread(str(self.config.input_path), cv2.IMREAD_COLOR)
+        if image is None:
+            raise PipelineError(f"Failed to load image: {self.config.input_path}")
+
+        # Convert BGR to RGB
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    def _luminance(self, stages: StageParams) -> tuple[np.ndarray, int]:
+        """
+        Run the luminance stages: normalize, luminance and contrast.
+
+        These run at input resolution, or at the intermediate pyramid
+        resolution when ``downscale.pyramid_factor`` is set. With a stage
+        cache, the longest cached prefix for this input file and params
+        chain is loaded zero-copy and only the remaining stages run.
+
+        Returns:
+            Tuple of (luminance as float32 [0, 1], stages served from cache)
+        """
+        size = self.config.size
+
+        # Stages 1+2 form a single cached step: the normalized RGB image is
+        # three times the size of the luminance and never reused on its own
+        def luminance_step(_: None) -> np.ndarray:
+            stage = self.instrument.call
+            image = stage("load", self._load_image)
+            if stages.downscale.pyramid_factor > 0:
+                image = stage("prescale", prescale, image, size, stages.downscale)
+            if stages.luminance.fused:
+                return stage(
+                    "luminance_fused",
+                    extract_luminance_fused, image, stages.normalize, stages.luminance,
+                )
+            normalized = stage("normalize", normalize_input, image, stages.normalize)
+            del image
+            return stage("luminance", extract_luminance, normalized, stages.luminance)
+
+        luminance_key = (stages.normalize, stages.luminance)
+        if stages.downscale.pyramid_factor > 0:
+            luminance_key += (stages.downscale, size)
+        steps = [(luminance_key, luminance_step)]
+
+        # Stage 3: Optional contrast enhancement (for adaptive threshold modes)
+        if stages.contrast is not None:
+            steps.append(
+                (
+                    stages.contrast,
+                    lambda lum: self.instrument.call(
+                        "contrast", enhance_local_contrast, lum, stages.contrast
+                    ),
+                )
+            )
+
+        if self.cache is None:
+            output = None
+            for _, fn in steps:
+                output = fn(output)
+            return output, 0
+
+        return self.cache.run_chain(hash_file(self.config.input_path), steps)
+
+    def _binarize(
+        self, luminance: np.ndarray, stages: StageParams
+    ) -> np.ndarray | PackedBinary:
+        """
+        Run downscale, binarization and morphology on a luminance image.
+
+        With the packed morphology engine the result stays bit-packed, so
+        opacity and the .bin/PBM exports read it without unpacking.
+        """
+        stage = self.instrument.call
+
+        # Stage 4: Downscale to target size
+        scaled = stage("downscale", downscale, luminance, self.config.size, stages.downscale)
+
+        # Stage 5: Binarization (Canny or adaptive threshold)
+        binary = stage("binarize", binarize, scaled, stages.binarize)
+
+        # Stage 6: Morphological correction
+        if stages.morphology.engine == "packed":
+            return stage(
+                "morphology", apply_morphological_correction_packed, binary, stages.morphology
+            )
+        return stage(
+            "morphology", apply_morphological_correction, binary, stages.morphology
         )
+
+    def _check_pyramid_quality(
+        self, binary: np.ndarray | PackedBinary, stages: StageParams
+    ) -> float:
+        """
+        Compare pyramid-mode output against the full-resolution path.
+
+        Returns:
+            Pixel agreement percentage
+
+        Raises:
+            PipelineError: If agreement is below pyramid_min_agreement
+        """
+        full_stages = replace(stages, downscale=replace(stages.downscale, pyramid_factor=0))
+        with self.instrument.scope("fullres/"):
+            luminance, _ = self._luminance(full_stages)
+            reference = self._binarize(luminance, full_stages)
+
+        if isinstance(binary, PackedBinary):
+            binary, reference = binary.to_array(), reference.to_array()
+        agreement = pixel_agreement(binary, reference)
+        if agreement < self.pyramid_min_agreement:
+            raise PipelineError(
+                f"Pyramid quality gate failed: {agreement:.2f}% pixel agreement "
+                f"with full-resolution path (minimum {self.pyramid_min_agreement}%)"
+            )
+        return agreement
@@ -1,5 +1,5 @@
 """Profile system for PBSEP-256."""
 
-from pbsep.profiles.loader import load_profile
+from pbsep.profiles.loader import clear_profile_cache, load_profile, save_profile
 
-__all__ = ["load_profile"]
+__all__ = ["clear_profile_cache", "load_profile", "save_profile"]
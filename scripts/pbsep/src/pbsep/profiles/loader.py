@@ -1,29 +1,44 @@
 """Profile loading and validation."""
 
+import os
+import threading
+import types
+from dataclasses import MISSING, asdict, fields, is_dataclass
+from functools import cache
 from pathlib import Path
+from typing import Any, NamedTuple, Union, get_args, get_origin, get_type_hints
 
 import yaml
 
 from pbsep.types import (
-    BinarizeParams,
-    ContrastParams,
-    DownscaleParams,
-    ExportParams,
-    LuminanceParams,
-    MorphologyParams,
-    NormalizeParams,
+    InvalidProfileError,
     ProfileConfig,
     ProfileNotFoundError,
-    StageParams,
 )
 
 PROFILES_DIR = Path(__file__).parent / "defaults"
 
+# Resolved path -> (mtime_ns, size, profile). Profiles are frozen, so one
+# parsed instance is shared by every caller until the file changes.
+_profile_cache: dict[Path, tuple[int, int, ProfileConfig]] = {}
+_profile_cache_lock = threading.Lock()
+
+
+class _Field(NamedTuple):
+    """Compiled schema entry for one dataclass field."""
+
+    kind: type  # scalar type or nested params dataclass
+    optional: bool  # annotated `X | None`
+    required: bool  # no default value
+
 
 def load_profile(name_or_path: str | Path) -> ProfileConfig:
     """
     Load a profile by name (built-in) or path (custom).
 
+    Parsed profiles are cached by path and modification time, so repeated
+    loads of an unchanged file skip YAML parsing and validation.
+
     Args:
         name_or_path: Profile name (e.g., "medallion") or path to YAML file
 
@@ -32,81 +47,160 @@ def load_profile(name_or_path: str | Path) -> ProfileConfig:
 
     Raises:
         ProfileNotFoundError: If profile doesn't exist
+        InvalidProfileError: If the profile has unknown keys or wrongly
+            typed values
     """
     path = Path(name_or_path)
-
-    # Check if it's a path to a file
-    if path.suffix in (".yaml", ".yml") or "/" in str(name_or_path):
-        if not path.exists():
-            raise ProfileNotFoundError(f"Profile file not found: {path}")
-    else:
+    is_file = path.suffix in (".yaml", ".yml") or "/" in str(name_or_path)
+    if not is_file:
         # Built-in profile
         path = PROFILES_DIR / f"{name_or_path}.yaml"
-        if not path.exists():
-            available = [p.stem for p in PROFILES_DIR.glob("*.yaml")]
-            raise ProfileNotFoundError(
-                f"Unknown profile '{name_or_path}'. Available: {', '.join(available)}"
-            )
+
+    try:
+        path = Path(os.path.abspath(path))  # no symlink walk, unlike resolve()
+        stat = os.stat(path)
+    except FileNotFoundError:
+        if is_file:
+            raise ProfileNotFoundError(f"Profile file not found: {path}") from None
+        available = [p.stem for p in PROFILES_DIR.glob("*.yaml")]
+        raise ProfileNotFoundError(
+            f"Unknown profile '{name_or_path}'. Available: {', '.join(available)}"
+        ) from None
+
+    with _profile_cache_lock:
+        cached = _profile_cache.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
 
     with open(path) as f:
-        data = yaml.safe_load(f)
+        try:
+            data = yaml.safe_load(f)
+        except yaml.YAMLError as e:
+            raise InvalidProfileError(f"{path}: invalid YAML: {e}") from None
+
+    try:
+        profile = _parse_profile(data)
+    except InvalidProfileError as e:
+        raise InvalidProfileError(f"{path}: {e}") from None
+
+    with _profile_cache_lock:
+        _profile_cache[path] = (stat.st_mtime_ns, stat.st_size, profile)
+    return profile
+
 
-    return _parse_profile(data)
+def clear_profile_cache() -> None:
+    """Forget all parsed profiles (the next load re-reads each file)."""
+    with _profile_cache_lock:
+        _profile_cache.clear()
 
 
-def _parse_profile(data: dict) -> ProfileConfig:
-    """Parse profile data into ProfileConfig."""
-    stages = data.get("stages", {})
+def _parse_profile(data: Any) -> ProfileConfig:
+    """Parse and validate profile data into ProfileConfig."""
+    if not isinstance(data, dict):
+        raise InvalidProfileError(f"expected a mapping, got {type(data).__name__}")
 
-    # Support both 'binarize' (new) and 'edges' (legacy) keys
-    binarize_data = stages.get("binarize", stages.get("edges", {}))
+    stages = data.get("stages")
+    if isinstance(stages, dict) and "edges" in stages:
+        # Support both 'binarize' (new) and 'edges' (legacy) keys
+        if "binarize" in stages:
+            raise InvalidProfileError("stages: give 'binarize' or legacy 'edges', not both")
+        stages = {("binarize" if key == "edges" else key): value for key, value in stages.items()}
+        data = {**data, "stages": stages}
 
-    # Parse optional contrast stage
-    contrast_data = stages.get("contrast")
-    contrast_params = None
-    if contrast_data:
-        contrast_params = ContrastParams(
-            method=contrast_data.get("method", "clahe"),
-            clip_limit=contrast_data.get("clip_limit", 2.0),
-            tile_size=contrast_data.get("tile_size", 8),
+    return _parse(ProfileConfig, data, "profile")
+
+
+def _parse(cls: type, data: Any, where: str) -> Any:
+    """
+    Build a dataclass from a mapping using its compiled schema.
+
+    Missing fields take the dataclass default; missing nested stages
+    take that stage's defaults; an absent or empty optional stage is None.
+    """
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        raise InvalidProfileError(f"{where}: expected a mapping, got {type(data).__name__}")
+
+    schema = _schema(cls)
+    unknown = data.keys() - schema.keys()
+    if unknown:
+        raise InvalidProfileError(
+            f"{where}: unknown key(s) {', '.join(sorted(map(str, unknown)))}; "
+            f"expected {', '.join(schema)}"
         )
 
-    return ProfileConfig(
-        name=data["name"],
-        stages=StageParams(
-            normalize=NormalizeParams(
-                gamma=stages.get("normalize", {}).get("gamma", 2.2),
-                percentile_low=stages.get("normalize", {}).get("percentile_low", 1),
-                percentile_high=stages.get("normalize", {}).get("percentile_high", 99),
-            ),
-            luminance=LuminanceParams(
-                method=stages.get("luminance", {}).get("method", "lab_l"),
-            ),
-            downscale=DownscaleParams(
-                interpolation=stages.get("downscale", {}).get("interpolation", "area"),
-            ),
-            binarize=BinarizeParams(
-                method=binarize_data.get("method", "canny"),
-                pre_blur_sigma=binarize_data.get("pre_blur_sigma", 0.5),
-                low_threshold=binarize_data.get("low_threshold", 50),
-                high_threshold=binarize_data.get("high_threshold", 150),
-                dilate_kernel=binarize_data.get("dilate_kernel", 3),
-                dilate_iterations=binarize_data.get("dilate_iterations", 0),
-                block_size=binarize_data.get("block_size", 15),
-                c_constant=binarize_data.get("c_constant", 5),
-            ),
-            morphology=MorphologyParams(
-                kernel_shape=stages.get("morphology", {}).get("kernel_shape", "ellipse"),
-                kernel_size=stages.get("morphology", {}).get("kernel_size", 3),
-                close_iterations=stages.get("morphology", {}).get("close_iterations", 1),
-                open_iterations=stages.get("morphology", {}).get("open_iterations", 1),
-            ),
-            export=ExportParams(
-                format=stages.get("export", {}).get("format", "1bit_png"),
-                foreground_color=stages.get("export", {}).get(
-                    "foreground_color", "000000"
-                ),
-            ),
-            contrast=contrast_params,
-        ),
-    )
+    values = {}
+    for name, field in schema.items():
+        value = data.get(name)
+        key = f"{where}.{name}"
+        if is_dataclass(field.kind):
+            if field.optional and not value:
+                values[name] = None
+            else:
+                values[name] = _parse(field.kind, value, key)
+        elif name in data:
+            values[name] = _coerce(field, value, key)
+        elif field.required:
+            raise InvalidProfileError(f"{key}: required")
+    return cls(**values)
+
+
+def _coerce(field: _Field, value: Any, where: str) -> Any:
+    """Check a scalar value against its field type."""
+    if value is None and field.optional:
+        return None
+    kind = field.kind
+    # bool is an int subclass, but true/false must not pass as numbers
+    if kind is bool:
+        ok = isinstance(value, bool)
+    elif kind is float:
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif kind is int:
+        ok = isinstance(value, int) and not isinstance(value, bool)
+    else:
+        ok = isinstance(value, kind)
+    if not ok:
+        hint = " (quote hex colors and other digit strings)" if kind is str else ""
+        raise InvalidProfileError(
+            f"{where}: expected {kind.__name__}, got {type(value).__name__} {value!r}{hint}"
+        )
+    return float(value) if kind is float else value
+
+
+@cache
+def _schema(cls: type) -> dict[str, _Field]:
+    """Compile a dataclass's fields into name -> _Field, once per class."""
+    hints = get_type_hints(cls)
+    schema = {}
+    for field in fields(cls):
+        kind = hints[field.name]
+        optional = False
+        if get_origin(kind) in (Union, types.UnionType):
+            args = [arg for arg in get_args(kind) if arg is not type(None)]
+            optional = len(args) < len(get_args(kind))
+            if len(args) != 1:
+                raise TypeError(f"{cls.__name__}.{field.name}: unsupported type {kind}")
+            kind = args[0]
+        required = field.default is MISSING and field.default_factory is MISSING
+        schema[field.name] = _Field(kind, optional, required and not is_dataclass(kind))
+    return schema
+
+
+def save_profile(profile: ProfileConfig, path: Path) -> None:
+    """
+    Write a profile as YAML in the same layout load_profile reads.
+
+    Args:
+        profile: Profile to write
+        path: Destination YAML path
+    """
+    stages = {}
+    for field in fields(profile.stages):
+        params = getattr(profile.stages, field.name)
+        if params is not None:
+            stages[field.name] = asdict(params)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        yaml.safe_dump({"name": profile.name, "stages": stages}, f, sort_keys=False)
@@ -0,0 +1,19 @@
+"""Output quality metrics for comparing binary bitmaps."""
+
+import numpy as np
+
+
+def pixel_agreement(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Percentage of pixels with the same foreground/background value.
+
+    Args:
+        a: Binary image as uint8 (0 or 255)
+        b: Binary image as uint8 (0 or 255), same shape as ``a``
+
+    Returns:
+        Agreement in percent [0, 100]
+    """
+    if a.shape != b.shape:
+        raise ValueError(f"Shape mismatch: {a.shape} vs {b.shape}")
+    return float(np.count_nonzero((a > 127) == (b > 127))) / a.size * 100
@@ -0,0 +1,560 @@
+"""Parameter-space search over binarization stages, replacing hand-edited matrices."""
+
+import itertools
+import json
+import math
+from dataclasses import dataclass, fields, replace
+from functools import partial
+from pathlib import Path
+
+import cv2
+import numpy as np
+import yaml
+
+from pbsep.cache import StageCache, hash_file
+from pbsep.parallel import resolve_workers, shared_array, shared_array_pool
+from pbsep.profiles import load_profile, save_profile
+from pbsep.quality import pixel_agreement
+from pbsep.stages import (
+    apply_morphological_correction,
+    binarize,
+    downscale,
+    enhance_local_contrast,
+    extract_luminance,
+    extract_luminance_fused,
+    normalize_input,
+    prescale,
+)
+from pbsep.types import (
+    BinarizeParams,
+    ContrastParams,
+    MorphologyParams,
+    PipelineError,
+    ProfileConfig,
+    StageParams,
+)
+
+STRATEGIES = ("grid", "random", "bayesian")
+
+# Stages that run after the shared luminance and can be searched
+SEARCHABLE_SECTIONS = {
+    "contrast": ContrastParams,
+    "binarize": BinarizeParams,
+    "morphology": MorphologyParams,
+}
+
+# Default number of points per continuous dimension in grid mode
+DEFAULT_GRID_STEPS = 5
+
+# Bayesian (TPE) settings
+TPE_STARTUP = 10  # random evaluations before the model kicks in
+TPE_GAMMA = 0.25  # fraction of observations treated as "good"
+TPE_CANDIDATES = 32  # samples drawn from the good density per suggestion
+
+
+@dataclass(frozen=True)
+class Dimension:
+    """One searchable parameter: categorical choices or a numeric range."""
+
+    key: str  # "section.field", or "contrast.enabled"
+    choices: tuple | None = None
+    low: float | None = None
+    high: float | None = None
+    integer: bool = False
+    steps: int = DEFAULT_GRID_STEPS
+
+    def grid(self) -> list:
+        """Values enumerated in grid mode."""
+        if self.choices is not None:
+            return list(self.choices)
+        if self.integer:
+            if not self.steps:
+                return list(range(int(self.low), int(self.high) + 1))
+            # Rounded linspace keeps both ends; unique drops collisions on short spans
+            points = np.round(np.linspace(int(self.low), int(self.high), self.steps))
+            return [int(v) for v in np.unique(points.astype(int))]
+        return [float(v) for v in np.linspace(self.low, self.high, self.steps)]
+
+    def sample(self, rng: np.random.Generator):
+        """Draw a value uniformly from the prior."""
+        if self.choices is not None:
+            return self.choices[rng.integers(len(self.choices))]
+        if self.integer:
+            return int(rng.integers(int(self.low), int(self.high) + 1))
+        return float(rng.uniform(self.low, self.high))
+
+
+@dataclass(frozen=True)
+class SearchSpec:
+    """Search configuration loaded from YAML."""
+
+    profile: str
+    strategy: str
+    dimensions: tuple[Dimension, ...]
+    budget: int = 100
+    seed: int = 0
+    top: int = 5
+    patience: int = 0  # Stop after this many rounds without improvement (0 = never)
+    opacity_band: tuple[float, float] | None = None
+    reference: Path | None = None
+
+
+@dataclass
+class SearchResult:
+    """One evaluated candidate."""
+
+    params: dict
+    score: float
+    opacity_pct: float
+    agreement_pct: float | None = None
+
+
+def load_search_spec(path: Path) -> SearchSpec:
+    """
+    Load and validate a search spec.
+
+    Example::
+
+        profile: medallion
+        strategy: bayesian      # grid | random | bayesian
+        budget: 200
+        objective:
+          opacity_band: [15, 20]
+          reference: reference.png   # optional, relative to the spec file
+        space:
+          binarize.block_size: [7, 9, 11, 15]
+          binarize.c_constant: {min: 1, max: 8}
+          contrast.enabled: [true, false]
+          contrast.clip_limit: {min: 1.0, max: 4.0, steps: 4}
+
+    Raises:
+        ValueError: On invalid strategy, dimension or objective
+    """
+    with open(path) as f:
+        data = yaml.safe_load(f) or {}
+
+    strategy = data.get("strategy", "random")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown search strategy: {strategy}. Use one of {STRATEGIES}")
+
+    space = data.get("space") or {}
+    if not space:
+        raise ValueError("Search spec has an empty 'space'")
+    dimensions = tuple(_parse_dimension(key, value) for key, value in space.items())
+
+    objective = data.get("objective") or {}
+    band = objective.get("opacity_band")
+    if band is not None:
+        if len(band) != 2 or band[0] > band[1]:
+            raise ValueError(f"Invalid opacity_band: {band}")
+        band = (float(band[0]), float(band[1]))
+    reference = objective.get("reference")
+    if reference is not None:
+        reference = (path.parent / reference).resolve()
+
+    return SearchSpec(
+        profile=data.get("profile", "medallion"),
+        strategy=strategy,
+        dimensions=dimensions,
+        budget=int(data.get("budget", 100)),
+        seed=int(data.get("seed", 0)),
+        top=int(data.get("top", 5)),
+        patience=int(data.get("patience", 0)),
+        opacity_band=band,
+        reference=reference,
+    )
+
+
+def _parse_dimension(key: str, value) -> Dimension:
+    """Parse one ``space`` entry, validating it against the stage dataclasses."""
+    section, _, name = key.partition(".")
+    params_cls = SEARCHABLE_SECTIONS.get(section)
+    if params_cls is None:
+        raise ValueError(
+            f"Cannot search '{key}': section must be one of {sorted(SEARCHABLE_SECTIONS)}"
+        )
+    field_types = {f.name: f.type for f in fields(params_cls)}
+    if section == "contrast":
+        field_types["enabled"] = bool
+    if name not in field_types:
+        raise ValueError(f"Unknown parameter '{key}'")
+
+    if isinstance(value, list):
+        if not value:
+            raise ValueError(f"Empty choices for '{key}'")
+        return Dimension(key, choices=tuple(value))
+    if isinstance(value, dict) and "min" in value and "max" in value:
+        if value["min"] > value["max"]:
+            raise ValueError(f"Invalid range for '{key}': min > max")
+        return Dimension(
+            key,
+            low=value["min"],
+            high=value["max"],
+            integer=field_types[name] in (int, "int"),
+            steps=int(value.get("steps", DEFAULT_GRID_STEPS)),
+        )
+    raise ValueError(f"'{key}' must be a list of choices or a {{min, max}} range")
+
+
+def apply_params(stages: StageParams, params: dict) -> StageParams:
+    """Apply ``section.field`` overrides to stage params."""
+    overrides: dict[str, dict] = {}
+    for key, value in params.items():
+        section, _, name = key.partition(".")
+        overrides.setdefault(section, {})[name] = value
+
+    contrast = overrides.pop("contrast", None)
+    if contrast is not None:
+        enabled = contrast.pop("enabled", True)
+        if not enabled:
+            stages = replace(stages, contrast=None)
+        else:
+            stages = replace(
+                stages, contrast=replace(stages.contrast or ContrastParams(), **contrast)
+            )
+
+    for section, values in overrides.items():
+        stages = replace(stages, **{section: replace(getattr(stages, section), **values)})
+    return stages
+
+
+def run_search(
+    spec: SearchSpec,
+    input_path: Path,
+    output_dir: Path,
+    size: int = 256,
+    workers: int = 1,
+    cache: StageCache | None = None,
+) -> list[SearchResult]:
+    """
+    Search the parameter space and write the best configs as profile YAML.
+
+    The full-resolution luminance is computed once (through the stage
+    cache if given) and shared with workers. Candidates are evaluated in
+    memory only: CLAHE and downscale outputs are memoized per contrast
+    setting, duplicate candidates are never re-evaluated, and nothing is
+    exported, so each evaluation is just binarize + morphology at the
+    target size. Every strategy evaluates in rounds and stops early after
+    ``spec.patience`` rounds without improvement; with patience set, the
+    grid is visited in seeded random order so an early stop still covers
+    the whole space.
+
+    Args:
+        spec: Search configuration
+        input_path: Input image path
+        output_dir: Directory for profile YAML and search.json
+        size: Target size (128 or 256)
+        workers: Worker processes (1 = sequential, 0 = one per CPU core)
+        cache: Optional stage cache for the shared luminance
+
+    Returns:
+        All evaluated candidates, best first
+    """
+    if spec.opacity_band is None and spec.reference is None:
+        raise ValueError("Search objective needs an opacity_band and/or a reference image")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    base = load_profile(spec.profile)
+    luminance = _base_luminance(input_path, base.stages, size, cache)
+    reference = _load_reference(spec.reference, size) if spec.reference else None
+
+    evaluate = partial(
+        _evaluate,
+        base_stages=base.stages,
+        size=size,
+        opacity_band=spec.opacity_band,
+        reference=reference,
+    )
+
+    rng = np.random.default_rng(spec.seed)
+    workers = resolve_workers(workers)
+    batch_size = max(workers * 4, 8)
+    seen: dict[tuple, SearchResult] = {}
+
+    def run_batches(map_fn):
+        best = math.inf
+        stale_rounds = 0
+        empty_rounds = 0
+        candidates = _grid(spec, rng) if spec.strategy == "grid" else None
+        while len(seen) < spec.budget:
+            remaining = spec.budget - len(seen)
+            if candidates is not None:
+                if not candidates:
+                    break
+                batch = candidates[:min(batch_size, remaining)]
+                candidates = candidates[len(batch):]
+            else:
+                batch = _suggest(spec, list(seen.values()), rng, min(batch_size, remaining))
+
+            batch = _dedupe(batch, seen)[:remaining]
+            if not batch:
+                # Random proposals keep colliding: the space is (nearly) exhausted
+                empty_rounds += 1
+                if empty_rounds >= 3:
+                    break
+                continue
+            empty_rounds = 0
+
+            for params, result in zip(batch, map_fn(evaluate, batch)):
+                seen[_candidate_key(params)] = result
+                print(
+                    f"  [{len(seen):04d}/{spec.budget}] score={result.score:7.3f} "
+                    f"opacity={result.opacity_pct:5.1f}% {_format_params(params)}"
+                )
+
+            round_best = min(r.score for r in seen.values())
+            if round_best < best:
+                best = round_best
+                stale_rounds = 0
+            else:
+                stale_rounds += 1
+            if spec.patience and stale_rounds >= spec.patience:
+                print(f"  No improvement for {spec.patience} rounds, stopping early")
+                break
+
+    if workers <= 1:
+        run_batches(lambda fn, batch: [fn(params, luminance) for params in batch])
+    else:
+        with shared_array_pool(luminance, workers) as executor:
+            run_batches(lambda fn, batch: executor.map(partial(_evaluate_shared, fn), batch))
+
+    results = sorted(seen.values(), key=lambda r: r.score)
+    _write_results(results, base, spec, output_dir)
+    return results
+
+
+def _base_luminance(
+    input_path: Path, stages: StageParams, size: int, cache: StageCache | None
+) -> np.ndarray:
+    """Compute (or load from cache) the shared luminance before contrast."""
+
+    def luminance_step(_: None) -> np.ndarray:
+        image = cv2.imread(str(input_path), cv2.IMREAD_COLOR)
+        if image is None:
+            raise PipelineError(f"Failed to load image: {input_path}")
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image = prescale(image, size, stages.downscale)
+        if stages.luminance.fused:
+            return extract_luminance_fused(image, stages.normalize, stages.luminance)
+        return extract_luminance(normalize_input(image, stages.normalize), stages.luminance)
+
+    # Same key layout as PBSEP256Pipeline, so single runs and searches share entries
+    key = (stages.normalize, stages.luminance)
+    if stages.downscale.pyramid_factor > 0:
+        key += (stages.downscale, size)
+
+    if cache is None:
+        return luminance_step(None)
+    luminance, _ = cache.run_chain(hash_file(input_path), [(key, luminance_step)])
+    return np.asarray(luminance)
+
+
+def _load_reference(path: Path, size: int) -> np.ndarray:
+    """Load a black-on-white reference as a 0/255 foreground mask at target size."""
+    image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise PipelineError(f"Failed to load reference image: {path}")
+    scaled = cv2.resize(image, (size, size), interpolation=cv2.INTER_AREA)
+    return np.where(scaled < 128, 255, 0).astype(np.uint8)
+
+
+# Per-process memo of contrast + downscale outputs for the current luminance
+_scaled_memo: dict = {"source": None, "scaled": {}}
+_SCALED_MEMO_SIZE = 16
+
+
+def _scaled_luminance(luminance: np.ndarray, stages: StageParams, size: int) -> np.ndarray:
+    """Contrast-enhance and downscale, memoized by (contrast, downscale) params."""
+    if _scaled_memo["source"] is not luminance:
+        _scaled_memo["source"] = luminance
+        _scaled_memo["scaled"] = {}
+
+    memo = _scaled_memo["scaled"]
+    key = (stages.contrast, stages.downscale, size)
+    if key not in memo:
+        if len(memo) >= _SCALED_MEMO_SIZE:
+            memo.clear()
+        source = luminance
+        if stages.contrast is not None:
+            source = enhance_local_contrast(luminance, stages.contrast)
+        memo[key] = downscale(source, size, stages.downscale)
+    return memo[key]
+
+
+def _evaluate_shared(evaluate, params: dict) -> SearchResult:
+    """Worker entry point: evaluate a candidate against the shared luminance."""
+    return evaluate(params, shared_array())
+
+
+def _evaluate(
+    params: dict,
+    luminance: np.ndarray,
+    base_stages: StageParams,
+    size: int,
+    opacity_band: tuple[float, float] | None,
+    reference: np.ndarray | None,
+) -> SearchResult:
+    """Score one candidate (lower is better). Invalid candidates score inf."""
+    stages = apply_params(base_stages, params)
+
+    try:
+        scaled = _scaled_luminance(luminance, stages, size)
+        binary = binarize(scaled, stages.binarize)
+        corrected = apply_morphological_correction(binary, stages.morphology)
+    except (cv2.error, ValueError):
+        return SearchResult(params=params, score=math.inf, opacity_pct=0.0)
+
+    opacity = float(np.count_nonzero(corrected > 127)) / corrected.size * 100
+    score = 0.0
+    if opacity_band is not None:
+        low, high = opacity_band
+        # Distance outside the band, with a small pull toward its center
+        score += max(low - opacity, 0.0, opacity - high)
+        score += 0.01 * abs(opacity - (low + high) / 2)
+
+    agreement = None
+    if reference is not None:
+        agreement = pixel_agreement(corrected, reference)
+        score += 100.0 - agreement
+
+    return SearchResult(
+        params=params, score=score, opacity_pct=opacity, agreement_pct=agreement
+    )
+
+
+def _candidate_key(params: dict) -> tuple:
+    return tuple(sorted(params.items()))
+
+
+def _dedupe(batch: list[dict], seen: dict) -> list[dict]:
+    unique = {}
+    for params in batch:
+        key = _candidate_key(params)
+        if key not in seen:
+            unique.setdefault(key, params)
+    return list(unique.values())
+
+
+def _grid(spec: SearchSpec, rng: np.random.Generator) -> list[dict]:
+    """
+    Full cartesian grid, in deterministic order.
+
+    With early stopping the order is a seeded shuffle, so the rounds
+    evaluated before a stop sample the whole grid rather than its first
+    corner.
+    """
+    keys = [d.key for d in spec.dimensions]
+    values = [d.grid() for d in spec.dimensions]
+    grid = [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+    if spec.patience:
+        grid = [grid[i] for i in rng.permutation(len(grid))]
+    return grid
+
+
+def _suggest(
+    spec: SearchSpec, history: list[SearchResult], rng: np.random.Generator, count: int
+) -> list[dict]:
+    """Propose candidates: uniform random, or TPE once enough history exists."""
+    finite = [r for r in history if math.isfinite(r.score)]
+    if spec.strategy == "random" or len(finite) < TPE_STARTUP:
+        return [{d.key: d.sample(rng) for d in spec.dimensions} for _ in range(count)]
+    return [_suggest_tpe(spec, finite, rng) for _ in range(count)]
+
+
+def _suggest_tpe(
+    spec: SearchSpec, history: list[SearchResult], rng: np.random.Generator
+) -> dict:
+    """
+    Tree-structured Parzen estimator suggestion.
+
+    Splits history into good/bad by score quantile, draws candidates from
+    a per-dimension density fitted to the good set and returns the one
+    maximizing l(x) / g(x). Dimensions are treated independently.
+    """
+    ranked = sorted(history, key=lambda r: r.score)
+    n_good = max(1, int(len(ranked) * TPE_GAMMA))
+    good = [r.params for r in ranked[:n_good]]
+    bad = [r.params for r in ranked[n_good:]] or good
+
+    candidates = []
+    log_ratio = np.zeros(TPE_CANDIDATES)
+    for dim in spec.dimensions:
+        good_values = [p[dim.key] for p in good if dim.key in p]
+        bad_values = [p[dim.key] for p in bad if dim.key in p]
+
+        if dim.choices is not None:
+            choices = list(dim.choices)
+            good_p = _categorical_density(choices, good_values)
+            bad_p = _categorical_density(choices, bad_values)
+            picks = rng.choice(len(choices), size=TPE_CANDIDATES, p=good_p)
+            samples = [choices[i] for i in picks]
+            log_ratio += np.log(good_p[picks]) - np.log(bad_p[picks])
+        else:
+            good_arr = np.asarray(good_values, dtype=float)
+            bad_arr = np.asarray(bad_values, dtype=float)
+            width = max(float(dim.high - dim.low), 1e-9)
+            bandwidth = width / max(len(good_arr), 1) ** 0.5 / 2
+            centers = good_arr[rng.integers(len(good_arr), size=TPE_CANDIDATES)]
+            draws = np.clip(rng.normal(centers, bandwidth), dim.low, dim.high)
+            if dim.integer:
+                draws = np.round(draws)
+            samples = [int(v) if dim.integer else float(v) for v in draws]
+            log_ratio += np.log(_parzen(draws, good_arr, bandwidth)) - np.log(
+                _parzen(draws, bad_arr, width / max(len(bad_arr), 1) ** 0.5 / 2)
+            )
+        candidates.append(samples)
+
+    best = int(np.argmax(log_ratio))
+    return {dim.key: candidates[i][best] for i, dim in enumerate(spec.dimensions)}
+
+
+def _categorical_density(choices: list, observed: list) -> np.ndarray:
+    counts = np.ones(len(choices))  # Laplace smoothing
+    for value in observed:
+        if value in choices:
+            counts[choices.index(value)] += 1
+    return counts / counts.sum()
+
+
+def _parzen(x: np.ndarray, centers: np.ndarray, bandwidth: float) -> np.ndarray:
+    diff = (x[:, None] - centers[None, :]) / bandwidth
+    return np.exp(-0.5 * diff**2).mean(axis=1) + 1e-12
+
+
+def _format_params(params: dict) -> str:
+    return " ".join(f"{k}={v:.3g}" if isinstance(v, float) else f"{k}={v}" for k, v in params.items())
+
+
+def _write_results(
+    results: list[SearchResult], base: ProfileConfig, spec: SearchSpec, output_dir: Path
+) -> None:
+    """Write the top configs as profile YAML and all results as search.json."""
+    best = [r for r in results if math.isfinite(r.score)][:spec.top]
+    for rank, result in enumerate(best, start=1):
+        profile = ProfileConfig(
+            name=f"{base.name}_search_{rank:02d}",
+            stages=apply_params(base.stages, result.params),
+        )
+        save_profile(profile, output_dir / f"{profile.name}.yaml")
+
+    with open(output_dir / "search.json", "w") as f:
+        json.dump(
+            {
+                "profile": spec.profile,
+                "strategy": spec.strategy,
+                "evaluated": len(results),
+                "opacity_band": spec.opacity_band,
+                "reference": str(spec.reference) if spec.reference else None,
+                "results": [
+                    {
+                        "params": r.params,
+                        "score": r.score if math.isfinite(r.score) else None,
+                        "opacity_pct": round(r.opacity_pct, 2),
+                        "agreement_pct": r.agreement_pct,
+                    }
+                    for r in results
+                ],
+            },
+            f,
+            indent=2,
+        )
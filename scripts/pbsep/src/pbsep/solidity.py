@@ -1,34 +1,96 @@
 """Solidity library generator for on-chain pixel art storage."""
 
+import hashlib
+import json
+import re
+from pathlib import Path
 
-def generate_solidity_library(
-    name: str,
-    bitmap: bytes,
-    size: int,
-    color: str = "000000",
-) -> str:
-    """
-    Generate Solidity library matching existing image-to-1bit.js output format.
+import click
 
-    Args:
-        name: Base name for the library (will be capitalized)
-        bitmap: Packed bitmap bytes
-        size: Image dimension (128 or 256)
-        color: Foreground color as hex string (without #)
+from pbsep.bitpack import PackedBitmap
+from pbsep.encoding import (
+    EIP170_CODE_LIMIT,
+    delta_encode,
+    deploy_gas,
+    encoding_report,
+    rle_encode,
+    similarity,
+)
 
-    Returns:
-        Solidity library source code
-    """
-    lib_name = name[0].upper() + name[1:] + f"{size}Mono"
-    hex_bitmap = bitmap.hex()
-    total_bytes = len(bitmap)
+LAYOUTS = ("full", "rle", "delta", "chunked")
+
+CODEC_LIBRARY = "PBSEPCodec"
+CHUNKS_LIBRARY = "PBSEPChunks"
+
+CODEC_SOURCE = '''// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.24;
+
+/**
+ * @title PBSEPCodec
+ * @dev Decoders for compact PBSEP-256 bitmap encodings
+ * @notice Generated by PBSEP-256 - Do not edit manually
+ */
+library PBSEPCodec {
+    /// @notice Decode PackBits data: header n < 128 copies n + 1 literal
+    /// bytes, n > 128 repeats the next byte 257 - n times
+    function decodeRLE(bytes memory data, uint256 length) internal pure returns (bytes memory out) {
+        out = new bytes(length);
+        uint256 i;
+        uint256 o;
+        while (i < data.length) {
+            uint256 n = uint8(data[i++]);
+            if (n < 128) {
+                for (uint256 k = 0; k <= n; k++) {
+                    out[o++] = data[i++];
+                }
+            } else if (n > 128) {
+                uint256 count = 257 - n;
+                bytes1 value = data[i++];
+                if (value != 0) {
+                    // new bytes() is zeroed, so zero runs are skipped
+                    for (uint256 k = 0; k < count; k++) {
+                        out[o + k] = value;
+                    }
+                }
+                o += count;
+            }
+        }
+        require(o == length, "PBSEPCodec: bad length");
+    }
+
+    /// @notice Rebuild a bitmap from its base and an RLE-encoded XOR delta
+    function applyDelta(bytes memory base, bytes memory delta) internal pure returns (bytes memory out) {
+        out = decodeRLE(delta, base.length);
+        for (uint256 k = 0; k < out.length; k++) {
+            out[k] ^= base[k];
+        }
+    }
+}
+'''
+
+
+def _library_name(name: str, size: int) -> str:
+    """Library name for a base name: capitalized, with size and 'Mono' appended."""
+    return name[0].upper() + name[1:] + f"{size}Mono"
+
+
+def _render_library(
+    lib_name: str,
+    size: int,
+    color: str,
+    bitmap_doc: str,
+    bitmap_expr: str,
+    imports: tuple[str, ...] = (),
+) -> str:
+    """Render a bitmap library around a getBitmap() return expression."""
     render_func = "render1bit256" if size == 256 else "render1bit128"
+    extra_imports = "".join(f'import {{{lib}}} from "./{lib}.sol";\n' for lib in imports)
 
     return f'''// SPDX-License-Identifier: MIT
 pragma solidity ^0.8.24;
 
 import {{PixelArtRenderer}} from "./PixelArtRenderer.sol";
-
+{extra_imports}
 /**
  * @title {lib_name}
  * @dev On-chain pixel art storage ({size}x{size}, monochrome 1-bit)
@@ -40,9 +102,9 @@ library {lib_name} {{
         return hex"{color}";
     }}
 
-    /// @notice {size}x{size} pixel bitmap, 1-bit ({total_bytes} bytes)
+    /// @notice {bitmap_doc}
     function getBitmap() internal pure returns (bytes memory) {{
-        return hex"{hex_bitmap}";
+        return {bitmap_expr};
     }}
 
     /// @notice Render as SVG string
@@ -51,3 +113,337 @@ library {lib_name} {{
     }}
 }}
 '''
+
+
+def generate_solidity_library(
+    name: str,
+    bitmap: bytes | PackedBitmap,
+    size: int,
+    color: str = "000000",
+) -> str:
+    """
+    Generate Solidity library matching existing image-to-1bit.js output format.
+
+    Args:
+        name: Base name for the library (will be capitalized)
+        bitmap: Packed bitmap bytes, or a PackedBitmap (hex-encoded in place)
+        size: Image dimension (128 or 256)
+        color: Foreground color as hex string (without #)
+
+    Returns:
+        Solidity library source code
+    """
+    return _render_library(
+        _library_name(name, size),
+        size,
+        color,
+        f"{size}x{size} pixel bitmap, 1-bit ({len(bitmap)} bytes)",
+        f'hex"{bitmap.hex()}"',
+    )
+
+
+def generate_solidity_batch(
+    bitmaps: dict[str, bytes | PackedBitmap],
+    size: int,
+    color: str = "000000",
+    layout: str = "full",
+    chunk_size: int = 256,
+) -> tuple[dict[str, str], dict]:
+    """
+    Generate libraries for many bitmaps, storing each distinct bitmap once.
+
+    Bitmaps with identical bytes (by SHA-256) become alias libraries whose
+    getBitmap() delegates to the first library holding those bytes.
+    Distinct bitmaps are stored according to ``layout``:
+
+    - ``full``: plain ``hex"..."`` literal, as generate_solidity_library
+    - ``rle``: PackBits-compressed, decoded by PBSEPCodec.decodeRLE
+      (falls back to full when compression does not help)
+    - ``delta``: RLE of the XOR against the most similar earlier bitmap,
+      applied by PBSEPCodec.applyDelta (falls back to rle/full when the
+      delta is not smaller)
+    - ``chunked``: split into ``chunk_size``-byte chunks stored once each
+      in PBSEPChunks and joined with bytes.concat
+
+    Args:
+        bitmaps: Library base name -> packed bitmap, in output order
+        size: Image dimension (128 or 256)
+        color: Foreground color as hex string (without #)
+        layout: Storage layout for distinct bitmaps (see above)
+        chunk_size: Chunk length in bytes for the chunked layout
+
+    Returns:
+        Tuple of (file name -> Solidity source, report dictionary). The
+        report lists, per library, its encoding, the bitmap bytes it
+        stores on-chain and their estimated deployment gas, the nearest
+        other bitmap by byte similarity and the encoding_report comparison,
+        plus batch totals and the similarity matrices.
+
+    Raises:
+        ValueError: On an unknown layout or a bitmap of the wrong length
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}', expected one of {LAYOUTS}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+
+    expected = size * size // 8
+    names = list(bitmaps)
+    data = {name: bytes(bitmaps[name]) for name in names}
+    for name, raw in data.items():
+        if len(raw) != expected:
+            raise ValueError(f"Bitmap '{name}' has {len(raw)} bytes, expected {expected}")
+
+    byte_sim, bit_sim = similarity([data[name] for name in names])
+    encodings = encoding_report([data[name] for name in names], size, size)
+
+    sources: dict[str, str] = {}
+    libraries = []
+    canonical: dict[str, str] = {}  # sha256 -> name storing those bytes
+    stored: list[int] = []  # indices of distinct bitmaps, in order
+    chunk_ids: dict[bytes, int] = {}
+    uses_codec = False
+
+    for index, name in enumerate(names):
+        raw = data[name]
+        lib_name = _library_name(name, size)
+        digest = hashlib.sha256(raw).hexdigest()
+        entry = {
+            "name": name,
+            "library": lib_name,
+            "sha256": digest,
+            "rawBytes": len(raw),
+            "encodings": encodings[index],
+        }
+        others = [j for j in range(len(names)) if j != index]
+        if others:
+            nearest = max(others, key=lambda j: byte_sim[index, j])
+            entry["nearest"] = {
+                "name": names[nearest],
+                "byteSimilarity": round(float(byte_sim[index, nearest]), 6),
+                "bitSimilarity": round(float(bit_sim[index, nearest]), 6),
+            }
+
+        if digest in canonical:
+            base_lib = _library_name(canonical[digest], size)
+            payload = b""
+            entry.update(encoding="alias", aliasOf=canonical[digest])
+            doc = f"{size}x{size} pixel bitmap, 1-bit (same bytes as {base_lib})"
+            expr = f"{base_lib}.getBitmap()"
+            imports = (base_lib,)
+        elif layout == "chunked":
+            refs = []
+            payload = b""  # chunks are attributed to the first library using them
+            for offset in range(0, len(raw), chunk_size):
+                chunk = raw[offset:offset + chunk_size]
+                if chunk not in chunk_ids:
+                    chunk_ids[chunk] = len(chunk_ids)
+                    payload += chunk
+                refs.append(f"{CHUNKS_LIBRARY}.chunk{chunk_ids[chunk]}()")
+            entry.update(encoding="chunked", chunks=len(refs))
+            doc = f"{size}x{size} pixel bitmap, 1-bit ({len(raw)} bytes in {len(refs)} shared chunks)"
+            expr = "bytes.concat(\n            " + ",\n            ".join(refs) + "\n        )"
+            imports = (CHUNKS_LIBRARY,)
+        else:
+            base = None
+            if layout == "delta" and stored:
+                base = names[max(stored, key=lambda j: byte_sim[index, j])]
+            encoding, payload = _encode_bitmap(raw, layout, None if base is None else data[base])
+            entry["encoding"] = encoding
+            doc = f"{size}x{size} pixel bitmap, 1-bit ({len(raw)} bytes, {encoding} {len(payload)} bytes)"
+            if encoding == "full":
+                doc = f"{size}x{size} pixel bitmap, 1-bit ({len(raw)} bytes)"
+                expr = f'hex"{payload.hex()}"'
+                imports = ()
+            elif encoding == "rle":
+                expr = f'{CODEC_LIBRARY}.decodeRLE(hex"{payload.hex()}", {len(raw)})'
+                imports = (CODEC_LIBRARY,)
+            else:
+                base_lib = _library_name(base, size)
+                entry["deltaBase"] = base
+                expr = f'{CODEC_LIBRARY}.applyDelta({base_lib}.getBitmap(), hex"{payload.hex()}")'
+                imports = (CODEC_LIBRARY, base_lib)
+            uses_codec = uses_codec or encoding != "full"
+
+        if digest not in canonical:
+            canonical[digest] = name
+            stored.append(index)
+        entry.update(storedBytes=len(payload), deployGas=deploy_gas(payload))
+        sources[f"{lib_name}.sol"] = _render_library(lib_name, size, color, doc, expr, imports)
+        libraries.append(entry)
+
+    if chunk_ids:
+        sources[f"{CHUNKS_LIBRARY}.sol"] = _render_chunks(list(chunk_ids))
+    if uses_codec:
+        sources[f"{CODEC_LIBRARY}.sol"] = CODEC_SOURCE
+
+    total_raw = sum(entry["rawBytes"] for entry in libraries)
+    total_stored = sum(entry["storedBytes"] for entry in libraries)
+    report = {
+        "layout": layout,
+        "size": size,
+        "libraries": libraries,
+        "totals": {
+            "bitmaps": len(libraries),
+            "distinct": len(stored),
+            "rawBytes": total_raw,
+            "storedBytes": total_stored,
+            "ratio": round(total_stored / total_raw, 6) if total_raw else 0.0,
+            "deployGas": sum(entry["deployGas"] for entry in libraries),
+            "rawDeployGas": sum(deploy_gas(data[name]) for name in names),
+            # Internal library functions are inlined into the calling
+            # contract, so one contract using every library embeds all of it
+            "exceedsCodeLimit": total_stored > EIP170_CODE_LIMIT,
+        },
+        "similarity": {
+            "names": names,
+            "byte": [[round(float(v), 6) for v in row] for row in byte_sim],
+            "bit": [[round(float(v), 6) for v in row] for row in bit_sim],
+        },
+    }
+    return sources, report
+
+
+def _encode_bitmap(raw: bytes, layout: str, base: bytes | None) -> tuple[str, bytes]:
+    """
+    Pick the smallest allowed encoding for a distinct bitmap.
+
+    Returns:
+        Tuple of (encoding name, stored payload)
+    """
+    encoding, payload = "full", raw
+    if layout in ("rle", "delta"):
+        rle = rle_encode(raw)
+        if len(rle) < len(payload):
+            encoding, payload = "rle", rle
+    if layout == "delta" and base is not None:
+        delta = delta_encode(base, raw)
+        if len(delta) < len(payload):
+            encoding, payload = "delta", delta
+    return encoding, payload
+
+
+def _render_chunks(chunks: list[bytes]) -> str:
+    """Render the shared chunk library, one function per distinct chunk."""
+    functions = "\n".join(
+        f"    function chunk{i}() internal pure returns (bytes memory) {{\n"
+        f'        return hex"{chunk.hex()}";\n'
+        f"    }}\n"
+        for i, chunk in enumerate(chunks)
+    )
+    return f'''// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.24;
+
+/**
+ * @title {CHUNKS_LIBRARY}
+ * @dev Bitmap chunks shared by PBSEP-256 libraries ({len(chunks)} distinct)
+ * @notice Generated by PBSEP-256 - Do not edit manually
+ */
+library {CHUNKS_LIBRARY} {{
+{functions}}}
+'''
+
+
+def library_base_name(path: Path, size: int) -> str:
+    """
+    Library base name for a .bin file: the stem without its ``_{size}x{size}``
+    suffix, reduced to a valid Solidity identifier.
+    """
+    stem = path.stem.removesuffix(f"_{size}x{size}")
+    name = re.sub(r"[^A-Za-z0-9_]", "_", stem)
+    if not name or name[0].isdigit():
+        name = "Bitmap" + name
+    return name
+
+
+@click.command()
+@click.argument(
+    "bin_files",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option("--size", type=click.Choice(["128", "256"]), default="256", show_default=True, help="Bitmap size")
+@click.option("--color", default="000000", show_default=True, help="Foreground color as hex (without #)")
+@click.option(
+    "--layout",
+    type=click.Choice(LAYOUTS),
+    default="full",
+    show_default=True,
+    help="Storage layout for distinct bitmaps",
+)
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=256,
+    show_default=True,
+    help="Chunk length in bytes for the chunked layout",
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=Path("."),
+    help="Directory for generated .sol files",
+)
+@click.option(
+    "--report",
+    "report_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the size/gas report as JSON",
+)
+def main(
+    bin_files: tuple[Path, ...],
+    size: str,
+    color: str,
+    layout: str,
+    chunk_size: int,
+    output_dir: Path,
+    report_path: Path | None,
+) -> None:
+    """Generate Solidity libraries for many .bin bitmaps, storing each distinct bitmap once."""
+    bitmaps: dict[str, bytes] = {}
+    for path in bin_files:
+        name = library_base_name(path, int(size))
+        if name in bitmaps:
+            raise click.ClickException(f"Duplicate library name '{name}' from {path}")
+        bitmaps[name] = path.read_bytes()
+
+    try:
+        sources, report = generate_solidity_batch(bitmaps, int(size), color, layout, chunk_size)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for filename, source in sources.items():
+        (output_dir / filename).write_text(source)
+
+    click.echo(f"{'Library':<32} {'Encoding':<8} {'Stored':>8} {'Gas':>10}  Nearest")
+    for entry in report["libraries"]:
+        nearest = entry.get("nearest")
+        nearest_text = f"{nearest['name']} ({nearest['byteSimilarity']:.1%})" if nearest else "-"
+        click.echo(
+            f"{entry['library']:<32} {entry['encoding']:<8} "
+            f"{entry['storedBytes']:>8} {entry['deployGas']:>10}  {nearest_text}"
+        )
+    totals = report["totals"]
+    click.echo(
+        f"\n{totals['distinct']}/{totals['bitmaps']} distinct, "
+        f"{totals['storedBytes']}/{totals['rawBytes']} bytes stored ({totals['ratio']:.1%}), "
+        f"~{totals['deployGas']:,} gas vs {totals['rawDeployGas']:,} unshared"
+    )
+    if totals["exceedsCodeLimit"]:
+        click.echo(
+            f"Warning: stored bytes exceed the {EIP170_CODE_LIMIT}-byte contract size limit "
+            f"for a single contract using every library",
+            err=True,
+        )
+    click.echo(f"Wrote {len(sources)} files to {output_dir}")
+
+    if report_path is not None:
+        report_path.write_text(json.dumps(report, indent=2))
+        click.echo(f"Report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,44 @@
-"""Pipeline stages for PBSEP-256."""
-
-from pbsep.stages.normalize import normalize_input
-from pbsep.stages.luminance import extract_luminance
-from pbsep.stages.downscale import downscale
-from pbsep.stages.edges import detect_edges
-from pbsep.stages.binarize import binarize
-from pbsep.stages.contrast import enhance_local_contrast
-from pbsep.stages.morphology import apply_morphological_correction
-from pbsep.stages.export import export_outputs
-from pbsep.stages.vectorize import vectorize_bitmap
-
-__all__ = [
-    "normalize_input",
-    "extract_luminance",
-    "downscale",
-    "detect_edges",
-    "binarize",
-    "enhance_local_contrast",
-    "apply_morphological_correction",
-    "export_outputs",
-    "vectorize_bitmap",
-]
+"""
+Pipeline stages for PBSEP-256.
+
+Stages are imported on first access (PEP 562), so using one stage does
+not pull in the dependencies of every other stage. The modules behind
+``downscale`` and ``binarize`` are underscore-prefixed so that importing
+them never rebinds those package attributes to a module.
+"""
+
+import importlib
+
+# Public name -> defining submodule
+_EXPORTS = {
+    "normalize_input": "pbsep.stages.normalize",
+    "extract_luminance": "pbsep.stages.luminance",
+    "extract_luminance_fused": "pbsep.stages.fused",
+    "downscale": "pbsep.stages._downscale",
+    "prescale": "pbsep.stages._downscale",
+    "detect_edges": "pbsep.stages.edges",
+    "binarize": "pbsep.stages._binarize",
+    "enhance_local_contrast": "pbsep.stages.contrast",
+    "apply_morphological_correction": "pbsep.stages.morphology",
+    "apply_morphological_correction_packed": "pbsep.stages.morphology",
+    "export_outputs": "pbsep.stages.export",
+    "vectorize_bitmap": "pbsep.stages.vectorize",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name), name)
+    # Bind after the import, which sets the submodule as a package attribute
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
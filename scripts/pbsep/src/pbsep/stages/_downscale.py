@@ -0,0 +1,70 @@
+"""Stage 5: Downscaling to target resolution."""
+
+import cv2
+import numpy as np
+
+from pbsep.types import DownscaleParams
+
+
+def downscale(
+    image: np.ndarray, target_size: int, params: DownscaleParams
+) -> np.ndarray:
+    """
+    Downscale to target resolution using area interpolation.
+
+    INTER_AREA is optimal for downscaling - preserves detail better
+    than bilinear interpolation.
+
+    Args:
+        image: Input image as float32 [0, 1]
+        target_size: Target dimension (square output)
+        params: Downscale parameters
+
+    Returns:
+        Downscaled image as float32 [0, 1]
+    """
+    if params.interpolation != "area":
+        raise ValueError(f"Unknown interpolation: {params.interpolation}")
+
+    return cv2.resize(
+        image,
+        (target_size, target_size),
+        interpolation=cv2.INTER_AREA,
+    )
+
+
+def prescale(
+    image: np.ndarray, target_size: int, params: DownscaleParams
+) -> np.ndarray:
+    """
+    Pyramid mode: area-downsample the input before full-resolution stages.
+
+    Normalization, luminance and contrast enhancement dominate runtime and
+    memory on 4-8K inputs whose output is only 128-256 px. Shrinking first
+    to ``pyramid_factor`` x the target keeps enough headroom for the final
+    INTER_AREA downscale while cutting that work by orders of magnitude.
+
+    Args:
+        image: Input image (any channel count)
+        target_size: Final output dimension (square output)
+        params: Downscale parameters
+
+    Returns:
+        Image at intermediate resolution, or unchanged if pyramid mode is
+        disabled or the image is already small enough
+    """
+    if params.pyramid_factor <= 0:
+        return image
+    if params.interpolation != "area":
+        raise ValueError(f"Unknown interpolation: {params.interpolation}")
+
+    intermediate = target_size * params.pyramid_factor
+    height, width = image.shape[:2]
+    if height <= intermediate or width <= intermediate:
+        return image
+
+    return cv2.resize(
+        image,
+        (intermediate, intermediate),
+        interpolation=cv2.INTER_AREA,
+    )
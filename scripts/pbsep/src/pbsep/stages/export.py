@@ -7,6 +7,9 @@ from pathlib import Path
 import cv2
 import numpy as np
 
+from pbsep.bitpack import PackedBinary, PackedBitmap
+from pbsep.encoding import encoding_report
+from pbsep.instrument import StageInstrument, timed
 from pbsep.stages.vectorize import vectorize_bitmap
 
 
@@ -21,15 +24,7 @@ def pack_bitmap(binary: np.ndarray, invert: bool = False) -> bytes:
     Returns:
         Packed bitmap bytes
     """
-    # Foreground = black pixels (0) by default, or white if inverted
-    if invert:
-        foreground = binary.flatten() > 127
-    else:
-        foreground = binary.flatten() < 128
-
-    # Pack 8 pixels per byte, MSB first
-    packed = np.packbits(foreground.astype(np.uint8))
-    return bytes(packed)
+    return bytes(PackedBitmap.from_binary(binary, invert))
 
 
 def generate_rect_svg(binary: np.ndarray, size: int, invert: bool = False) -> str:
@@ -58,64 +53,84 @@ def generate_rect_svg(binary: np.ndarray, size: int, invert: bool = False) -> st
 
 
 def export_outputs(
-    binary: np.ndarray,
+    binary: np.ndarray | PackedBinary,
     output_dir: Path,
     output_name: str,
     size: int,
     invert: bool,
     metadata: dict,
     vectorize: bool = True,
-) -> tuple[bytes, Path, Path, Path]:
+    instrument: StageInstrument | None = None,
+    encode: bool = True,
+) -> tuple[PackedBitmap, Path, Path, Path]:
     """
     Export all output artifacts.
 
     Args:
-        binary: Binary image as uint8 (0 or 255)
+        binary: Binary image as uint8 (0 or 255), or bit-packed (wrapped
+            without repacking)
         output_dir: Output directory
         output_name: Base name for output files
         size: Image dimension
         invert: If True, light areas become foreground
-        metadata: Metadata dictionary
+        metadata: Metadata dictionary (encoding sizes are added as
+            metadata["encodings"])
         vectorize: If True, use potrace for smooth bezier SVG
+        instrument: Optional instrument timing pack, vectorize and rasterize
+        encode: If False, skip the encoding comparison and the metadata
+            file. Batch callers compare encodings across all their bitmaps
+            in one encoding_report call, then write metadata_path themselves
 
     Returns:
-        Tuple of (bitmap_bytes, svg_path, png_path, metadata_path)
+        Tuple of (bitmap, svg_path, png_path, metadata_path). The bitmap is
+        packed once and shared by the .bin file and potrace
     """
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Pack bitmap
-    bitmap = pack_bitmap(binary, invert)
+    with timed(instrument, "pack"):
+        bitmap = PackedBitmap.from_image(binary, invert)
 
     # Save raw bitmap for on-chain storage
     bin_path = output_dir / f"{output_name}_{size}x{size}.bin"
-    bin_path.write_bytes(bitmap)
+    bin_path.write_bytes(bitmap.bin_bytes())
+
+    # Compare compact encodings for on-chain storage
+    if encode:
+        with timed(instrument, "encode"):
+            metadata["encodings"] = encoding_report([bitmap], bitmap.width, bitmap.height)[0]
 
     # Generate SVG preview
-    if vectorize:
-        svg = vectorize_bitmap(binary, size, invert)
-    else:
-        svg = generate_rect_svg(binary, size, invert)
+    with timed(instrument, "vectorize"):
+        if vectorize:
+            svg = vectorize_bitmap(bitmap, size)
+        else:
+            if isinstance(binary, PackedBinary):
+                binary = binary.to_array()
+            svg = generate_rect_svg(binary, size, invert)
 
     svg_path = output_dir / f"{output_name}_{size}x{size}_1bit.svg"
     svg_path.write_text(svg)
 
     # Generate PNG preview using ImageMagick
     png_path = output_dir / f"{output_name}_{size}x{size}_1bit.png"
-    subprocess.run(
-        [
-            "magick",
-            str(svg_path),
-            "-background",
-            "white",
-            "-flatten",
-            str(png_path),
-        ],
-        check=True,
-        capture_output=True,
-    )
-
-    # Write metadata
+    with timed(instrument, "rasterize"):
+        subprocess.run(
+            [
+                "magick",
+                str(svg_path),
+                "-background",
+                "white",
+                "-flatten",
+                str(png_path),
+            ],
+            check=True,
+            capture_output=True,
+        )
+
+    # Write metadata last, so stage records for the steps above are included
     metadata_path = output_dir / f"{output_name}_{size}x{size}_metadata.json"
-    metadata_path.write_text(json.dumps(metadata, indent=2))
+    if encode:
+        metadata_path.write_text(json.dumps(metadata, indent=2))
 
     return bitmap, svg_path, png_path, metadata_path
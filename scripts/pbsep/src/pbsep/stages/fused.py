@@ -0,0 +1,110 @@
+"""Stages 1+2 fused: normalization and luminance extraction via lookup tables."""
+
+import cv2
+import numpy as np
+
+from pbsep.types import LuminanceParams, NormalizeParams
+
+
+def extract_luminance_fused(
+    image: np.ndarray,
+    normalize_params: NormalizeParams,
+    luminance_params: LuminanceParams,
+) -> np.ndarray:
+    """
+    Normalize and extract LAB L* luminance in a single pass over the image.
+
+    Equivalent to ``extract_luminance(normalize_input(image, ...), ...)``,
+    but every per-pixel step of that chain (gamma, percentile stretch,
+    clip, inverse gamma, uint8 quantization) is a function of the input
+    byte alone, so the whole chain folds into one 256-entry lookup table.
+    Percentiles come from a 256-bin histogram instead of sorting floats.
+
+    Allocates one uint8 RGB buffer (LUT output, reused in place for LAB)
+    plus the float32 result, instead of ~6 full-resolution float32 arrays.
+
+    Args:
+        image: Input RGB image as uint8 numpy array (H, W, 3)
+        normalize_params: Normalization parameters
+        luminance_params: Luminance extraction parameters
+
+    Returns:
+        Luminance channel as float32 [0, 1]
+    """
+    if luminance_params.method != "lab_l":
+        raise ValueError(f"Unknown luminance method: {luminance_params.method}")
+    if image.dtype != np.uint8:
+        raise ValueError(f"Fused luminance requires uint8 input, got {image.dtype}")
+
+    lut = build_luminance_lut(image, normalize_params)
+
+    srgb = cv2.LUT(image, lut)
+    cv2.cvtColor(srgb, cv2.COLOR_RGB2LAB, dst=srgb)
+
+    l_channel = srgb[:, :, 0].astype(np.float32)
+    np.divide(l_channel, 255.0, out=l_channel)
+    return l_channel
+
+
+def build_luminance_lut(image: np.ndarray, params: NormalizeParams) -> np.ndarray:
+    """
+    Build the uint8 -> uint8 sRGB lookup table for an image.
+
+    Args:
+        image: Input RGB image as uint8 numpy array (H, W, 3)
+        params: Normalization parameters
+
+    Returns:
+        256-entry uint8 lookup table
+    """
+    # Gamma lookup table (sRGB -> linear), same float32 math as normalize_input
+    linear = np.power(np.arange(256, dtype=np.float32) / 255.0, params.gamma)
+
+    # Exposure normalization via histogram percentiles
+    counts = _histogram(image)
+    low = _histogram_percentile(counts, linear, params.percentile_low)
+    high = _histogram_percentile(counts, linear, params.percentile_high)
+
+    if high - low > 1e-6:
+        linear = (linear - low) / (high - low)
+        linear = np.clip(linear, 0.0, 1.0)
+
+    # Back to sRGB for LAB conversion, same as extract_luminance
+    srgb = np.power(linear, 1.0 / 2.2)
+    return (srgb * 255).astype(np.uint8)
+
+
+def _histogram(image: np.ndarray, block: int = 1 << 20) -> np.ndarray:
+    """
+    256-bin histogram of a uint8 image.
+
+    np.bincount widens its input to intp, so count in blocks to keep the
+    temporary at ``block`` elements instead of 8 bytes per sample.
+    """
+    flat = image.reshape(-1)
+    counts = np.zeros(256, dtype=np.int64)
+    for start in range(0, flat.size, block):
+        counts += np.bincount(flat[start:start + block], minlength=256)
+    return counts
+
+
+def _histogram_percentile(
+    counts: np.ndarray, values: np.ndarray, percentile: float
+) -> np.float32:
+    """
+    Percentile of a uint8-indexed array from its histogram.
+
+    Matches ``np.percentile`` (linear method): interpolates between the
+    order statistics at floor/ceil of ``(n - 1) * q / 100``.
+    """
+    cumulative = np.cumsum(counts)
+    n = int(cumulative[-1])
+    index = (n - 1) * percentile / 100.0
+    lo = int(np.floor(index))
+    hi = min(lo + 1, n - 1)
+    frac = np.float32(index - lo)
+
+    # k-th smallest sample falls in the first bin whose cumulative count exceeds k
+    a = values[np.searchsorted(cumulative, lo, side="right")]
+    b = values[np.searchsorted(cumulative, hi, side="right")]
+    return a + (b - a) * frac
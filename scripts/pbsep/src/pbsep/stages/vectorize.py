@@ -6,11 +6,12 @@ from pathlib import Path
 
 import numpy as np
 
+from pbsep.bitpack import PackedBitmap
 from pbsep.types import PipelineError
 
 
 def vectorize_bitmap(
-    binary: np.ndarray,
+    binary: np.ndarray | PackedBitmap,
     size: int,
     invert: bool = False,
     turdsize: int = 2,
@@ -21,9 +22,11 @@ def vectorize_bitmap(
     Convert binary bitmap to SVG using potrace for smooth bezier curves.
 
     Args:
-        binary: Binary image as uint8 (0 or 255)
+        binary: Binary image as uint8 (0 or 255), or an already packed
+            bitmap whose raster is written to potrace as-is
         size: Output SVG dimension
-        invert: If True, light areas become foreground
+        invert: If True, light areas become foreground (uint8 input only;
+            a PackedBitmap carries its own polarity)
         turdsize: Suppress speckles up to this size (default 2)
         alphamax: Corner threshold parameter (default 1.0)
         opttolerance: Curve optimization tolerance (default 0.2)
@@ -31,25 +34,19 @@ def vectorize_bitmap(
     Returns:
         SVG string with bezier paths
     """
-    # Potrace traces white (foreground) pixels in PBM
-    # Invert determines which pixels are foreground
-    if invert:
-        foreground = binary > 127
+    # Potrace traces set (foreground) pixels in PBM
+    if isinstance(binary, PackedBitmap):
+        bitmap = binary
     else:
-        foreground = binary < 128
+        bitmap = PackedBitmap.from_binary(binary, invert)
 
     # Create temporary PBM file
     with tempfile.NamedTemporaryFile(suffix=".pbm", delete=False) as pbm_file:
         pbm_path = Path(pbm_file.name)
 
-        # Write PBM header and data
-        # PBM format: P4 (binary) or P1 (ASCII)
-        height, width = foreground.shape
-        pbm_file.write(f"P4\n{width} {height}\n".encode())
-
-        # Pack bits (8 pixels per byte, MSB first)
-        packed = np.packbits(foreground.astype(np.uint8), axis=1)
-        pbm_file.write(packed.tobytes())
+        # PBM P4 raster is the packed bitmap itself (rows MSB-first, byte padded)
+        pbm_file.write(bitmap.pbm_header())
+        pbm_file.write(bitmap.data)
 
     try:
         # Run potrace
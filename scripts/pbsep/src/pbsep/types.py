@@ -2,6 +2,10 @@
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # bitpack needs numpy; keep this module import-light
+    from pbsep.bitpack import PackedBitmap
 
 
 @dataclass(frozen=True)
@@ -18,6 +22,7 @@ class LuminanceParams:
     """Parameters for luminance extraction stage."""
 
     method: str = "lab_l"
+    fused: bool = False  # Fold normalize + luminance into one lookup-table pass
 
 
 @dataclass(frozen=True)
@@ -34,6 +39,7 @@ class DownscaleParams:
     """Parameters for downscaling stage."""
 
     interpolation: str = "area"
+    pyramid_factor: int = 0  # >0: area-downsample to factor x target before full-res stages
 
 
 @dataclass(frozen=True)
@@ -87,6 +93,7 @@ class MorphologyParams:
     open_iterations: int = 1
     erode_iterations: int = 0
     skeletonize: bool = False
+    engine: str = "opencv"  # "opencv" (uint8 images) or "packed" (1 bit per pixel)
 
 
 @dataclass(frozen=True)
@@ -140,11 +147,20 @@ class PipelineResult:
     total_pixels: int
     metadata: dict
     processing_time_ms: float
+    packed: "PackedBitmap | None" = None  # same bitmap, shared with export (no copy)
 
 
 class PipelineError(Exception):
     """Raised when pipeline processing fails."""
 
 
-class ProfileNotFoundError(Exception):
+class ProfileError(Exception):
+    """Base class for profile loading errors."""
+
+
+class ProfileNotFoundError(ProfileError):
     """Raised when a profile cannot be found."""
+
+
+class InvalidProfileError(ProfileError):
+    """Raised when a profile has unknown keys or wrongly typed values."""
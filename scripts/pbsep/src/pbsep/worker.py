@@ -0,0 +1,375 @@
+"""Long-running pbsep worker: warm profiles and stages, JSON-lines jobs."""
+
+import base64
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import IO
+
+import click
+import numpy as np
+
+from pbsep.cache import DEFAULT_MAX_BYTES, StageCache
+from pbsep.instrument import StageInstrument
+from pbsep.pipeline import PBSEP256Pipeline
+from pbsep.profiles import load_profile
+from pbsep.stages import (
+    apply_morphological_correction,
+    binarize,
+    downscale,
+    enhance_local_contrast,
+    extract_luminance,
+    extract_luminance_fused,
+    normalize_input,
+)
+from pbsep.types import PipelineConfig, PipelineResult, ProfileConfig, ProfileError
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the worker queue is full."""
+
+
+class Worker:
+    """
+    Runs pipeline jobs on a thread pool with a bounded queue.
+
+    Profiles come from load_profile's cache, which re-reads a YAML file
+    only after it changes, so edits apply to the next job without a
+    restart. OpenCV releases the GIL in its heavy kernels, so jobs on
+    separate threads overlap.
+
+    Job (one JSON object per line)::
+
+        {"id": "abc", "input": "/path/img.png", "profile": "medallion",
+         "size": 256, "pyramid": 4, "export": false,
+         "output_dir": "/tmp/out", "output_name": "img"}
+
+    Only ``input`` is required. With ``export`` true, files are written as
+    by the CLI (spawning potrace and magick); otherwise the bitmap is only
+    packed in memory. Response::
+
+        {"id": "abc", "ok": true, "bitmap": "<base64>", "metadata": {...},
+         "elapsedMs": 12.3}
+
+    or ``{"id": "abc", "ok": false, "error": "..."}``.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_size: int = 16,
+        cache: StageCache | None = None,
+        default_profile: str = "medallion",
+    ):
+        """
+        Initialize worker.
+
+        Args:
+            workers: Jobs processed concurrently
+            queue_size: Jobs allowed to wait beyond those running
+            cache: Optional stage cache shared by all jobs
+            default_profile: Profile used when a job does not name one
+        """
+        self.cache = cache
+        self.default_profile = default_profile
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pbsep")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def profile(self, name: str) -> ProfileConfig:
+        """Load a profile (cached by file modification time, see load_profile)."""
+        return load_profile(name)
+
+    def warm_up(self, profile_names: list[str]) -> None:
+        """
+        Load profiles and run each stage once on a small synthetic image.
+
+        The first call into an OpenCV/scikit-image kernel pays one-off
+        costs (lazy module init, dispatch tables, thread pools); paying
+        them here keeps them off the first job's latency.
+        """
+        image = np.zeros((64, 64, 3), dtype=np.uint8)
+        image[16:48, 16:48] = 255
+        for name in profile_names:
+            stages = self.profile(name).stages
+            luminance = extract_luminance(normalize_input(image, stages.normalize), stages.luminance)
+            extract_luminance_fused(image, stages.normalize, stages.luminance)
+            if stages.contrast is not None:
+                luminance = enhance_local_contrast(luminance, stages.contrast)
+            binary = binarize(downscale(luminance, 32, stages.downscale), stages.binarize)
+            apply_morphological_correction(binary, stages.morphology)
+
+    def submit(self, job: dict, reply: Callable[[dict], None] | None = None) -> Future:
+        """
+        Queue a job.
+
+        Args:
+            job: Job dictionary
+            reply: Optional callback given the response on the worker
+                thread, before the returned future completes
+
+        Returns:
+            Future resolving to the response dictionary
+
+        Raises:
+            QueueFullError: If running plus waiting jobs are at capacity
+        """
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("Worker queue full, retry later")
+        try:
+            future = self._executor.submit(self._run_and_reply, job, reply)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def wait_for_slot(self) -> None:
+        """Block until a queue slot frees up (backpressure for stream input)."""
+        self._slots.acquire()
+        self._slots.release()
+
+    def _run_and_reply(self, job: dict, reply: Callable[[dict], None] | None) -> dict:
+        """Run a job and hand its response to ``reply``."""
+        response = self.run(job)
+        if reply is not None:
+            reply(response)
+        return response
+
+    def run(self, job: dict) -> dict:
+        """Run one job and build its response (errors are reported, not raised)."""
+        job_id = job.get("id")
+        start_time = time.perf_counter()
+        try:
+            result = self._execute(job)
+        except Exception as e:  # a bad job must not take the worker down
+            return {"id": job_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+        return {
+            "id": job_id,
+            "ok": True,
+            "bitmap": base64.b64encode(result.bitmap).decode("ascii"),
+            "metadata": result.metadata,
+            "elapsedMs": round((time.perf_counter() - start_time) * 1000, 3),
+        }
+
+    def _execute(self, job: dict) -> PipelineResult:
+        """Build and execute a pipeline for a job."""
+        if "input" not in job:
+            raise KeyError("job requires 'input'")
+        input_path = Path(job["input"]).resolve()
+        export = bool(job.get("export", False))
+
+        profile = self.profile(job.get("profile", self.default_profile))
+        if "pyramid" in job:
+            stages = profile.stages
+            profile = replace(
+                profile,
+                stages=replace(
+                    stages,
+                    downscale=replace(stages.downscale, pyramid_factor=int(job["pyramid"])),
+                ),
+            )
+
+        config = PipelineConfig(
+            input_path=input_path,
+            output_name=job.get("output_name", input_path.stem),
+            output_dir=Path(job.get("output_dir", input_path.parent)).resolve(),
+            size=int(job.get("size", 256)),
+            profile_name=profile.name,
+            invert=True,
+        )
+        pipeline = PBSEP256Pipeline(
+            config,
+            profile,
+            cache=self.cache,
+            pyramid_min_agreement=job.get("pyramid_min_agreement"),
+            instrument=StageInstrument(),
+        )
+        return pipeline.execute(export=export)
+
+    def close(self) -> None:
+        """Finish queued jobs and stop the thread pool."""
+        self._executor.shutdown(wait=True)
+
+
+def _read_jobs(lines: Iterable[str | bytes], reply: Callable[[dict], None]) -> Iterator[dict]:
+    """Parse JSON-lines jobs, replying with an error for malformed lines."""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+        except ValueError as e:  # JSONDecodeError, or undecodable bytes
+            reply({"id": None, "ok": False, "error": f"Invalid JSON: {e}"})
+            continue
+        if not isinstance(job, dict):
+            reply({"id": None, "ok": False, "error": "Job must be a JSON object"})
+            continue
+        yield job
+
+
+def serve_stream(worker: Worker, reader: IO[str], writer: IO[str]) -> None:
+    """
+    Serve JSON-lines jobs from a text stream until EOF.
+
+    Responses are written as jobs complete, so they may be out of order
+    with respect to requests; match them by ``id``. When the queue is
+    full, reading pauses until a slot frees up.
+    """
+    write_lock = threading.Lock()
+    pending: list[Future] = []
+
+    def reply(response: dict) -> None:
+        line = json.dumps(response)
+        with write_lock:
+            writer.write(line + "\n")
+            writer.flush()
+
+    for job in _read_jobs(reader, reply):
+        while True:
+            try:
+                future = worker.submit(job, reply)
+                break
+            except QueueFullError:
+                worker.wait_for_slot()
+        pending = [f for f in pending if not f.done()] + [future]
+
+    for future in pending:
+        future.result()
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """One socket connection: JSON-lines jobs in, responses out."""
+
+    def handle(self) -> None:
+        worker: Worker = self.server.worker
+        write_lock = threading.Lock()
+        pending: list[Future] = []
+
+        def reply(response: dict) -> None:
+            data = (json.dumps(response) + "\n").encode()
+            with write_lock:
+                try:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                except OSError:
+                    pass  # client went away; nothing left to tell it
+
+        for job in _read_jobs(self.rfile, reply):
+            # Connections are unbounded, so reject instead of blocking here
+            try:
+                future = worker.submit(job, reply)
+            except QueueFullError as e:
+                reply({"id": job.get("id"), "ok": False, "error": str(e)})
+                continue
+            pending = [f for f in pending if not f.done()] + [future]
+
+        for future in pending:
+            future.result()
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, worker: Worker):
+        self.worker = worker
+        super().__init__(path, _JobHandler)
+
+
+def serve_socket(worker: Worker, path: Path) -> None:
+    """Serve JSON-lines jobs on a Unix socket until interrupted."""
+    if path.exists():
+        path.unlink()  # stale socket from a previous run
+    with _UnixServer(str(path), worker) as server:
+        os.chmod(path, 0o600)
+        try:
+            server.serve_forever()
+        finally:
+            path.unlink(missing_ok=True)
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Listen on this Unix socket (default: read jobs from stdin)",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Jobs processed concurrently",
+)
+@click.option(
+    "--queue-size",
+    type=click.IntRange(min=0),
+    default=16,
+    show_default=True,
+    help="Jobs allowed to wait beyond those running (socket clients get an error when full)",
+)
+@click.option(
+    "--profile",
+    "profiles",
+    multiple=True,
+    default=("medallion",),
+    show_default=True,
+    help="Profiles to preload (the first is the default for jobs)",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Cache full-resolution stage outputs here for reuse across jobs",
+)
+@click.option(
+    "--cache-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_BYTES // (1024 * 1024),
+    show_default=True,
+    help="Stage cache size cap in MB (least recently used entries are evicted)",
+)
+def main(
+    socket_path: Path | None,
+    workers: int,
+    queue_size: int,
+    profiles: tuple[str, ...],
+    cache_dir: Path | None,
+    cache_size: int,
+) -> None:
+    """Run a pbsep worker that keeps profiles and stages warm between jobs."""
+    cache = None
+    if cache_dir is not None:
+        cache = StageCache(cache_dir.resolve(), cache_size * 1024 * 1024)
+
+    worker = Worker(workers, queue_size, cache=cache, default_profile=profiles[0])
+    try:
+        worker.warm_up(list(profiles))
+    except ProfileError as e:
+        raise click.ClickException(str(e))
+
+    # stdout carries responses in stream mode, so status goes to stderr
+    click.echo(f"pbsep worker ready ({workers} workers, queue {queue_size})", err=True)
+    try:
+        if socket_path is not None:
+            click.echo(f"Listening on {socket_path}", err=True)
+            serve_socket(worker, socket_path)
+        else:
+            serve_stream(worker, sys.stdin, sys.stdout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Tests for the bit-packed morphology engine against OpenCV."""
+
+from dataclasses import replace
+
+import cv2
+import numpy as np
+import pytest
+
+from pbsep.bitpack import PackedBinary, PackedBitmap
+from pbsep.pipeline import PBSEP256Pipeline
+from pbsep.profiles import load_profile
+from pbsep.stages import apply_morphological_correction, apply_morphological_correction_packed
+from pbsep.types import MorphologyParams, PipelineConfig
+
+# Widths cover whole 64-bit words, whole bytes and ragged last bytes
+SHAPES = [(64, 256), (37, 128), (50, 77), (9, 5)]
+KERNEL_SIZES = [1, 3, 5, 7]
+
+
+def _binary(shape, density=0.5, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.where(rng.random(shape) < density, 255, 0).astype(np.uint8)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("size", KERNEL_SIZES)
+@pytest.mark.parametrize("iterations", [1, 2])
+def test_dilate_erode_match_cv2(shape, size, iterations):
+    binary = _binary(shape)
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size))
+    packed = PackedBinary.from_array(binary)
+
+    np.testing.assert_array_equal(
+        packed.dilate(kernel, iterations).to_array(), cv2.dilate(binary, kernel, iterations=iterations)
+    )
+    np.testing.assert_array_equal(
+        packed.erode(kernel, iterations).to_array(), cv2.erode(binary, kernel, iterations=iterations)
+    )
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize(
+    "params",
+    [
+        MorphologyParams(),
+        MorphologyParams(kernel_size=5, close_iterations=2, open_iterations=0),
+        MorphologyParams(close_iterations=0, open_iterations=2, erode_iterations=1),
+    ],
+)
+def test_packed_engine_matches_opencv(shape, params):
+    binary = _binary(shape, density=0.4, seed=1)
+    expected = apply_morphological_correction(binary, params)
+    packed = apply_morphological_correction_packed(binary, params)
+
+    np.testing.assert_array_equal(packed.to_array(), expected)
+    np.testing.assert_array_equal(
+        apply_morphological_correction(binary, replace(params, engine="packed")), expected
+    )
+    assert packed.count() == np.count_nonzero(expected)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("invert", [False, True])
+def test_bitmap_from_packed_matches_from_binary(shape, invert):
+    binary = _binary(shape, seed=2)
+    packed = PackedBinary.from_array(binary)
+
+    expected = PackedBitmap.from_binary(binary, invert)
+    bitmap = PackedBitmap.from_packed(packed, invert)
+    assert bytes(bitmap.data) == bytes(expected.data)
+    assert bytes(bitmap) == bytes(expected)
+
+
+def test_pipeline_engines_agree(tmp_path):
+    """execute() gives identical output whether morphology runs packed or not."""
+    rng = np.random.default_rng(3)
+    image = cv2.GaussianBlur(rng.integers(0, 256, (512, 512, 3), dtype=np.uint8), (9, 9), 0)
+    input_path = tmp_path / "input.png"
+    cv2.imwrite(str(input_path), image)
+    config = PipelineConfig(
+        input_path=input_path,
+        output_name="out",
+        output_dir=tmp_path,
+        size=256,
+        profile_name="medallion",
+        invert=True,
+    )
+    profile = load_profile("medallion")
+    stages = profile.stages
+    results = {}
+    for engine in ("opencv", "packed"):
+        engine_profile = replace(
+            profile, stages=replace(stages, morphology=replace(stages.morphology, engine=engine))
+        )
+        results[engine] = PBSEP256Pipeline(config, engine_profile).execute(export=False)
+
+    assert results["packed"].bitmap == results["opencv"].bitmap
+    assert results["packed"].opaque_count == results["opencv"].opaque_count
+    assert results["packed"].metadata["encodings"] == results["opencv"].metadata["encodings"]
@@ -0,0 +1,35 @@
+"""Tests for the on-disk stage cache."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from pbsep.cache import StageCache
+
+
+def test_concurrent_store_same_key(tmp_path):
+    """Threads storing the same key at once must not race on the temp file."""
+    cache = StageCache(tmp_path)
+    array = np.arange(4096, dtype=np.float32).reshape(64, 64)
+    key = cache.key("input", ["params"])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: cache.store(key, array), range(64)))
+
+    np.testing.assert_array_equal(cache.load(key), array)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_concurrent_store_with_eviction(tmp_path):
+    """Concurrent stores and evictions under a tight size cap stay consistent."""
+    array = np.ones((32, 32), dtype=np.float32)
+    cache = StageCache(tmp_path, max_bytes=3 * array.nbytes)
+
+    def store(i):
+        cache.store(cache.key("input", [i % 6]), array)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(store, range(96)))
+
+    assert len(list(tmp_path.glob("*.npy"))) <= 3
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,36 @@
+"""Tests for CLI option validation."""
+
+import cv2
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from pbsep.cli import main
+
+
+@pytest.fixture
+def input_path(tmp_path):
+    path = tmp_path / "input.png"
+    cv2.imwrite(str(path), np.zeros((64, 64, 3), dtype=np.uint8))
+    return path
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["--matrix", "--profile", "medallion"], "--profile cannot be used with --matrix"),
+        (["--matrix", "--pyramid-min-agreement", "90"], "--pyramid-min-agreement cannot be used with --matrix"),
+    ],
+)
+def test_matrix_rejects_single_run_options(input_path, tmp_path, args, message):
+    result = CliRunner().invoke(main, [str(input_path), "out", "--output-dir", str(tmp_path), *args])
+    assert result.exit_code == 2
+    assert message in result.output
+
+
+def test_min_agreement_requires_pyramid(input_path, tmp_path):
+    result = CliRunner().invoke(
+        main, [str(input_path), "out", "--output-dir", str(tmp_path), "--pyramid-min-agreement", "90"]
+    )
+    assert result.exit_code == 1
+    assert "requires pyramid mode" in result.output
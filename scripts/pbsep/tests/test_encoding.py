@@ -0,0 +1,70 @@
+"""Roundtrip and size checks for the on-chain bitmap encodings."""
+
+import numpy as np
+import pytest
+
+from pbsep.encoding import (
+    encoded_sizes,
+    encoding_report,
+    quadtree_decode,
+    quadtree_encode,
+    rle_decode,
+    rle_encode,
+    row_rle_decode,
+    row_rle_encode,
+    unpack_batch,
+)
+
+SIZE = 16
+
+
+def _no_repeat_bitmap() -> bytes:
+    """32 distinct bytes: no run of 2+ equal bytes, so PackBits has no repeat packets."""
+    return bytes(range(0, 4 * SIZE * SIZE // 8, 4))
+
+
+def _bitmaps() -> list[bytes]:
+    rng = np.random.default_rng(0)
+    nbytes = SIZE * SIZE // 8
+    bitmaps = [
+        _no_repeat_bitmap(),
+        bytes(nbytes),
+        b"\xff" * nbytes,
+        bytes(rng.integers(0, 256, nbytes, dtype=np.uint8)),
+    ]
+    # Small random bitmaps from few byte values mix repeat and literal runs
+    for _ in range(20):
+        bitmaps.append(bytes(rng.choice([0, 1, 0x80, 0xFF], nbytes).astype(np.uint8)))
+    return bitmaps
+
+
+def test_no_repeat_bitmap_has_distinct_neighbours():
+    data = _no_repeat_bitmap()
+    assert len(data) == SIZE * SIZE // 8
+    assert all(a != b for a, b in zip(data, data[1:]))
+
+
+@pytest.mark.parametrize("index", range(len(_bitmaps())))
+def test_roundtrip(index):
+    data = _bitmaps()[index]
+    bits = unpack_batch([data], SIZE, SIZE)[0]
+    assert rle_decode(rle_encode(data), len(data)) == data
+    np.testing.assert_array_equal(row_rle_decode(row_rle_encode(bits), SIZE, SIZE), bits)
+    np.testing.assert_array_equal(quadtree_decode(quadtree_encode(bits), SIZE, SIZE), bits)
+
+
+@pytest.mark.parametrize("batch", [[0], [0, 1], list(range(len(_bitmaps())))])
+def test_sizes_match_encoders(batch):
+    bitmaps = [_bitmaps()[i] for i in batch]
+    stack = unpack_batch(bitmaps, SIZE, SIZE)
+    sizes = encoded_sizes(stack)
+    for i, data in enumerate(bitmaps):
+        assert sizes["packbits"][0][i] == len(rle_encode(data))
+        assert sizes["rowRle"][0][i] == len(row_rle_encode(stack[i]))
+        assert sizes["quadtree"][0][i] == len(quadtree_encode(stack[i]))
+    assert all(size.dtype == np.int64 and steps.dtype == np.int64 for size, steps in sizes.values())
+
+
+def test_report_for_single_no_repeat_bitmap():
+    (entry,) = encoding_report([_no_repeat_bitmap()], SIZE, SIZE)
+    assert entry["packbits"]["bytes"] == len(rle_encode(_no_repeat_bitmap()))
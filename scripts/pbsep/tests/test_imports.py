@@ -0,0 +1,54 @@
+"""Tests for lazy stage exports and the import-time budget."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pbsep.bench import DEFAULT_IMPORT_BUDGET_MS, IMPORT_FORBIDDEN, check_imports
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+
+# Each snippet runs in a fresh interpreter, so import order is exactly as written
+IMPORT_ORDERS = {
+    "prescale first": "from pbsep.stages import prescale\nfrom pbsep.stages import downscale, binarize",
+    "package first": "import pbsep.stages as s\ndownscale, binarize = s.downscale, s.binarize",
+    "submodules first": (
+        "import pbsep.stages._downscale, pbsep.stages._binarize\n"
+        "from pbsep.stages import downscale, binarize"
+    ),
+    "star import": "from pbsep.stages import *",
+}
+
+
+@pytest.fixture
+def src_on_path(monkeypatch):
+    """Make pbsep importable in child interpreters."""
+    path = os.pathsep.join(filter(None, [SRC, os.environ.get("PYTHONPATH")]))
+    monkeypatch.setenv("PYTHONPATH", path)
+
+
+@pytest.mark.parametrize("snippet", IMPORT_ORDERS.values(), ids=IMPORT_ORDERS.keys())
+def test_stage_exports_are_functions(src_on_path, snippet):
+    """Stage names resolve to the functions whatever order the imports run in."""
+    check = "import types\nassert isinstance(downscale, types.FunctionType), downscale\n"
+    check += "assert isinstance(binarize, types.FunctionType), binarize\n"
+    subprocess.run([sys.executable, "-c", snippet + "\n" + check], check=True)
+
+
+def test_every_export_resolves():
+    import pbsep.stages as stages
+
+    for name in stages.__all__:
+        assert callable(getattr(stages, name)), name
+
+
+@pytest.mark.parametrize("module", IMPORT_FORBIDDEN)
+def test_import_budget(src_on_path, module):
+    """Light entry points must not load heavy dependencies, and the CLI stays fast."""
+    elapsed_ms, forbidden = check_imports(module)
+    assert not forbidden, f"{module} loads {', '.join(forbidden)}"
+    if module == "pbsep.cli":
+        assert elapsed_ms <= DEFAULT_IMPORT_BUDGET_MS
@@ -0,0 +1,68 @@
+"""Tests for batched encoding comparison in matrix runs."""
+
+import json
+
+import numpy as np
+
+from pbsep import matrix
+from pbsep.encoding import encoding_report
+from pbsep.instrument import StageInstrument
+from pbsep.matrix import MATRIX_CONFIGS, MatrixResult
+
+SIZE = 16
+
+
+def _results(tmp_path, n):
+    rng = np.random.default_rng(0)
+    results = []
+    for i in range(n):
+        config = MATRIX_CONFIGS[i % len(MATRIX_CONFIGS)]
+        results.append(
+            MatrixResult(
+                config=config,
+                opaque_count=0,
+                total_pixels=SIZE * SIZE,
+                opacity_pct=0.0,
+                png_path=tmp_path / f"{i}.png",
+                bitmap=rng.integers(0, 4, SIZE * SIZE // 8, dtype=np.uint8).tobytes(),
+                metadata={"config_id": config.id},
+                metadata_path=tmp_path / f"{i}_metadata.json",
+            )
+        )
+    return results
+
+
+def test_collect_encodes_in_batches(tmp_path, monkeypatch):
+    calls = []
+
+    def counting_report(bitmaps, width, height):
+        calls.append(len(bitmaps))
+        return encoding_report(bitmaps, width, height)
+
+    monkeypatch.setattr(matrix, "encoding_report", counting_report)
+    monkeypatch.setattr(matrix, "ENCODE_BATCH", 4)
+    results = _results(tmp_path, 10)
+    seen = []
+
+    collected = matrix._collect(iter(results), SIZE, StageInstrument(), seen.append)
+
+    assert calls == [4, 4, 2]
+    assert collected == results
+    assert seen == results
+    expected = encoding_report([r.bitmap for r in results], SIZE, SIZE)
+    for result, encodings in zip(results, expected):
+        assert result.encodings == encodings
+        written = json.loads(result.metadata_path.read_text())
+        assert written["encodings"] == encodings
+
+
+def test_collect_single_call_for_full_matrix(tmp_path, monkeypatch):
+    calls = []
+
+    def counting_report(bitmaps, width, height):
+        calls.append(len(bitmaps))
+        return encoding_report(bitmaps, width, height)
+
+    monkeypatch.setattr(matrix, "encoding_report", counting_report)
+    matrix._collect(iter(_results(tmp_path, len(MATRIX_CONFIGS))), SIZE, StageInstrument())
+    assert calls == [len(MATRIX_CONFIGS)]
@@ -0,0 +1,42 @@
+"""Tests for pipeline configuration checks."""
+
+from dataclasses import replace
+
+import cv2
+import numpy as np
+import pytest
+
+from pbsep.pipeline import PBSEP256Pipeline
+from pbsep.profiles import load_profile
+from pbsep.types import PipelineConfig
+
+
+@pytest.fixture
+def config(tmp_path):
+    input_path = tmp_path / "input.png"
+    cv2.imwrite(str(input_path), np.zeros((64, 64, 3), dtype=np.uint8))
+    return PipelineConfig(
+        input_path=input_path,
+        output_name="out",
+        output_dir=tmp_path,
+        size=256,
+        profile_name="medallion",
+        invert=True,
+    )
+
+
+def _with_pyramid(profile, factor):
+    stages = profile.stages
+    return replace(profile, stages=replace(stages, downscale=replace(stages.downscale, pyramid_factor=factor)))
+
+
+def test_min_agreement_requires_pyramid_mode(config):
+    profile = _with_pyramid(load_profile("medallion"), 0)
+    with pytest.raises(ValueError, match="requires pyramid mode"):
+        PBSEP256Pipeline(config, profile, pyramid_min_agreement=90.0)
+
+
+def test_min_agreement_accepted_in_pyramid_mode(config):
+    profile = _with_pyramid(load_profile("medallion"), 2)
+    pipeline = PBSEP256Pipeline(config, profile, pyramid_min_agreement=90.0)
+    assert pipeline.pyramid_min_agreement == 90.0
@@ -0,0 +1,60 @@
+"""Tests for the parameter-space search driver."""
+
+import cv2
+import numpy as np
+import pytest
+
+from pbsep.search import Dimension, SearchSpec, _grid, run_search
+
+
+@pytest.mark.parametrize(
+    "low, high, steps, expected",
+    [
+        (0, 10, 4, [0, 3, 7, 10]),
+        (1, 8, 5, [1, 3, 4, 6, 8]),
+        (3, 5, 10, [3, 4, 5]),
+        (7, 7, 3, [7]),
+        (2, 5, 0, [2, 3, 4, 5]),
+    ],
+)
+def test_integer_grid_includes_both_ends(low, high, steps, expected):
+    values = Dimension("binarize.c_constant", low=low, high=high, integer=True, steps=steps).grid()
+    assert values == expected
+    assert all(type(v) is int for v in values)
+
+
+def _spec(patience):
+    return SearchSpec(
+        profile="medallion",
+        strategy="grid",
+        dimensions=(
+            Dimension("binarize.c_constant", low=1, high=8, integer=True, steps=8),
+            Dimension("binarize.block_size", choices=(7, 9, 11, 15, 21)),
+        ),
+        budget=1000,
+        patience=patience,
+        opacity_band=(15.0, 20.0),
+    )
+
+
+def test_grid_order_shuffled_only_with_patience():
+    rng = np.random.default_rng(0)
+    ordered = _grid(_spec(0), rng)
+    shuffled = _grid(_spec(1), rng)
+    assert ordered[0] == {"binarize.c_constant": 1, "binarize.block_size": 7}
+    assert shuffled != ordered
+    assert sorted(map(str, shuffled)) == sorted(map(str, ordered))
+
+
+def test_grid_search_stops_early(tmp_path):
+    rng = np.random.default_rng(0)
+    image = cv2.GaussianBlur(rng.integers(0, 256, (256, 256, 3), dtype=np.uint8), (7, 7), 0)
+    input_path = tmp_path / "input.png"
+    cv2.imwrite(str(input_path), image)
+
+    full = run_search(_spec(0), input_path, tmp_path / "full", size=128)
+    pruned = run_search(_spec(1), input_path, tmp_path / "pruned", size=128)
+
+    assert len(full) == 40
+    assert len(pruned) < len(full)
+    assert len(pruned) % 8 == 0  # whole rounds of the default batch size
@@ -0,0 +1,26 @@
+"""Tests for the long-running worker."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pbsep
+from pbsep.worker import Worker
+
+MEDALLION = Path(pbsep.__file__).parent / "profiles" / "defaults" / "medallion.yaml"
+
+
+def test_worker_sees_edited_profile(tmp_path):
+    path = tmp_path / "edited.yaml"
+    shutil.copy(MEDALLION, path)
+    worker = Worker(workers=1)
+    try:
+        assert worker.profile(str(path)).stages.morphology.close_iterations == 1
+
+        path.write_text(path.read_text().replace("close_iterations: 1", "close_iterations: 3"))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert worker.profile(str(path)).stages.morphology.close_iterations == 3
+    finally:
+        worker.close()